@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# Decoding of the X and D depth datagrams in pings per second: the per beam struct loop of pyall 2.x (before)
+# against the numpy structured dtypes of X_DEPTH.read / D_DEPTH.read (after), on a synthetic .all file.
+# The before loop slices the datagram bytes instead of one file read per beam, it is a lower bound of the old cost.
+# Run from the repository folder: python -m benchmarks.bench_all_decode [--pings 3000] [--beams 400]
+
+import math
+import os
+import struct
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from tests import context
+from pyall import ALLReader
+from benchmarks.synthetic_all import writeALL
+
+def perBeamX(data):
+    '''beams of an X datagram decoded one by one, as X_DEPTH.read did before the numpy dtypes'''
+    NBeams = struct.unpack_from('=H', data, 28)[0]
+    Depth, AcrossTrackDistance, AlongTrackDistance = [0] * NBeams, [0] * NBeams, [0] * NBeams
+    DetectionWindowsLength, QualityFactor, BeamIncidenceAngleAdjustment = [0] * NBeams, [0] * NBeams, [0] * NBeams
+    DetectionInformation, RealtimeCleaningInformation, Reflectivity = [0] * NBeams, [0] * NBeams, [0] * NBeams
+    rec_unpack = struct.Struct('=fffHBBBbh').unpack
+    rec_len = 20
+    offset = struct.calcsize('=LBBHLL4Hf2Hf4B')
+    for i in range(NBeams):
+        s = rec_unpack(data[offset + i * rec_len:offset + (i + 1) * rec_len])
+        Depth[i] = s[0]
+        AcrossTrackDistance[i] = s[1]
+        AlongTrackDistance[i] = s[2]
+        DetectionWindowsLength[i] = s[3]
+        QualityFactor[i] = s[4]
+        BeamIncidenceAngleAdjustment[i] = float(s[5] / 10)
+        DetectionInformation[i] = s[6]
+        RealtimeCleaningInformation[i] = s[7]
+        Reflectivity[i] = float(s[8] / 10)
+        if math.isnan(Depth[i]):
+            Depth[i] = 0
+        if math.isnan(AcrossTrackDistance[i]):
+            AcrossTrackDistance[i] = 0
+        if math.isnan(AlongTrackDistance[i]):
+            AlongTrackDistance[i] = 0
+    return Depth
+
+def perBeamD(data):
+    '''beams of a D datagram decoded one by one, as D_DEPTH.read did before the numpy dtypes'''
+    EMModel = struct.unpack_from('=H', data, 6)[0]
+    NBeams = struct.unpack_from('=B', data, 27)[0]
+    Depth, AcrossTrackDistance, AlongTrackDistance, BeamDepressionAngle, BeamAzimuthAngle = [0] * NBeams, [0] * NBeams, [0] * NBeams, [0] * NBeams, [0] * NBeams
+    Range, QualityFactor, LengthOfDetectionWindow, Reflectivity, BeamNumber = [0] * NBeams, [0] * NBeams, [0] * NBeams, [0] * NBeams, [0] * NBeams
+    rec_unpack = struct.Struct('=H3h2H2BbB' if EMModel < 700 else '=4h2H2BbB').unpack
+    rec_len = 16
+    offset = struct.calcsize('=LBBHLLHHHHHBBBBH')
+    for i in range(NBeams):
+        s = rec_unpack(data[offset + i * rec_len:offset + (i + 1) * rec_len])
+        Depth[i] = float(s[0] / float(100))
+        AcrossTrackDistance[i] = float(s[1] / float(100))
+        AlongTrackDistance[i] = float(s[2] / float(100))
+        BeamDepressionAngle[i] = float(s[3] / float(100))
+        BeamAzimuthAngle[i] = float(s[4] / float(100))
+        Range[i] = float(s[5] / float(100))
+        QualityFactor[i] = s[6]
+        LengthOfDetectionWindow[i] = s[7]
+        Reflectivity[i] = float(s[8] / float(100))
+        BeamNumber[i] = s[9]
+        if math.isnan(Depth[i]):
+            Depth[i] = 0
+        if math.isnan(AcrossTrackDistance[i]):
+            AcrossTrackDistance[i] = 0
+        if math.isnan(AlongTrackDistance[i]):
+            AlongTrackDistance[i] = 0
+    return Depth
+
+def pingsPerSecond(f, items, repeat=3):
+    best = math.inf
+    for i in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            f(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+def main():
+    parser = ArgumentParser(description='Benchmark of the X and D beams decoding.')
+    parser.add_argument('--pings', type=int, default=3000, help='Number of pings of the synthetic file.')
+    parser.add_argument('--beams', type=int, default=400, help='Number of beams of the X datagrams (D: at most 255).')
+    args = parser.parse_args()
+
+    fileName = os.path.join(tempfile.gettempdir(), 'bench_all_decode.all')
+    writeALL(fileName, args.pings, args.beams, withD=True)
+    try:
+        print('%-4s %8s %16s %16s %16s' % ('type', 'pings', 'before [ping/s]', 'after [ping/s]', 'after mmap'))
+        for typeOfDatagram, perBeam in (('X', perBeamX), ('D', perBeamD)):
+            after = {}
+            for useMMAP in (False, True):
+                r = ALLReader(fileName, useMMAP=useMMAP)
+                datagrams = []
+                while r.moreData():
+                    t, datagram = r.readDatagram()
+                    if t == typeOfDatagram:
+                        datagrams.append(datagram)
+                if not useMMAP:
+                    raw = [bytes(r.readDatagramBytes(d.offset, d.numberOfBytes)) for d in datagrams]
+                    before = pingsPerSecond(perBeam, raw)
+                    datagrams[0].read()
+                    assert perBeam(raw[0]) == datagrams[0].Depth # same beams decoded
+                after[useMMAP] = pingsPerSecond(lambda d: d.read(), datagrams)
+                r.close()
+            print('%-4s %8d %16.0f %16.0f %16.0f' % (typeOfDatagram, len(datagrams), before, after[False], after[True]))
+    finally:
+        os.remove(fileName)
+
+if __name__ == '__main__':
+    main()
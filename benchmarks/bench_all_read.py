@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+# Throughput of ALLReader in MB/s, buffered file against memory mapped (useMMAP=True), on a synthetic multi-GB .all file.
+# Run from the repository folder: python -m benchmarks.bench_all_read [--size 2048] [--file big.all]
+# The file is generated in the temporary folder (removed at the end) unless --file is given, the cache is warm after the generation.
+
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from tests import context
+from pyall import ALLReader
+from benchmarks.synthetic_all import writeALL
+
+def scan(r):
+    n = 0
+    while r.moreData():
+        r.readDatagram()
+        n += 1
+    return n
+
+def count(r):
+    return r.getRecordCount()[0]
+
+def readXP(r):
+    n = 0
+    while r.moreData():
+        typeOfDatagram, datagram = r.readDatagram()
+        if typeOfDatagram in ('X', 'P'):
+            datagram.read()
+            n += 1
+    return n
+
+def main():
+    parser = ArgumentParser(description='Benchmark of the ALLReader throughput, file and mmap.')
+    parser.add_argument('--size', type=int, default=2048, help='Size of the synthetic file in MB.')
+    parser.add_argument('--file', help='Existing .all file to read (or where to keep the synthetic file).')
+    parser.add_argument('--modes', default='scan,count,readXP', help='scan (readDatagram), count (getRecordCount), readXP (X and P decoded).')
+    args = parser.parse_args()
+
+    fileName = args.file or os.path.join(tempfile.gettempdir(), 'bench_all_read.all')
+    generated = not os.path.isfile(fileName)
+    if generated:
+        pingSize = writeALL(fileName, 100) / 100 # X 400 beams, half a Y, a fifth of P and A
+        print(f'Writing {fileName} ({args.size} MB)')
+        writeALL(fileName, int(args.size * 1024 * 1024 / pingSize))
+    mb = os.path.getsize(fileName) / (1024 * 1024)
+    print(f'{fileName}: {mb:.0f} MB')
+    try:
+        print('%-8s %-5s %10s %8s %10s' % ('mode', 'read', 'datagrams', 'time [s]', 'MB/s'))
+        for mode in args.modes.split(','):
+            for useMMAP in (False, True):
+                r = ALLReader(fileName, useMMAP=useMMAP)
+                start = time.perf_counter()
+                n = {'scan': scan, 'count': count, 'readXP': readXP}[mode](r)
+                dt = time.perf_counter() - start
+                r.close()
+                print('%-8s %-5s %10d %8.1f %10.0f' % (mode, 'mmap' if useMMAP else 'file', n, dt, mb / dt))
+    finally:
+        if generated and not args.file:
+            os.remove(fileName)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+# Building the sensors DataFrame of sensorsfc: one row at a time (what DataFrame.append did, copy of the whole frame per row)
+# against the list of tuples converted once (appendRows). Synthetic 'Folder' rows of sensors files.
+# Run from the repository folder: python -m benchmarks.bench_dataframe [--old-max 10000]
+
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+import pandas as pd
+
+from tests import context
+COL = ["Session Start", "Session End", "Session Name", "Session MaxGap", "Vessel Name", "Sensor Start", "Difference Start [s]",
+       "Sensor Type", "Sensor FileName", "SPL LineName", "FilePath"]
+
+def sensorRows(n):
+    start = np.datetime64('2020-12-10T00:00:00', 'ms') + np.arange(n) * np.timedelta64(95123, 'ms')
+    return [("", "", "", "", 'V1', s, "", 'MBES', '%05d_L%03d' % (i, i % 300), "", '/data/MBES/%05d_L%03d.all' % (i, i % 300))
+            for i, s in enumerate(start.tolist())]
+
+def rowByRow(rows):
+    df = pd.DataFrame(columns=COL)
+    for row in rows:
+        df = pd.concat([df, pd.DataFrame([row], columns=COL)], ignore_index=True)
+    return df
+
+def timeit(f, *args):
+    start = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = ArgumentParser(description='Benchmark of the DataFrame building of the logs.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000, 10000, 50000], help='Number of sensors files.')
+    parser.add_argument('--old-max', type=int, default=10000, help='Largest number of rows built one at a time (quadratic).')
+    args = parser.parse_args()
+    from splsensors import appendRows # after the arguments, splsensors adds --ignore-gooey to sys.argv when imported
+
+    print('%10s %14s %14s' % ('rows', 'row by row [s]', 'one shot [s]'))
+    for n in args.rows:
+        rows = sensorRows(n)
+        new = timeit(appendRows, pd.DataFrame(columns=COL), rows)
+        old = '%14.3f' % timeit(rowByRow, rows) if n <= args.old_max else '%14s' % '-'
+        print('%10d %s %14.3f' % (n, old, new))
+
+if __name__ == '__main__':
+    main()
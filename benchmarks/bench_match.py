@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+# Session matching (matchSessions) against the per session scan of splsensors 0.3.8, synthetic surveys with sessions = files / 20
+# Run from the repository folder: python -m benchmarks.bench_match [--old-max 10000]
+
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+
+from tests import context
+
+def timeit(f, *args):
+    start = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = ArgumentParser(description='Benchmark of the sensors files / SPL sessions matching.')
+    parser.add_argument('--files', type=int, nargs='+', default=[1000, 10000, 100000], help='Number of sensors files.')
+    parser.add_argument('--old-max', type=int, default=10000, help='Largest number of files timed with the old scan (minutes at 100k).')
+    args = parser.parse_args()
+    # after the arguments, splsensors adds --ignore-gooey to sys.argv when imported
+    import splsensors
+    from tests.test_matchsessions import COL, oldMatchSessions, randomSurvey
+
+    rng = np.random.default_rng(0)
+    print('%10s %10s %12s %12s' % ('files', 'sessions', 'old [s]', 'new [s]'))
+    for nFiles in args.files:
+        dfSPL, dfSensors = randomSurvey(rng, max(nFiles // 20, 1), nFiles)
+        new = timeit(splsensors.matchSessions, dfSPL, dfSensors, 60, 'V1', 'MBES', COL)
+        old = '%12.3f' % timeit(oldMatchSessions, dfSPL, dfSensors, 60, 'V1', 'MBES') if nFiles <= args.old_max else '%12s' % '-'
+        print('%10d %10d %s %12.3f' % (nFiles, len(dfSPL), old, new))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Navigation pass of XTFReader on a synthetic 1 GB .xtf file: the per record loadNavigation and Vincenty loop of pyXTF 2.x (before)
+# against load_navigation_arrays and the vectorized computeSpeedFromArrays (after), and the per record API kept on top of them.
+# The before loop reads the packets with the readPacket of this tree (channels decoded with numpy), it is a lower bound of the old cost.
+# Run from the repository folder: python -m benchmarks.bench_xtf_nav [--size 1024] [--file big.xtf]
+# The file is generated in the temporary folder (removed at the end) unless --file is given, the cache is warm after the generation.
+
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import datetime
+
+import numpy as np
+
+from tests import context
+import geodetic
+from pyXTF import XTFReader, XTFNAVIGATIONRECORD
+from timehelpers import to_timestamp
+from benchmarks.synthetic_xtf import writeXTF
+
+def perRecordNavigation(fileName):
+    '''loadNavigation and computeSpeedFromPositions of pyXTF 2.x: every packet read, one datetime and one Vincenty call per ping'''
+    r = XTFReader(fileName)
+    navigation = []
+    while r.moreData():
+        pingHdr = r.readPacket()
+        if pingHdr != None:
+            d = datetime(pingHdr.Year, pingHdr.Month, pingHdr.Day, pingHdr.Hour, pingHdr.Minute, pingHdr.Second, pingHdr.HSeconds * 10000)
+            navigation.append(XTFNAVIGATIONRECORD(to_timestamp(d), d, pingHdr.PingNumber, pingHdr.SensorXcoordinate, pingHdr.SensorYcoordinate,
+                                                  pingHdr.SensorDepth, pingHdr.SensorPrimaryAltitude, pingHdr.SensorHeading, pingHdr.SensorSpeed))
+    r.close()
+    for i in range(len(navigation) - 1):
+        rng, bearing12, bearing21 = geodetic.calculateRangeBearingFromGeographicals(navigation[i].sensorX, navigation[i].sensorY,
+                                                                                    navigation[i + 1].sensorX, navigation[i + 1].sensorY)
+        navigation[i].sensorSpeed = rng / (navigation[i + 1].dateTime.timestamp() - navigation[i].dateTime.timestamp())
+    smoothSpeed = geodetic.medfilt(np.array([n.sensorSpeed for n in navigation]), 5)
+    for i in range(len(navigation) - 1):
+        navigation[i].sensorSpeed = float(smoothSpeed[i])
+    return np.array([n.sensorSpeed for n in navigation])
+
+def records(fileName):
+    '''the per record API: loadNavigation and computeSpeedFromPositions'''
+    r = XTFReader(fileName)
+    meanSpeed, navigation = r.computeSpeedFromPositions(r.loadNavigation())
+    r.close()
+    return np.array([n.sensorSpeed for n in navigation])
+
+def arrays(fileName):
+    '''load_navigation_arrays and computeSpeedFromArrays, the packet index is built (no sidecar)'''
+    r = XTFReader(fileName)
+    nav = r.load_navigation_arrays()
+    meanSpeed, speed = r.computeSpeedFromArrays(nav['x'], nav['y'], nav['timestamp'], nav['speed'])
+    r.close()
+    return speed
+
+def main():
+    parser = ArgumentParser(description='Benchmark of the XTF navigation loading and speed computation.')
+    parser.add_argument('--size', type=int, default=1024, help='Size of the synthetic file in MB.')
+    parser.add_argument('--file', help='Existing .xtf file to read (or where to keep the synthetic file).')
+    parser.add_argument('--modes', default='before,records,arrays', help='before (pyXTF 2.x loop), records (per record API), arrays.')
+    args = parser.parse_args()
+
+    fileName = args.file or os.path.join(tempfile.gettempdir(), 'bench_xtf_nav.xtf')
+    generated = not os.path.isfile(fileName)
+    if generated:
+        pingSize = writeXTF(fileName, 100) / 100 # 2 channels of 8000 samples, an attitude packet every 10 pings
+        print(f'Writing {fileName} ({args.size} MB)')
+        writeXTF(fileName, int(args.size * 1024 * 1024 / pingSize))
+    mb = os.path.getsize(fileName) / (1024 * 1024)
+    print(f'{fileName}: {mb:.0f} MB')
+    try:
+        print('%-8s %8s %8s %10s' % ('mode', 'pings', 'time [s]', 'MB/s'))
+        speeds = {}
+        for mode in args.modes.split(','):
+            start = time.perf_counter()
+            speeds[mode] = {'before': perRecordNavigation, 'records': records, 'arrays': arrays}[mode](fileName)
+            dt = time.perf_counter() - start
+            print('%-8s %8d %8.2f %10.0f' % (mode, len(speeds[mode]), dt, mb / dt))
+        # the vectorized Vincenty is the same as the per pair one, to float rounding
+        for mode, speed in speeds.items():
+            assert np.allclose(speed, next(iter(speeds.values())), rtol=1e-9, atol=1e-9), mode
+    finally:
+        if generated and not args.file:
+            os.remove(fileName)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# Synthetic Kongsberg .all files for the benchmarks: I, then per ping X (and D), P and A every 5 pings, Y every 2 pings, then i.
+# The checksums are valid, the values are random but plausible (EM2040, D alternating the EM300 and EM710 layouts).
+
+import struct
+
+import numpy as np
+
+STX, ETX = 2, 3
+X_BEAM = np.dtype([('z', '<f4'), ('y', '<f4'), ('x', '<f4'), ('w', '<u2'), ('q', 'u1'), ('a', 'i1'), ('d', 'u1'), ('c', 'i1'), ('r', '<i2')])
+
+def finish(body):
+    '''add ETX, checksum and the length of a datagram starting at STX'''
+    d = body + struct.pack('=BH', ETX, sum(body[1:]) & 0xFFFF)
+    return struct.pack('=L', len(d)) + d
+
+def header(typeOfDatagram, model, date, ms):
+    return struct.pack('=BBHLL', STX, ord(typeOfDatagram), model, date, ms)
+
+def installation(typeOfDatagram, date, ms):
+    text = b'WLZ=0.5,SMH=123,S1Z=1.2,OSX=0.0,PSV=1.2.3,DSV=4.5,'
+    return finish(header(typeOfDatagram, 2040, date, ms) + struct.pack('=3H', 1, 123, 0) + text)
+
+def position(date, ms, counter, latitude, longitude):
+    gga = b'$GPGGA,000000.00,0000.0000,S,00000.0000,W,1,10,1.0,0.0,M,0.0,M,,*00'
+    b = header('P', 2040, date, ms) + struct.pack('=HHll4HBB', counter, 123, int(latitude * 20000000), int(longitude * 10000000),
+                                                  10, 500, 9000, 9000, 0x81, len(gga)) + gga
+    if (len(b) + 7) % 2:
+        b += b'\x00'
+    return finish(b)
+
+def attitude(date, ms, counter, n=100):
+    b = header('A', 2040, date, ms) + struct.pack('=HHH', counter, 123, n)
+    b += b''.join(struct.pack('=HHhhhH', i * 10, 0, 100 + i, -50, 3, 9000) for i in range(n))
+    return finish(b + b'\x00')
+
+def xDepth(date, ms, counter, nBeams, rng):
+    b = header('X', 2040, date, ms) + struct.pack('=4Hf2Hf4B', counter, 123, 9000, 15000, 3.5, nBeams, nBeams, 12000.0, 0, 0, 0, 0)
+    beams = np.zeros(nBeams, dtype=X_BEAM)
+    beams['z'] = 50 + rng.random(nBeams)
+    beams['y'] = np.linspace(-100, 100, nBeams)
+    beams['x'] = rng.random(nBeams)
+    beams['w'], beams['q'], beams['a'], beams['r'] = 30, 5, 3, -250
+    if counter % 7 == 0:
+        beams['z'][3] = np.nan # seen in EM2040 files, decoded as 0
+    return finish(b + beams.tobytes() + b'\x01')
+
+def dDepth(model, date, ms, counter, nBeams, rng):
+    b = header('D', model, date, ms) + struct.pack('=HHHHHBBBBH', counter, 123, 9000, 15000, 350, nBeams, nBeams, 1, 1, 12000)
+    beams = np.zeros(nBeams, dtype=[('z', '<u2' if model < 700 else '<i2'), ('y', '<i2'), ('x', '<i2'), ('a', '<i2'), ('az', '<u2'),
+                                    ('r', '<u2'), ('q', 'u1'), ('w', 'u1'), ('rf', 'i1'), ('n', 'u1')])
+    beams['z'] = rng.integers(100, 30000, nBeams)
+    beams['y'] = rng.integers(-20000, 20000, nBeams)
+    beams['x'] = rng.integers(-100, 100, nBeams)
+    beams['a'] = rng.integers(-9000, 9000, nBeams)
+    beams['az'] = rng.integers(0, 36000, nBeams)
+    beams['r'] = rng.integers(0, 60000, nBeams)
+    beams['q'], beams['w'] = 5, 7
+    beams['rf'] = rng.integers(-120, 0, nBeams)
+    beams['n'] = np.arange(nBeams) % 256
+    return finish(b + beams.tobytes() + struct.pack('=b', 1))
+
+def seabedImage(date, ms, counter, nBeams, rng):
+    nSamples = rng.integers(5, 40, nBeams)
+    b = header('Y', 2040, date, ms) + struct.pack('=HHfHhhHHH', counter, 123, 12000.0, 100, -200, -300, 10, 15, nBeams)
+    b += b''.join(struct.pack('=bBHH', i % 100, 0, int(nSamples[i]), int(nSamples[i]) // 2) for i in range(nBeams))
+    b += rng.integers(-600, -100, int(nSamples.sum())).astype('<i2').tobytes()
+    return finish(b + b'\x00')
+
+def writeALL(fileName, pings, nBeams=400, withD=False, seed=1):
+    '''write a synthetic .all file of pings X datagrams (and D with withD), return its size in bytes'''
+    rng = np.random.default_rng(seed)
+    date = 20201210
+    size = 0
+    with open(fileName, 'wb') as f:
+        size += f.write(installation('I', date, 0))
+        for p in range(pings):
+            ms = 3600000 + p * 200
+            counter = p % 65536 # the ping counters wrap
+            if p % 5 == 0:
+                size += f.write(position(date, ms, p // 5 % 65536, -22.5 + p * 1e-6, -40.1 + p * 1e-6))
+                size += f.write(attitude(date, ms, p // 5 % 65536))
+            size += f.write(xDepth(date, ms, counter, nBeams, rng))
+            if withD:
+                size += f.write(dDepth(300 if p % 2 else 710, date, ms, counter, min(nBeams, 255), rng))
+            if p % 2 == 0:
+                size += f.write(seabedImage(date, ms, counter, nBeams, rng))
+        size += f.write(installation('i', date, 3600000 + pings * 200))
+    return size
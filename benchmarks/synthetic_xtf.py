@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Synthetic XTF sidescan files for the benchmarks: file header with 6 channel infos, then sonar packets (type 0) of 2 channels
+# with an attitude packet (type 3) every 10 pings. The pings are 10 Hz, the positions geographicals along a straight line.
+
+import struct
+
+import numpy as np
+
+MAGIC = 0xFACE
+FILE_HEADER = struct.Struct('=bb8s8s16sh64s64s3hbbhbbHf12b10bl12f')
+CHAN_INFO = struct.Struct('=bb3hl16s11fhb53s')
+PACKET_HEADER = struct.Struct('=Hbb3hL')
+PING_HEADER = struct.Struct('=h6bh2L2fL21f2d2h4b2f2d4h10fLfL4b2hBL7b')
+PING_CHAN_HEADER = struct.Struct('=2h5f5hLh2bLhf2bfh4b')
+PING_HEADER_TYPES = 'h' + 'b' * 6 + 'hLLffL' + 'f' * 21 + 'dd' + 'hh' + 'bbbb' + 'ff' + 'dd' + 'hhhh' + 'f' * 10 + 'LfL' + 'bbbb' + 'hhBL' + 'b' * 7
+
+def fileHeader(fileName, nChannels):
+    v = [0] * 53
+    v[0] = 123
+    v[2], v[3], v[4], v[6], v[7] = b'SYN', b'1.0', b'SYNSSS', b'synthetic', fileName.encode()[-60:]
+    v[8], v[9] = 3, nChannels # sonar type, number of sonar channels
+    return FILE_HEADER.pack(*v) + b''.join(CHAN_INFO.pack(0, c, 0, 1, 2, 0, b'CH%d' % c, *([0.0] * 11), 0, 0, b'') for c in range(6))
+
+def packet(headerType, numChansToFollow, body):
+    '''packet header and body padded to a multiple of 64 bytes'''
+    n = PACKET_HEADER.size + len(body)
+    n += (-n) % 64
+    return PACKET_HEADER.pack(MAGIC, headerType, 0, numChansToFollow, 0, 0, n) + body + b'\x00' * (n - PACKET_HEADER.size - len(body))
+
+def ping(p, nSamples, nChannels, rng):
+    hs = 360000 + p * 10 # 01:00:00 + 0.1 s per ping, in hundredths of second
+    day, hs = 10 + hs // 8640000, hs % 8640000
+    hour, r = divmod(hs, 360000)
+    minute, r = divmod(r, 6000)
+    second, hSeconds = divmod(r, 100)
+    f = [0] * len(PING_HEADER_TYPES)
+    f[0:7] = [2020, 12, day, hour, minute, second, hSeconds]
+    f[9] = 1000 + p # ping number
+    f[10] = 1500.0 # sound velocity
+    f[42] = 4.0 # speed
+    f[44], f[45] = -22.5 + p * 1e-5, -40.1 + p * 1.2e-5 # y (latitude), x (longitude)
+    f[52], f[53], f[57] = 30.0 + p % 5, 10.0 + p % 3 * 0.5, 45.0 + p % 7 # depth, altitude, heading
+    f = [float(v) if t in 'fd' else int(v) for v, t in zip(f, PING_HEADER_TYPES)]
+    chans = b''
+    for c in range(nChannels):
+        chans += PING_CHAN_HEADER.pack(c, 0, 75.0, 74.0, 0.0, 0.1, 0.1, 0, 400, 0, 0, 0, 0, 0, 0, 0, nSamples, 0, 0.0, 0, 0, 0.0, 0, 0, 0, 0, 0)
+        chans += rng.integers(0, 100, nSamples).astype('<u2').tobytes()
+    return packet(0, nChannels, PING_HEADER.pack(*f) + chans)
+
+def writeXTF(fileName, pings, nSamples=8000, nChannels=2, seed=1):
+    '''write a synthetic .xtf file of pings sonar packets, return its size in bytes'''
+    rng = np.random.default_rng(seed)
+    size = 0
+    with open(fileName, 'wb') as f:
+        size += f.write(fileHeader(fileName, nChannels))
+        for p in range(pings):
+            if p % 10 == 5:
+                size += f.write(packet(3, 0, b'\x00' * 50))
+            size += f.write(ping(p, nSamples, nChannels, rng))
+    return size
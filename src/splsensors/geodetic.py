@@ -79,6 +79,13 @@ def calculateRangeBearingFromGridPosition(easting1, northing1, easting2, northin
     return (math.sqrt((dx*dx)+(dy*dy)), bearing)
 
 
+def calculateRangeBearingFromGridPositionArrays(easting1, northing1, easting2, northing2):
+    """calculateRangeBearingFromGridPosition on numpy arrays of east, north pairs"""
+    dx = np.asarray(easting2) - np.asarray(easting1)
+    dy = np.asarray(northing2) - np.asarray(northing1)
+    bearing = 90 - (180/math.pi)*np.arctan2(dy, dx)
+    return (np.sqrt((dx*dx)+(dy*dy)), bearing)
+
 # taken frm http://gis.stackexchange.com/questions/76077/how-to-create-points-based-on-the-distance-and-bearing-from-a-survey-point
 def calculateGridPositionFromRangeBearing(easting, northing, distance, bearing):
     """given an east, north, range and bearing, compute a new coordinate on the grid"""
@@ -199,6 +206,91 @@ def calculateRangeBearingFromGeographicals(longitude1, latitude1,  longitude2,
 
    # END of Vincenty's Inverse formulae 
 
+def calculateRangeBearingFromGeographicalsArrays(longitude1, latitude1, longitude2, latitude2, maxIterations=200) :
+        """ 
+        Vincenty's Inverse formulae on numpy arrays of points, same results as calculateRangeBearingFromGeographicals for each pair.
+        Every pair keeps the values of the iteration where it converged, the loop stops when all the pairs converged (or after maxIterations).
+        lats, longs and azimuths are in decimal degrees, distance in metres 
+
+        Returns ( s, alpha1Tp2,  alpha21 ) as a tuple of arrays
+        """
+        f = 1.0 / 298.257223563		# WGS84
+        a = 6378137.0 			# metres
+
+        longitude1, latitude1, longitude2, latitude2 = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (longitude1, latitude1, longitude2, latitude2)])
+        samePoint = (np.abs( latitude2 - latitude1 ) < 1e-8) & ( np.abs( longitude2 - longitude1) < 1e-8 )
+
+        piD4   = math.atan( 1.0 )
+        two_pi = piD4 * 8.0
+
+        latitude1    = latitude1 * piD4 / 45.0
+        longitude1 = longitude1 * piD4 / 45.0
+        latitude2    = latitude2 * piD4 / 45.0
+        longitude2 = longitude2 * piD4 / 45.0
+
+        b = a * (1.0 - f)
+
+        U1 = np.arctan((1-f) * np.tan( latitude1 ))
+        U2 = np.arctan((1-f) * np.tan( latitude2 ))
+        sinU1, cosU1, sinU2, cosU2 = np.sin(U1), np.cos(U1), np.sin(U2), np.cos(U2)
+
+        omega = longitude2 - longitude1
+        lembda = omega.copy()
+        active = ~samePoint
+        sqr_sin_sigma = Sin_sigma = Cos_sigma = sigma = alpha = Cos2sigma_m = np.zeros(lembda.shape)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+                for iteration in range(maxIterations):
+                        if not active.any():
+                                break
+                        new_sqr_sin_sigma = (cosU2 * np.sin(lembda)) ** 2 + (cosU1 * sinU2 - sinU1 * cosU2 * np.cos(lembda)) ** 2
+                        new_Sin_sigma = np.sqrt( new_sqr_sin_sigma )
+                        new_Cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * np.cos(lembda)
+                        new_sigma = np.arctan2( new_Sin_sigma, new_Cos_sigma )
+                        new_alpha = np.arcsin( cosU1 * cosU2 * np.sin(lembda) / np.sin(new_sigma) )
+                        new_Cos2sigma_m = np.cos(new_sigma) - (2 * sinU1 * sinU2 / np.cos(new_alpha) ** 2 )
+                        C = (f/16) * np.cos(new_alpha) ** 2 * (4 + f * (4 - 3 * np.cos(new_alpha) ** 2))
+                        new_lembda = omega + (1-C) * f * np.sin(new_alpha) * (new_sigma + C * np.sin(new_sigma) * \
+                                (new_Cos2sigma_m + C * np.cos(new_sigma) * (-1 + 2 * new_Cos2sigma_m ** 2 )))
+
+                        # only the pairs still iterating are updated
+                        sqr_sin_sigma = np.where(active, new_sqr_sin_sigma, sqr_sin_sigma)
+                        Sin_sigma = np.where(active, new_Sin_sigma, Sin_sigma)
+                        Cos_sigma = np.where(active, new_Cos_sigma, Cos_sigma)
+                        sigma = np.where(active, new_sigma, sigma)
+                        alpha = np.where(active, new_alpha, alpha)
+                        Cos2sigma_m = np.where(active, new_Cos2sigma_m, Cos2sigma_m)
+                        last_lembda = lembda
+                        lembda = np.where(active, new_lembda, lembda)
+                        active = active & (lembda != 0) & (np.abs( (last_lembda - lembda)/lembda) > 1.0e-9)
+
+                u2 = np.cos(alpha) ** 2 * (a*a-b*b) / (b*b)
+
+                A = 1 + (u2/16384) * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+
+                B = (u2/1024) * (256 + u2 * (-128+ u2 * (74 - 47 * u2)))
+
+                delta_sigma = B * Sin_sigma * (Cos2sigma_m + (B/4) * \
+                        (Cos_sigma * (-1 + 2 * Cos2sigma_m ** 2 ) - \
+                        (B/6) * Cos2sigma_m * (-3 + 4 * sqr_sin_sigma) * \
+                        (-3 + 4 * Cos2sigma_m ** 2 )))
+
+                s = b * A * (sigma - delta_sigma)
+
+        alpha1Tp2 = np.arctan2( (cosU2 * np.sin(lembda)), (cosU1 * sinU2 - sinU1 * cosU2 * np.cos(lembda)))
+        alpha21 = np.arctan2( (cosU1 * np.sin(lembda)), (-sinU1 * cosU2 + cosU1 * sinU2 * np.cos(lembda)))
+
+        alpha1Tp2 = np.where(alpha1Tp2 < 0.0, alpha1Tp2 + two_pi, alpha1Tp2)
+        alpha1Tp2 = np.where(alpha1Tp2 > two_pi, alpha1Tp2 - two_pi, alpha1Tp2)
+
+        alpha21 = alpha21 + two_pi / 2.0
+        alpha21 = np.where(alpha21 < 0.0, alpha21 + two_pi, alpha21)
+        alpha21 = np.where(alpha21 > two_pi, alpha21 - two_pi, alpha21)
+
+        alpha1Tp2    = alpha1Tp2    * 45.0 / piD4
+        alpha21    = alpha21    * 45.0 / piD4
+        return np.where(samePoint, 0.0, s), np.where(samePoint, 0.0, alpha1Tp2), np.where(samePoint, 0.0, alpha21)
+
 
 #-------------------------------------------------------------------------------
 # Vincenty's Direct formulae							|
@@ -25,6 +25,9 @@ import os.path
 from glob import glob
 import fnmatch
 import shapefile
+from sidecar import loadSidecar, saveSidecar
+from timehelpers import to_timestamp, from_timestamp, dateToKongsbergDate, dateToKongsbergTime, dateToSecondsSinceMidnight
+from timehelpers import civilDatetime64, datetime64ToTimestamps
 
 def main():
 
@@ -166,24 +169,6 @@ def createSHP(fileName, geometrytype=shapefile.POLYLINE):
 		writer.autoBalance = 1
 	return writer
 
-###############################################################################
-# TIME HELPER FUNCTIONS
-###############################################################################
-def to_timestamp(dateObject):
-	return (dateObject - datetime(1970, 1, 1)).total_seconds()
-
-def from_timestamp(unixtime):
-	return datetime.utcfromtimestamp(unixtime)
-
-def dateToKongsbergDate(dateObject):
-	return dateObject.strftime('%Y%m%d')
-
-def dateToKongsbergTime(dateObject):
-	return dateObject.strftime('%H%M%S')
-
-def dateToSecondsSinceMidnight(dateObject):
-	return (dateObject - dateObject.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
-
 ###############################################################################	
 def update_progress(job_title, progress):
 	length = 20 # modify this to change the length
@@ -208,7 +193,7 @@ class XTFNAVIGATIONRECORD:
 		self.sensorSpeed = sensorSpeed
 		   
 class XTFPINGHEADER:
-	def __init__(self, fileptr, XTFFileHdr, SubChannelNumber, NumChansToFollow, NumBytesThisRecord):
+	def __init__(self, fileptr, XTFFileHdr, SubChannelNumber, NumChansToFollow, NumBytesThisRecord, lazy=False):
 		# start_time = time.time() # time the process
 
 		data = fileptr.read(XTFFileHdr.XTFPingHeader_len)
@@ -295,13 +280,40 @@ class XTFPINGHEADER:
 		# print("--- %s.sss header read duration ---" % (time.time() - start_time)) # print the processing time.
 
 		# now read the chaninfo records.  This is more complex than it needs to be, but for now, read six channels
+		# with lazy, only the position of the channels is kept and they are read on first use of pingChannel
 		# start_time = time.time() # time the process
-		self.pingChannel =[]
-		for i in range(NumChansToFollow):
-			ping = XTFPINGCHANHEADER(fileptr, XTFFileHdr, i)
-			self.pingChannel.append(ping)
+		self.NumChansToFollow = NumChansToFollow
+		self.channelOffset = fileptr.tell()
+		self._pingChannel = None
+		self._source = None
+		if lazy:
+			self._source = (fileptr, XTFFileHdr)
+		else:
+			self._pingChannel = self.readChannels(fileptr, XTFFileHdr)
 		# print("--- %s.sss sample read duration ---" % (time.time() - start_time)) # print the processing time.
 
+	def readChannels(self, fileptr, XTFFileHdr):
+		pingChannel = []
+		for i in range(self.NumChansToFollow):
+			ping = XTFPINGCHANHEADER(fileptr, XTFFileHdr, i)
+			pingChannel.append(ping)
+		return pingChannel
+
+	@property
+	def pingChannel(self):
+		'''the channel headers and samples, read from the file on first use for a lazy ping header. the file pointer is not moved'''
+		if self._pingChannel is None:
+			fileptr, XTFFileHdr = self._source
+			curr = fileptr.tell()
+			fileptr.seek(self.channelOffset, 0)
+			self._pingChannel = self.readChannels(fileptr, XTFFileHdr)
+			fileptr.seek(curr, 0)
+		return self._pingChannel
+
+	@pingChannel.setter
+	def pingChannel(self, pingChannel):
+		self._pingChannel = pingChannel
+
 	def __str__(self):
 		return (pprint.pformat(vars(self)))		
 				
@@ -339,29 +351,27 @@ class XTFPINGCHANHEADER:
 		self.ReservedSpace3				   = s[25]
 		self.ReservedSpace4				   = s[26]
 
-		if XTFFileHdr.XTFChanInfo[channelIndex].UniPolar == 0: #polar mean signed data
-			if XTFFileHdr.XTFChanInfo[channelIndex].BytesPerSample == 1: #1 byte per sample
-				XTFdata_fmt = '=' + str(self.NumSamples) + 'b'
-			else:
-				XTFdata_fmt = '=' + str(self.NumSamples) + 'h'				
-		else: # we are using unipolar data
-			if XTFFileHdr.XTFChanInfo[channelIndex].BytesPerSample == 1: #1 byte per sample
-				XTFdata_fmt = '=' + str(self.NumSamples) + 'B'
-			else:
-				XTFdata_fmt = '=' + str(self.NumSamples) + 'H'				
-			
-		#now read the sonar data
-		XTFdata_len = struct.calcsize(XTFdata_fmt)
-		XTFdata_unpack = struct.Struct(XTFdata_fmt).unpack_from
-		blob = fileptr.read(XTFdata_len)
-		self.data = XTFdata_unpack(blob)
-		# print ("XTFdata_len: ", XTFdata_len)
+		#now read the sonar data, a numpy array over the bytes read (int8/uint8/int16/uint16 from the channel info)
+		dtype = XTFFileHdr.XTFChanInfo[channelIndex].sampleDtype
+		blob = fileptr.read(dtype.itemsize * self.NumSamples)
+		self.data = np.frombuffer(blob, dtype=dtype, count=self.NumSamples)
 		
 		return
 		
 	def __str__(self):
 		return (pprint.pformat(vars(self)))		
 		
+def sampleDtype(UniPolar, BytesPerSample):
+	'''numpy dtype of the samples of a channel'''
+	if UniPolar == 0: #polar mean signed data
+		if BytesPerSample == 1: #1 byte per sample
+			return np.dtype('i1')
+		return np.dtype('<i2')
+	# we are using unipolar data
+	if BytesPerSample == 1: #1 byte per sample
+		return np.dtype('u1')
+	return np.dtype('<u2')
+
 class XTFCHANINFO:
 	def __init__(self, fileptr, XTFFileHdr):
 
@@ -388,6 +398,7 @@ class XTFCHANINFO:
 		self.BeamsPerArray					= s[18]
 		self.SampleFormat					 = s[19]
 		self.ReservedArea2					= s[20].decode('utf-8').rstrip('\x00')
+		self.sampleDtype					= sampleDtype(self.UniPolar, self.BytesPerSample)
 						
 	def __str__(self):
 		return (pprint.pformat(vars(self)))
@@ -458,11 +469,35 @@ class XTFFILEHDR:
 	def __str__(self):
 		return (pprint.pformat(vars(self)))
 
+###############################################################################
+# one row per packet. type is -1 for a truncated or corrupt packet at the end of the file, ping and timestamp (unix time) are only set for the sonar packets (type 0)
+XTF_INDEX_DTYPE = np.dtype([('type', '<i2'), ('offset', '<i8'), ('length', '<u4'), ('ping', '<u4'), ('timestamp', '<f8')])
+XTF_MAGIC_NUMBER = 0xFACE
+
+# the navigation fields of a sonar packet, offsets from the start of the packet (14 bytes packet header then the ping header '=h6bh2L2fL21f2d2h4b2f2d4h10fLfL4b2hBL7b')
+def pingHeaderOffset(prefix_fmt):
+	return struct.calcsize('=h2b3hL') + struct.calcsize('=' + prefix_fmt)
+
+XTF_NAVIGATION_DTYPE = np.dtype({
+	'names':	['MagicNumber', 'HeaderType', 'Year', 'Month', 'Day', 'Hour', 'Minute', 'Second', 'HSeconds', 'PingNumber', 'SensorSpeed', 'SensorYcoordinate', 'SensorXcoordinate',
+				'SensorDepth', 'SensorPrimaryAltitude', 'SensorHeading'],
+	'formats':	['<u2', 'u1', '<i2', 'i1', 'i1', 'i1', 'i1', 'i1', 'i1', '<u4', '<f4', '<f8', '<f8', '<f4', '<f4', '<f4'],
+	'offsets':	[0, 2, pingHeaderOffset(''), pingHeaderOffset('h'), pingHeaderOffset('hb'), pingHeaderOffset('h2b'), pingHeaderOffset('h3b'), pingHeaderOffset('h4b'),
+				pingHeaderOffset('h5b'), pingHeaderOffset('h6bhL'), pingHeaderOffset('h6bh2L2fL21f2d2h4b'), pingHeaderOffset('h6bh2L2fL21f2d2h4b2f'),
+				pingHeaderOffset('h6bh2L2fL21f2d2h4b2fd'), pingHeaderOffset('h6bh2L2fL21f2d2h4b2f2d4h2f'), pingHeaderOffset('h6bh2L2fL21f2d2h4b2f2d4h3f'),
+				pingHeaderOffset('h6bh2L2fL21f2d2h4b2f2d4h7f')],
+	'itemsize':	pingHeaderOffset('h6bh2L2fL21f2d2h4b2f2d4h10fLfL4b2hBL7b')})
+
 class XTFReader:
 	XTFPacketHeader_fmt = '=h2b3hL'
 	XTFPacketHeader_len = struct.calcsize(XTFPacketHeader_fmt)
 	XTFPacketHeader_unpack = struct.Struct(XTFPacketHeader_fmt).unpack_from
 
+	# packet header followed by the time and ping number of the ping header, used to build the index
+	XTFIndexHeader_fmt = '=HBB3hLh6bhLL'
+	XTFIndexHeader_len = struct.calcsize(XTFIndexHeader_fmt)
+	XTFIndexHeader_unpack = struct.Struct(XTFIndexHeader_fmt).unpack_from
+
 	def __init__(self, XTFfileName):
 		if not os.path.isfile(XTFfileName):
 			print ("file not found:", XTFfileName)
@@ -471,7 +506,13 @@ class XTFReader:
 		self.fileSize = self.fileptr.seek(0, 2)
 		# go back to start of file
 		self.fileptr.seek(0, 0)				
-		self.XTFFileHdr = XTFFILEHDR(self.fileptr)
+		try:
+			self.XTFFileHdr = XTFFILEHDR(self.fileptr)
+		except Exception:
+			self.fileptr.close() # the caller gets no reader to close
+			raise
+		self.firstPacketOffset = self.fileptr.tell()
+		self.index = None # packet index, see buildIndex()
 			
 	def __str__(self):
 		return pprint.pformat(vars(self))
@@ -480,9 +521,8 @@ class XTFReader:
 		self.fileptr.close()
 		
 	def rewind(self):
-		# go back to start of file
-		self.fileptr.seek(0, 0)				
-		self.XTFFileHdr = XTFFILEHDR(self.fileptr)
+		# go back to the first packet, the file header is already read
+		self.fileptr.seek(self.firstPacketOffset, 0)
 		
 	def moreData(self):
 		bytesRemaining = self.fileSize - self.fileptr.tell()
@@ -490,44 +530,77 @@ class XTFReader:
 		return bytesRemaining
 			
 	def loadNavigation(self):
-		navigation = []
+		'''one XTFNAVIGATIONRECORD per ping, built from load_navigation_arrays'''
 		start_time = time.time() # time the process
-		while self.moreData():
-			pingHdr = self.readPacket()
-			if pingHdr != None:
-				# we need to calculate the approximate speed, so need the ping interval
-				d = datetime (pingHdr.Year, pingHdr.Month, pingHdr.Day, pingHdr.Hour, pingHdr.Minute, pingHdr.Second, pingHdr.HSeconds * 10000)
-				r = XTFNAVIGATIONRECORD(to_timestamp(d), d, pingHdr.PingNumber, pingHdr.SensorXcoordinate, pingHdr.SensorYcoordinate, pingHdr.SensorDepth, pingHdr.SensorPrimaryAltitude, pingHdr.SensorHeading, pingHdr.SensorSpeed)
-				navigation.append(r)
-			
+		nav = self.load_navigation_arrays()
+		dateTimes = nav['time'].astype('datetime64[us]').tolist()
+		navigation = [XTFNAVIGATIONRECORD(*r) for r in zip(nav['timestamp'].tolist(), dateTimes, nav['ping'].tolist(), nav['x'].tolist(), nav['y'].tolist(),
+			nav['depth'].tolist(), nav['altitude'].tolist(), nav['heading'].tolist(), nav['speed'].tolist())]
 		self.rewind()
 		print("Get navigation Range Duration %.3fs" % (time.time() - start_time)) # print the processing time.
 		return (navigation)
-	
+
+	def load_navigation_arrays(self, asDataFrame=False):
+		'''loads the navigation of all the pings into numpy arrays: time (datetime64[ns]), timestamp (unix time), ping, x, y, depth, altitude, heading and speed (sensor values of the ping headers).
+		Only the navigation fields of each ping header are read, through the packet index (built without sidecar if needed). With asDataFrame, return a pandas DataFrame indexed by time'''
+		if self.index is None:
+			self.buildIndex(sidecar=False)
+		curr = self.fileptr.tell()
+		data = bytearray()
+		# the truncated packet at the end of the file still has its navigation if the ping header is complete
+		for offset in self.selectIndex([0, -1])['offset'].tolist():
+			self.fileptr.seek(offset, 0)
+			header = self.fileptr.read(XTF_NAVIGATION_DTYPE.itemsize)
+			if len(header) == XTF_NAVIGATION_DTYPE.itemsize:
+				data += header
+		self.fileptr.seek(curr, 0)
+		p = np.frombuffer(data, dtype=XTF_NAVIGATION_DTYPE)
+		p = p[(p['MagicNumber'] == XTF_MAGIC_NUMBER) & (p['HeaderType'] == 0)]
+
+		pingTime = civilDatetime64(p['Year'], p['Month'], p['Day'], p['Hour'], p['Minute'], p['Second'], p['HSeconds'].astype(np.int64) * 10000)
+		navigation = {
+			'time':			pingTime,
+			'timestamp':	pingTime.astype('datetime64[us]').astype(np.int64) / 1000000.0, # same value as to_timestamp
+			'ping':			p['PingNumber'],
+			'x':			p['SensorXcoordinate'],
+			'y':			p['SensorYcoordinate'],
+			'depth':		p['SensorDepth'],
+			'altitude':		p['SensorPrimaryAltitude'],
+			'heading':		p['SensorHeading'],
+			'speed':		p['SensorSpeed'],
+		}
+		if asDataFrame:
+			import pandas as pd
+			return pd.DataFrame(navigation).set_index('time')
+		return navigation
+
 	def computeSpeedFromPositions(self, navData):
-		if (navData[0].sensorX <= 180) & (navData[0].sensorY <= 90): #data is in geographicals
-			for r in range(len(navData) - 1):
-				rng, bearing12, bearing21 = geodetic.calculateRangeBearingFromGeographicals(navData[r].sensorX, navData[r].sensorY, navData[r+1].sensorX, navData[r+1].sensorY)			   
-				# now we have the range, comput the speed in metres/second. where speed = distance/time
-				navData[r].sensorSpeed = rng / (navData[r+1].dateTime.timestamp() - navData[r].dateTime.timestamp())			 
+		'''speed of each record from the distance and time to the next one, median filtered. the per record version of computeSpeedFromArrays'''
+		meanSpeed, speed = self.computeSpeedFromArrays([r.sensorX for r in navData], [r.sensorY for r in navData], [r.timestamp for r in navData],
+			[r.sensorSpeed for r in navData])
+		for r in range(len(navData) - 1):
+			navData[r].sensorSpeed = float (speed[r])
+		return meanSpeed, navData
+
+	def computeSpeedFromArrays(self, x, y, timestamp, speed):
+		'''return (mean speed, speed array): the speed in metres/second from each position to the next one, smoothed with a median filter.
+		the last position keeps its speed. the positions are geographicals if the first one looks like a longitude/latitude, else grid'''
+		x = np.asarray(x, dtype=np.float64)
+		y = np.asarray(y, dtype=np.float64)
+		speed = np.array(speed, dtype=np.float64)
+		if (x[0] <= 180) & (y[0] <= 90): #data is in geographicals
+			rng = geodetic.calculateRangeBearingFromGeographicalsArrays(x[:-1], y[:-1], x[1:], y[1:])[0]
 		else:
-			for r in range(len(navData) - 1):
-				rng, bearing12, bearing21 = geodetic.calculateRangeBearingFromGridPosition(navData[r].sensorX, navData[r].sensorY, navData[r+1].sensorX, navData[r+1].sensorY)			   
-				# now we have the range, comput the speed in metres/second. where speed = distance/time
-				navData[r].sensorSpeed = rng / (navData[r+1].dateTime.timestamp() - navData[r].dateTime.timestamp())			 
-				
-		# now smooth the sensorSpeed
-		speeds = [o.sensorSpeed for o in navData]
-		npspeeds=np.array(speeds)
-		
-		smoothSpeed = geodetic.medfilt(npspeeds, 5)
+			rng = geodetic.calculateRangeBearingFromGridPositionArrays(x[:-1], y[:-1], x[1:], y[1:])[0]
+		# now we have the range, comput the speed in metres/second. where speed = distance/time
+		speed[:-1] = rng / np.diff(np.asarray(timestamp, dtype=np.float64))
+
+		# now smooth the speed
+		smoothSpeed = geodetic.medfilt(speed, 5)
 		meanSpeed = float(np.mean(smoothSpeed))
-		
-		for r in range(len(navData) - 1):
-			navData[r].sensorSpeed = float (smoothSpeed[r])
+		speed[:-1] = smoothSpeed[:-1]
+		return meanSpeed, speed
 
-		return meanSpeed, navData
-		  
 	def readPacketheader(self):
 		data = self.fileptr.read(self.XTFPacketHeader_len)
 		s = self.XTFPacketHeader_unpack(data)
@@ -542,7 +615,9 @@ class XTFReader:
 
 		return HeaderType, SubChannelNumber, NumChansToFollow, NumBytesThisRecord
 
-	def readPacket(self):
+	def readPacket(self, lazy=False):
+		'''read the next packet, return the ping header of a sonar packet (None for the other packets).
+		with lazy the channels are not read, the file pointer goes straight to the next packet and the samples are read on first use of pingChannel'''
 		ping = None
 		# remember the start position, so we can easily comput the position of the next packet
 		currentPacketPosition = self.fileptr.tell()
@@ -550,11 +625,13 @@ class XTFReader:
 		# read the packet header.  This permits us to skip packets we do not support
 		HeaderType, SubChannelNumber, NumChansToFollow, NumBytesThisRecord = self.readPacketheader()
 		if HeaderType == 0:
-			ping = XTFPINGHEADER(self.fileptr, self.XTFFileHdr, SubChannelNumber, NumChansToFollow, NumBytesThisRecord)
+			ping = XTFPINGHEADER(self.fileptr, self.XTFFileHdr, SubChannelNumber, NumChansToFollow, NumBytesThisRecord, lazy)
 			
 			# now read the padbytes at the end of the packet
 			padBytes = currentPacketPosition + NumBytesThisRecord - self.fileptr.tell()
-			if padBytes > 0:
+			if lazy:
+				self.fileptr.seek(currentPacketPosition + NumBytesThisRecord, 0)
+			elif padBytes > 0:
 				data = self.fileptr.read(padBytes)
 		else:
 			# print ("unsupported packet type: %s at byte offset %s" % (HeaderType, currentPacketPosition))
@@ -562,6 +639,151 @@ class XTFReader:
 	
 		return ping
 	
+	def read_waterfall(self, channel):
+		'''return the samples of the channel (index in the ping) for all the pings of the file in a 2-D array (ping, sample).
+		the pings with less samples than the longest are padded with 0. only the headers and the samples of this channel are read'''
+		chanHeaderLength = self.XTFFileHdr.XTFPingChanHeader_len
+		chanHeaderUnpack = self.XTFFileHdr.XTFPingChanHeader_unpack
+		dtypes = [ci.sampleDtype for ci in self.XTFFileHdr.XTFChanInfo]
+		rows = []
+		self.rewind()
+		while self.moreData() >= self.XTFPacketHeader_len:
+			currentPacketPosition = self.fileptr.tell()
+			HeaderType, SubChannelNumber, NumChansToFollow, NumBytesThisRecord = self.readPacketheader()
+			if NumBytesThisRecord < self.XTFPacketHeader_len: # corrupt packet, we can not find the next one
+				break
+			if HeaderType == 0 and channel < NumChansToFollow:
+				# skip the ping header and the samples of the channels before the one we want
+				self.fileptr.seek(self.XTFFileHdr.XTFPingHeader_len, 1)
+				for i in range(channel + 1):
+					NumSamples = chanHeaderUnpack(self.fileptr.read(chanHeaderLength))[16]
+					if i < channel:
+						self.fileptr.seek(NumSamples * dtypes[i].itemsize, 1)
+				rows.append(np.frombuffer(self.fileptr.read(NumSamples * dtypes[channel].itemsize), dtype=dtypes[channel], count=NumSamples))
+			self.fileptr.seek(currentPacketPosition + NumBytesThisRecord, 0)
+		self.rewind()
+
+		waterfall = np.zeros((len(rows), max([len(row) for row in rows], default=0)), dtype=dtypes[channel])
+		for i, row in enumerate(rows):
+			waterfall[i, :len(row)] = row
+		return waterfall
+
+	def buildIndex(self, sidecar=True, folder=None):
+		'''one pass through the file to record the type, offset, length, ping number and time of every packet in a numpy structured array (XTF_INDEX_DTYPE).
+		Only the packet header and the first bytes of the ping header are read, the reader hops from packet to packet with NumBytesThisRecord.
+		The index is saved in a sidecar next to the file (or in folder) and reused while the file size and mtime do not change'''
+		if sidecar:
+			self.index = loadSidecar(self.fileName, '.idx', folder)
+			if self.index is not None:
+				return self.index
+
+		curr = self.fileptr.tell()
+		rows = []
+		offset = self.firstPacketOffset
+		while offset + self.XTFPacketHeader_len <= self.fileSize:
+			self.fileptr.seek(offset, 0)
+			data = self.fileptr.read(self.XTFIndexHeader_len)
+			if len(data) < self.XTFIndexHeader_len:
+				data = data + bytes(self.XTFIndexHeader_len - len(data))
+			s = self.XTFIndexHeader_unpack(data)
+			length = s[6]
+			# trap corrupt packets, we can not find the next packet after them
+			if s[0] != XTF_MAGIC_NUMBER or length < self.XTFPacketHeader_len or offset + length > self.fileSize:
+				rows.append((-1, offset, self.fileSize - offset, 0, 0, 0, 0, 0, 0, 0, 0))
+				break
+			rows.append((s[1], offset, length, s[16], s[7], s[8], s[9], s[10], s[11], s[12], s[13]))
+			offset += length
+		self.fileptr.seek(curr, 0)
+
+		rows = np.array(rows, dtype=np.int64).reshape(-1, 11)
+		self.index = np.zeros(len(rows), dtype=XTF_INDEX_DTYPE)
+		self.index['type'] = rows[:, 0]
+		self.index['offset'] = rows[:, 1]
+		self.index['length'] = rows[:, 2]
+		self.index['timestamp'] = np.nan
+		pings = rows[:, 0] == 0
+		self.index['ping'][pings] = rows[pings, 3]
+		p = rows[pings]
+		self.index['timestamp'][pings] = datetime64ToTimestamps(civilDatetime64(p[:, 4], p[:, 5], p[:, 6], p[:, 7], p[:, 8], p[:, 9], p[:, 10] * 10000))
+
+		if sidecar:
+			saveSidecar(self.fileName, '.idx', self.index, folder)
+		return self.index
+
+	def selectIndex(self, types=None, start=None, end=None):
+		'''return the rows of the index for the packet types (a list such as [0], None for all) between the start and end unix timestamps (sonar packets only). The index is built if needed'''
+		if self.index is None:
+			self.buildIndex()
+		index = self.index
+		if types is not None:
+			index = index[np.isin(index['type'], types)]
+		if start is not None:
+			index = index[index['timestamp'] >= start]
+		if end is not None:
+			index = index[index['timestamp'] <= end]
+		return index
+
+	def readPacketAt(self, offset, lazy=False):
+		'''move the file pointer to the packet at offset (from the index) and read it'''
+		self.fileptr.seek(offset, 0)
+		return self.readPacket(lazy)
+
+	def iterPings(self, lazy=False):
+		'''yield the ping headers. with the index built this is a direct seek to each sonar packet, else a walk from the current position'''
+		if self.index is not None:
+			for offset in self.selectIndex([0])['offset']:
+				yield self.readPacketAt(int(offset), lazy)
+			return
+		while self.moreData() >= self.XTFPacketHeader_len: # a lazy read can seek past the end of a truncated file
+			pingHdr = self.readPacket(lazy)
+			if pingHdr is not None:
+				yield pingHdr
+
+	def ping(self, pingNumber, lazy=False):
+		'''return the ping header of the ping number (the first sonar packet with this number), None if there is none'''
+		index = self.selectIndex([0])
+		rows = np.flatnonzero(index['ping'] == pingNumber)
+		if len(rows) == 0:
+			return None
+		return self.readPacketAt(int(index['offset'][rows[0]]), lazy)
+
+	def slice(self, start, end, lazy=False):
+		'''yield the ping headers between the start and end unix timestamps, seeking directly to their packets'''
+		for offset in self.selectIndex([0], start, end)['offset']:
+			yield self.readPacketAt(int(offset), lazy)
+
+	def readPingHeaderOnly(self):
+		'''read the 256 bytes ping header of the next packet and skip the channel data, use to get the time and navigation of the pings'''
+		return self.readPacket(lazy=True)
+
+	def readLastPingHeader(self, tailSize=65536, maxTailSize=4 * 1024 * 1024):
+		'''return the ping header (without the samples) of the last complete ping of the file, None if there is no ping.
+		The end of the file is searched backwards for the 0xFACE magic number of a sonar packet with a valid time, ending exactly at the end of the file or at the magic number of the next packet.
+		Only the last tailSize bytes are read, the block is enlarged if the last ping is larger, up to maxTailSize (None if no ping is found in it)'''
+		curr = self.fileptr.tell()
+		magic = struct.pack('<H', XTF_MAGIC_NUMBER)
+		pingHeaderLength = XTF_NAVIGATION_DTYPE.itemsize
+		while True:
+			tailSize = min(tailSize, maxTailSize)
+			blockStart = max(self.firstPacketOffset, self.fileSize - tailSize)
+			self.fileptr.seek(blockStart, 0)
+			block = self.fileptr.read(self.fileSize - blockStart)
+			# the last packet that can hold a complete ping header, then the ones before it
+			pos = block.rfind(magic, 0, len(block) - pingHeaderLength + 2) if len(block) >= pingHeaderLength else -1
+			while pos >= 0:
+				s = self.XTFIndexHeader_unpack(block, pos)
+				nextPacket = pos + s[6]
+				if s[1] == 0 and s[6] >= pingHeaderLength and 1 <= s[8] <= 12 and 1 <= s[9] <= 31 and 0 <= s[10] < 24 and 0 <= s[11] < 60 and 0 <= s[12] < 60 \
+						and 0 <= s[13] < 100 and (nextPacket == len(block) or block[nextPacket:nextPacket + 2] == magic):
+					ping = self.readPacketAt(blockStart + pos, lazy=True)
+					self.fileptr.seek(curr, 0)
+					return ping
+				pos = block.rfind(magic, 0, pos + 1)
+			if blockStart == self.firstPacketOffset or tailSize >= maxTailSize:
+				self.fileptr.seek(curr, 0)
+				return None
+			tailSize *= 4
+
 	# def readChannel(self):		
 	#	 return XTFPINGCHANHEADER()
 		 
@@ -9,12 +9,17 @@
 
 import ctypes
 import math
+import mmap
 import pprint
 import struct
 import os.path
 import time
 from datetime import datetime
 from datetime import timedelta
+import numpy as np
+from sidecar import loadSidecar, saveSidecar
+from timehelpers import to_timestamp, to_DateTime, from_timestamp, dateToKongsbergDate, dateToKongsbergTime, dateToSecondsSinceMidnight
+from timehelpers import kongsbergDateTimeKey, recordDatetime64, recordTimestamps
 
 def main():
 	#open the ALL file for reading by creating a new ALLReader class and passin in the filename to open.
@@ -120,34 +125,45 @@ def main():
 	print("Complete reading ALL file :-)")
 	r.close()
 
+###############################################################################
+# one row per datagram. type is empty for a truncated datagram at the end of the file (read as 'XXX'), time is in ms since midnight
+ALL_INDEX_DTYPE = np.dtype([('type', 'S1'), ('offset', '<i8'), ('length', '<u4'), ('date', '<u4'), ('time', '<u4')])
+
+###############################################################################
 class ALLReader:
 	'''class to read a Kongsberg EM multibeam .all file'''
 	ALLPacketHeader_fmt = '=LBBHLL'
 	ALLPacketHeader_len = struct.calcsize(ALLPacketHeader_fmt)
 	ALLPacketHeader_unpack = struct.Struct(ALLPacketHeader_fmt).unpack_from
+	checksumBlockSize = 16 * 1024 * 1024 # bytes of the file summed at once by checkIntegrity
 
-	def __init__(self, ALLfileName):
+	def __init__(self, ALLfileName, useMMAP=False):
 		if not os.path.isfile(ALLfileName):
 			print ("file not found:", ALLfileName)
 		self.fileName = ALLfileName
-		self.fileptr = open(ALLfileName, 'rb')
+		# with useMMAP the file is memory mapped, the reads are slices of the map (no syscall, no copy)
+		# the datagrams then hold memoryview instead of bytes, they stay valid after close (see MMAPFILE.close), use bytes() if a copy is needed
+		self.useMMAP = useMMAP
+		if useMMAP:
+			self.fileptr = MMAPFILE(ALLfileName)
+		else:
+			self.fileptr = open(ALLfileName, 'rb')
 		self.fileSize = os.path.getsize(ALLfileName)
 		self.recordDate = ""
 		self.recordTime = ""
 		self.recordCounter=0
+		self.index = None # datagram index, see buildIndex()
 
 	def __str__(self):
 		return pprint.pformat(vars(self))
 
 	def currentRecordDateTime(self):
 		'''return a python date object from the current datagram objects raw date and time fields '''
-		date_object = datetime.strptime(str(self.recordDate), '%Y%m%d') + timedelta(0,self.recordTime)
-		return date_object
+		return to_DateTime(self.recordDate, self.recordTime)
 
 	def to_DateTime(self, recordDate, recordTime):
 		'''return a python date object from a split date and time record'''
-		date_object = datetime.strptime(str(recordDate), '%Y%m%d') + timedelta(0,recordTime)
-		return date_object
+		return to_DateTime(recordDate, recordTime)
 
 	# def to_timestamp(self, dateObject):
 	#	 '''return a unix timestamp from a python date object'''
@@ -174,8 +190,12 @@ class ALLReader:
 		'''read the common header for any datagram'''
 		try:
 			curr = self.fileptr.tell()
-			data = self.fileptr.read(self.ALLPacketHeader_len)
-			s = self.ALLPacketHeader_unpack(data)
+			if self.useMMAP:
+				# decode in place, the file pointer does not move
+				s = self.ALLPacketHeader_unpack(self.fileptr.view, curr)
+			else:
+				data = self.fileptr.read(self.ALLPacketHeader_len)
+				s = self.ALLPacketHeader_unpack(data)
 
 			numberOfBytes= s[0]
 			STX			 = s[1]
@@ -187,7 +207,8 @@ class ALLReader:
 			self.recordTime = RecordTime
 
 			# now reset file pointer
-			self.fileptr.seek(curr, 0)
+			if not self.useMMAP:
+				self.fileptr.seek(curr, 0)
 
 			# we need to add 4 bytes as the message does not contain the 4 bytes used to hold the size of the message
 			# trap corrupt datagrams at the end of a file.  We see this in EM2040 systems.
@@ -208,11 +229,102 @@ class ALLReader:
 		self.fileptr.seek(curr, 0)
 		return data
 
+	def buildIndex(self, sidecar=True, folder=None):
+		'''one pass through the file to record the type, offset, length, date and time of every datagram in a numpy structured array (ALL_INDEX_DTYPE).
+		The index is saved in a sidecar next to the file (or in folder) and reused while the file size and mtime do not change.
+		Once built, the load methods seek directly to the datagrams they need instead of walking the whole file'''
+		if sidecar:
+			self.index = loadSidecar(self.fileName, '.idx', folder)
+			if self.index is not None:
+				return self.index
+
+		curr = self.fileptr.tell()
+		unpack = self.ALLPacketHeader_unpack
+		headerLength = self.ALLPacketHeader_len
+		rows = []
+		offset = 0
+		while offset + headerLength <= self.fileSize:
+			if self.useMMAP:
+				s = unpack(self.fileptr.view, offset)
+			else:
+				self.fileptr.seek(offset, 0)
+				s = unpack(self.fileptr.read(headerLength))
+			# we need to add 4 bytes as the message does not contain the 4 bytes used to hold the size of the message
+			length = s[0] + 4
+			typeOfDatagram = bytes((s[2],))
+			# trap corrupt datagrams at the end of a file, counted but never selected by type
+			if offset + length > self.fileSize:
+				length = self.fileSize - offset
+				typeOfDatagram = b''
+			rows.append((typeOfDatagram, offset, length, s[4], s[5]))
+			offset += length
+		self.fileptr.seek(curr, 0)
+		self.index = np.array(rows, dtype=ALL_INDEX_DTYPE)
+
+		if sidecar:
+			saveSidecar(self.fileName, '.idx', self.index, folder)
+		return self.index
+
+	def selectIndex(self, types=None, start=None, end=None):
+		'''return the rows of the index for the datagram types (a string such as 'P' or 'NXY', None for all) between the start and end unix timestamps. The index is built if needed'''
+		if self.index is None:
+			self.buildIndex()
+		index = self.index
+		if types is not None:
+			index = index[np.isin(index['type'], [t.encode() for t in types])]
+		if start is not None or end is not None:
+			timestamps = recordTimestamps(index['date'], index['time'])
+			selected = np.ones(len(index), dtype=bool)
+			if start is not None:
+				selected &= timestamps >= start
+			if end is not None:
+				selected &= timestamps <= end
+			index = index[selected]
+		return index
+
+	def readDatagramAt(self, offset):
+		'''move the file pointer to the datagram at offset (from the index) and read it'''
+		self.fileptr.seek(offset, 0)
+		return self.readDatagram()
+
+	def iter_datagrams(self, types=None, start=None, end=None):
+		'''yield (typeOfDatagram, datagram) for the datagrams of the given types (e.g. {'P', 'A'}, None for all) between the start and end unix timestamps.
+		Only the 20 bytes header of the other datagrams is read, they are skipped without creating an object. The datagrams are not decoded, call read() when needed.
+		With the index built this is a direct seek to each datagram, else a walk from the current position'''
+		if self.index is not None:
+			for offset in self.selectIndex(types, start, end)['offset']:
+				yield self.readDatagramAt(int(offset))
+			return
+
+		wanted = None if types is None else set(types)
+		# compare the kongsberg (date, seconds since midnight) of the header, no date conversion per datagram
+		startKey = None if start is None else kongsbergDateTimeKey(start)
+		endKey = None if end is None else kongsbergDateTimeKey(end)
+		while self.moreData():
+			curr = self.fileptr.tell()
+			numberOfBytes, STX, typeOfDatagram, EMModel, RecordDate, RecordTime = self.readDatagramHeader()
+			if numberOfBytes == 0: # less than a header left at the end of the file
+				break
+			nextDatagram = curr + numberOfBytes
+			if (wanted is None or typeOfDatagram in wanted) and \
+				(startKey is None or (RecordDate, RecordTime) >= startKey) and \
+				(endKey is None or (RecordDate, RecordTime) <= endKey):
+				self.recordCounter += 1
+				yield self.createDatagram(typeOfDatagram, numberOfBytes)
+			# the caller may have read the datagram, go to the next one whatever the file pointer is
+			self.fileptr.seek(nextDatagram, 0)
+
 	def getRecordCount(self):
 		'''read through the entire file as fast as possible to get a count of all records.  useful for progress bars so user can see what is happening'''
 		count = 0
 		start = 0
 		end = 0
+		if self.index is not None and len(self.index) > 0:
+			first = self.index[0]
+			last = self.index[-1]
+			start = to_timestamp(to_DateTime(int(first['date']), float(first['time']/1000.0)))
+			end = to_timestamp(to_DateTime(int(last['date']), float(last['time']/1000.0)))
+			return len(self.index), start, end
 		self.rewind()
 		numberOfBytes, STX, typeOfDatagram, EMModel, RecordDate, RecordTime = self.readDatagramHeader()
 		start = to_timestamp(to_DateTime(RecordDate, RecordTime))
@@ -225,64 +337,82 @@ class ALLReader:
 		end = to_timestamp(to_DateTime(RecordDate, RecordTime))
 		return count, start, end
 
+	def checkIntegrity(self, timeTolerance=1.0):
+		'''scan the whole file and return a dict with the number of datagrams, the datagrams with a wrong checksum, a wrong STX/ETX byte,
+		truncated at the end of the file, or with a time going back more than timeTolerance seconds, and the offset of the first bad datagram (-1 if none).
+		The checksum is the sum of the bytes between STX and ETX, all the datagrams are summed in one numpy call over the file.
+		The index is built (without sidecar) if needed, the file is memory mapped so it is never read whole in memory'''
+		if self.index is None:
+			self.buildIndex(sidecar=False)
+		index = self.index
+		if self.useMMAP:
+			data = np.frombuffer(self.fileptr.view, dtype=np.uint8)
+		elif self.fileSize > 0:
+			data = np.memmap(self.fileName, dtype=np.uint8, mode='r')
+		else:
+			data = np.zeros(0, dtype=np.uint8)
+		offset = index['offset']
+		length = index['length'].astype(np.int64)
+
+		# a datagram is the 20 bytes header (starting with the length and STX), the body, ETX(1) and checksum(2), anything shorter is corrupt
+		truncated = index['type'] == b''
+		framed = ~truncated & (length >= self.ALLPacketHeader_len + 3)
+		o = offset[framed]
+		l = length[framed]
+		badChecksum = np.zeros(len(index), dtype=bool)
+		badFrame = ~truncated & ~framed
+		if len(o) > 0:
+			bounds = np.empty(2 * len(o), dtype=np.int64)
+			bounds[0::2] = o + 5
+			bounds[1::2] = o + l - 3
+			# reduceat sums data[bounds[i]:bounds[i+1]], the odd results (between two datagrams) are dropped.
+			# it casts its input to uint64, so the file is summed by blocks of datagrams to keep the memory used small
+			sums = np.empty(len(o), dtype=np.uint64)
+			first = 0
+			while first < len(o):
+				last = max(int(np.searchsorted(o, o[first] + self.checksumBlockSize)), first + 1)
+				block = data[o[first]:o[last - 1] + l[last - 1]]
+				sums[first:last] = np.add.reduceat(block, bounds[2 * first:2 * last] - o[first], dtype=np.uint64)[0::2]
+				first = last
+			checksum = data[o + l - 2].astype(np.uint16) | (data[o + l - 1].astype(np.uint16) << 8)
+			badChecksum[framed] = (sums & 0xFFFF) != checksum
+			badFrame[framed] = (data[o + 4] != 2) | (data[o + l - 3] != 3)
+
+		# time going backward, the datagrams are not always in strict time order (PU and sensors), so a tolerance is allowed
+		backwards = np.zeros(len(index), dtype=bool)
+		valid = ~truncated & (index['date'] > 19700101) & (index['date'] < 30000101)
+		if valid.any():
+			timestamps = recordTimestamps(index['date'][valid], index['time'][valid])
+			backwards[valid] = timestamps < np.maximum.accumulate(timestamps) - timeTolerance
+
+		bad = badChecksum | badFrame | truncated | backwards
+		# bytes after the last datagram (less than a datagram header) are counted as a truncated datagram
+		end = int(offset[-1] + length[-1]) if len(index) > 0 else 0
+		trailing = end < self.fileSize
+		firstError = -1
+		if bad.any():
+			firstError = int(offset[np.argmax(bad)])
+		elif trailing:
+			firstError = end
+		return {'Datagrams': len(index), 'Checksum Errors': int(badChecksum.sum()), 'Bad STX/ETX': int(badFrame.sum()),
+				'Truncated': int(truncated.sum()) + int(trailing), 'Time Backwards': int(backwards.sum()), 'First Error Offset': firstError}
+
 	def readDatagram(self):
 		'''read the datagram header.  This permits us to skip datagrams we do not support'''
 		numberOfBytes, STX, typeOfDatagram, EMModel, RecordDate, RecordTime = self.readDatagramHeader()
 		self.recordCounter += 1
+		return self.createDatagram(typeOfDatagram, numberOfBytes)
 
-		if typeOfDatagram == '3': # 3_EXTRA PARAMETERS DECIMAL 51
-			dg = E_EXTRA(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'A': # A ATTITUDE
-			dg = A_ATTITUDE(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'C': # C Clock
-			dg = C_CLOCK(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'D': # D DEPTH
-			dg = D_DEPTH(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'f': # f Raw Range
-			dg = f_RAWRANGE(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'h': # h Height, not to be confused with H_Heading!
-			dg = h_HEIGHT(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'I': # I Installation (Start)
-			dg = I_INSTALLATION(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'i': # i Installation (Stop)
-			dg = I_INSTALLATION(self.fileptr, numberOfBytes)
-			dg.typeOfDatagram = 'i' #override with the install stop code
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'n': # n ATTITUDE
-			dg = n_ATTITUDE(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'N': # N Angle and Travel Time
-			dg = N_TRAVELTIME(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'O': # O_QUALITYFACTOR
-			dg = O_QUALITYFACTOR(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'R': # R_RUNTIME
-			dg = R_RUNTIME(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'P': # P Position
-			dg = P_POSITION(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'U': # U Sound Velocity
-			dg = U_SVP(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'X': # X Depth
-			dg = X_DEPTH(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		if typeOfDatagram == 'Y': # Y_SeabedImage
-			dg = Y_SEABEDIMAGE(self.fileptr, numberOfBytes)
-			return dg.typeOfDatagram, dg
-		else:
+	def createDatagram(self, typeOfDatagram, numberOfBytes):
+		'''create the datagram object at the file pointer, the file pointer is moved to the next datagram. Unsupported datagrams are UNKNOWN_RECORD'''
+		datagramClass = DATAGRAM_CLASSES.get(typeOfDatagram)
+		if datagramClass is None:
 			dg = UNKNOWN_RECORD(self.fileptr, numberOfBytes, typeOfDatagram)
 			return dg.typeOfDatagram, dg
-			# self.fileptr.seek(numberOfBytes, 1)
+		dg = datagramClass(self.fileptr, numberOfBytes)
+		dg.typeOfDatagram = typeOfDatagram # the i Installation (Stop) use the I class
+		return dg.typeOfDatagram, dg
+
 ###############################################################################
 	def loadInstallationRecords(self):
 		'''loads all the installation into lists'''
@@ -291,8 +421,7 @@ class ALLReader:
 		initialMode = None
 		datagram = None
 		self.rewind()
-		while self.moreData():
-			typeOfDatagram, datagram = self.readDatagram()
+		for typeOfDatagram, datagram in self.iter_datagrams('IiR'):
 			if (typeOfDatagram == 'I'):
 				installStart = self.readDatagramBytes(datagram.offset, datagram.numberOfBytes)
 				datagram.read()
@@ -308,9 +437,9 @@ class ALLReader:
 ###############################################################################
 	def loadCenterFrequency(self):
 		'''determine the central frequency of the first record in the file'''
+		centerFrequency = None
 		self.rewind()
-		while self.moreData():
-			typeOfDatagram, datagram = self.readDatagram()
+		for typeOfDatagram, datagram in self.iter_datagrams('N'):
 			if (typeOfDatagram == 'N'):
 				datagram.read()
 				centerFrequency = datagram.CentreFrequency[0]
@@ -323,8 +452,7 @@ class ALLReader:
 		navigation = []
 		selectedPositioningSystem = None
 		self.rewind()
-		while self.moreData():
-			typeOfDatagram, datagram = self.readDatagram()
+		for typeOfDatagram, datagram in self.iter_datagrams('P'):
 			if (typeOfDatagram == 'P'):
 				datagram.read()
 				recDate = self.currentRecordDateTime()
@@ -342,6 +470,70 @@ class ALLReader:
 		self.rewind()
 		return navigation
 
+###############################################################################
+	def readRecords(self, offsets, dtype):
+		'''return the fixed size record at each offset (the start of the datagrams) as one numpy structured array'''
+		data = b''.join([self.readDatagramBytes(int(offset), dtype.itemsize) for offset in offsets])
+		return np.frombuffer(data, dtype=dtype)
+
+	def load_navigation_arrays(self, asDataFrame=False):
+		'''loads all the navigation in one pass into numpy arrays: time (datetime64[ns]), latitude, longitude, quality, speed, course and heading.
+		Only the positioning system of the first P datagram is kept, as loadNavigation. With asDataFrame, return a pandas DataFrame indexed by time'''
+		self.rewind()
+		offsets = [datagram.offset for typeOfDatagram, datagram in self.iter_datagrams('P')]
+		self.rewind()
+		p = self.readRecords(offsets, P_RECORD_DTYPE)
+		if len(p) > 0:
+			p = p[p['Descriptor'] == p['Descriptor'][0]]
+		navigation = {
+			'time':			recordDatetime64(p['RecordDate'], p['Time']),
+			'latitude':		p['Latitude'] / 20000000.0,
+			'longitude':	p['Longitude'] / 10000000.0,
+			'quality':		p['Quality'] / 100.0,
+			'speed':		p['SpeedOverGround'] / 100.0,
+			'course':		p['CourseOverGround'] / 100.0,
+			'heading':		p['Heading'] / 100.0,
+		}
+		if asDataFrame:
+			return arraysToDataFrame(navigation)
+		return navigation
+
+	def load_attitude_arrays(self, typeOfDatagram='A', asDataFrame=False):
+		'''loads all the attitude entries of the A (or n network attitude) datagrams in one pass into numpy arrays: time (datetime64[ns]), roll, pitch, heave, heading and status (A only).
+		With asDataFrame, return a pandas DataFrame indexed by time'''
+		headers = []
+		entries = []
+		self.rewind()
+		for t, datagram in self.iter_datagrams(typeOfDatagram):
+			data = self.readDatagramBytes(datagram.offset, datagram.numberOfBytes)
+			if typeOfDatagram == 'A':
+				header = A_HEADER_unpack(data)
+				block = np.frombuffer(data, dtype=A_ENTRY_DTYPE, count=header[-1], offset=A_HEADER_LEN)
+			else:
+				header = n_HEADER_unpack(data)
+				block = np.array(n_ATTITUDE.readEntries(data, n_HEADER_LEN, header[-3]), dtype=A_ENTRY_DTYPE)
+			headers.append((header[4], header[5], len(block)))
+			entries.append(block)
+		self.rewind()
+
+		entries = np.concatenate(entries) if entries else np.zeros(0, dtype=A_ENTRY_DTYPE)
+		headers = np.array(headers, dtype=np.int64).reshape(-1, 3)
+		# the time of the entries is relative to the time of the datagram
+		recordDate = np.repeat(headers[:, 0], headers[:, 2])
+		recordTime = np.repeat(headers[:, 1], headers[:, 2]) + entries['Time']
+		attitude = {
+			'time':		recordDatetime64(recordDate, recordTime),
+			'roll':		entries['Roll'] / 100.0,
+			'pitch':	entries['Pitch'] / 100.0,
+			'heave':	entries['Heave'] / 100.0,
+			'heading':	entries['Heading'] / 100.0,
+		}
+		if typeOfDatagram == 'A':
+			attitude['status'] = entries['Status']
+		if asDataFrame:
+			return arraysToDataFrame(attitude)
+		return attitude
+
 	def getDatagramName(typeOfDatagram):
 		'''Convert the datagram type from the code to a user readable string.  Handy for displaying to the user'''
 		#Multibeam Data
@@ -413,6 +605,121 @@ class ALLReader:
 			return "B_BIST_Result"
 
 
+###############################################################################
+class MMAPFILE:
+	'''read only file object over a memory map. read() return a memoryview slice of the map so the datagram classes work unchanged without copying the data'''
+	def __init__(self, fileName):
+		self.fileptr = open(fileName, 'rb')
+		self.fileSize = os.fstat(self.fileptr.fileno()).st_size
+		if self.fileSize > 0:
+			self.mm = mmap.mmap(self.fileptr.fileno(), 0, access=mmap.ACCESS_READ)
+		else:
+			self.mm = b'' # an empty file can not be mapped
+		self.view = memoryview(self.mm)
+		self.ptr = 0
+
+	def tell(self):
+		return self.ptr
+
+	def seek(self, offset, whence=0):
+		if whence == 1:
+			offset += self.ptr
+		elif whence == 2:
+			offset += self.fileSize
+		self.ptr = max(offset, 0)
+		return self.ptr
+
+	def read(self, size=-1):
+		start = self.ptr
+		if size is None or size < 0:
+			size = self.fileSize
+		self.ptr = min(start + size, self.fileSize)
+		return self.view[start:self.ptr]
+
+	def close(self):
+		'''close the file, the map is unmapped now if nothing holds a slice of it.
+		The slices returned by read() (datagram bytes, numpy arrays over them) keep a reference to the map, so they stay valid after close:
+		the map is then unmapped by the garbage collector when the last one is deleted, use bytes() to keep a datagram without the map'''
+		try:
+			self.view.release()
+			self.mm.close()
+		except BufferError:
+			pass # slices of the map are still exported
+		except AttributeError:
+			pass # empty file
+		finally:
+			self.fileptr.close()
+
+###############################################################################
+class ALLWriter:
+	'''write datagrams to a new .all file as they come. the datagrams are not kept in memory, the file is written through a large buffer'''
+	copyBlockSize = 16 * 1024 * 1024 # bytes read at once by copyFile
+
+	def __init__(self, ALLfileName, bufferSize=8 * 1024 * 1024):
+		self.fileName = ALLfileName
+		self.fileptr = open(ALLfileName, 'wb', buffering=bufferSize)
+		self.datagramCount = 0
+		self.bytesWritten = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		'''close the file, the buffered datagrams are written'''
+		self.fileptr.close()
+
+	def write(self, fullDatagram, count=1):
+		'''write an encoded datagram (bytes, bytearray or memoryview of the map), or count raw datagrams copied in one block'''
+		self.fileptr.write(fullDatagram)
+		self.datagramCount += count
+		self.bytesWritten += len(fullDatagram)
+
+	def writeDatagram(self, datagram):
+		'''encode and write a datagram object read by ALLReader (D, X, f, Y...)'''
+		self.write(datagram.encode())
+
+	def copyBytes(self, reader, offset, byteCount, count):
+		'''copy byteCount raw bytes of the reader from offset, count datagrams, by blocks of copyBlockSize so the memory used does not depend on the run length'''
+		while byteCount > 0:
+			size = min(byteCount, self.copyBlockSize)
+			byteCount -= size
+			self.write(reader.readDatagramBytes(offset, size), count if byteCount == 0 else 0)
+			offset += size
+
+	def copyFile(self, reader, conditioners=None):
+		'''write all the datagrams of the ALLReader to the file, the datagrams of the types in conditioners {type: function(datagram) -> encoded datagram} are read,
+		passed to the function and the returned bytes written instead (None to drop the datagram). the runs of other datagrams are copied without decoding.
+		the runs are copied by blocks of copyBlockSize, use an ALLReader with useMMAP=True so the blocks are written straight from the map'''
+		if conditioners is None:
+			conditioners = {}
+		index = reader.index if reader.index is not None else reader.buildIndex(sidecar=False)
+		conditioned = np.isin(index['type'], [t.encode() for t in conditioners])
+		offsets = index['offset'].tolist()
+		lengths = index['length'].tolist()
+		runStart = None
+		runCount = 0
+		for i in range(len(index)):
+			if not conditioned[i]:
+				# extend the run of datagrams copied as they are
+				if runStart is None:
+					runStart = offsets[i]
+				runCount += 1
+				continue
+			if runStart is not None:
+				self.copyBytes(reader, runStart, offsets[i] - runStart, runCount)
+				runStart = None
+				runCount = 0
+			typeOfDatagram, datagram = reader.readDatagramAt(offsets[i])
+			datagram.read()
+			fullDatagram = conditioners[typeOfDatagram](datagram)
+			if fullDatagram is not None:
+				self.write(fullDatagram)
+		if runStart is not None:
+			self.copyBytes(reader, runStart, offsets[-1] + lengths[-1] - runStart, runCount)
+
 ###############################################################################
 class cBeam:
 	def __init__(self, beamDetail, angle):
@@ -503,6 +810,11 @@ class A_ATTITUDE_ENCODER:
 		return fullDatagram
 
 ###############################################################################
+# header '=LBBHLLHHH' and entries '=HHhhhH' of the A datagram
+A_HEADER_LEN = struct.calcsize('=LBBHLLHHH')
+A_HEADER_unpack = struct.Struct('=LBBHLLHHH').unpack_from
+A_ENTRY_DTYPE = np.dtype([('Time', '<u2'), ('Status', '<u2'), ('Roll', '<i2'), ('Pitch', '<i2'), ('Heave', '<i2'), ('Heading', '<u2')])
+
 class A_ATTITUDE:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'A'
@@ -531,18 +843,16 @@ class A_ATTITUDE:
 
 		rec_fmt = '=HHhhhH'
 		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
+		rec_iter_unpack = struct.Struct(rec_fmt).iter_unpack
 
 		# we need to store all the attitude data in a list
 		self.Attitude = [0 for i in range(self.NumberEntries)]
 
-		i = 0
-		while i < self.NumberEntries:
-			data = self.fileptr.read(rec_len)
-			s = rec_unpack(data)
+		# read all the entries at once and unpack them in place
+		data = self.fileptr.read(rec_len * self.NumberEntries)
+		for i, s in enumerate(rec_iter_unpack(data)):
 			# time,status,roll,pitch,heave,heading
 			self.Attitude[i] = [self.RecordDate, self.Time + float (s[0]/1000.0), s[1], s[2]/100.0, s[3]/100.0, s[4]/100.0, s[5]/100.0]
-			i = i + 1
 
 		rec_fmt = '=BBH'
 		rec_len = struct.calcsize(rec_fmt)
@@ -597,6 +907,11 @@ class C_CLOCK:
 		return s
 
 ###############################################################################
+# beam records of the D datagram, '=H3h2H2BbB' before the EM 700 models (unsigned depth), '=4h2H2BbB' after
+D_BEAM_FIELDS = ['Depth', 'AcrossTrackDistance', 'AlongTrackDistance', 'BeamDepressionAngle', 'BeamAzimuthAngle', 'Range', 'QualityFactor', 'LengthOfDetectionWindow', 'Reflectivity', 'BeamNumber']
+D_BEAM_DTYPE_EM300 = np.dtype(list(zip(D_BEAM_FIELDS, ['<u2', '<i2', '<i2', '<i2', '<u2', '<u2', 'u1', 'u1', 'i1', 'u1'])))
+D_BEAM_DTYPE = np.dtype(list(zip(D_BEAM_FIELDS, ['<i2', '<i2', '<i2', '<i2', '<u2', '<u2', 'u1', 'u1', 'i1', 'u1'])))
+
 class D_DEPTH:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'D'
@@ -630,48 +945,37 @@ class D_DEPTH:
 		self.XYResolution		= float (s[14] / float (100))
 		self.SampleFrequency	  = s[15]
 
-		self.Depth						= [0 for i in range(self.NBeams)]
-		self.AcrossTrackDistance		  = [0 for i in range(self.NBeams)]
-		self.AlongTrackDistance		= [0 for i in range(self.NBeams)]
-		self.BeamDepressionAngle		  = [0 for i in range(self.NBeams)]
-		self.BeamAzimuthAngle			 = [0 for i in range(self.NBeams)]
-		self.Range						= [0 for i in range(self.NBeams)]
-		self.QualityFactor				= [0 for i in range(self.NBeams)]
-		self.LengthOfDetectionWindow	  = [0 for i in range(self.NBeams)]
-		self.Reflectivity				 = [0 for i in range(self.NBeams)]
-		self.BeamNumber				= [0 for i in range(self.NBeams)]
-
-		# now read the variable part of the Record
+		# now read the variable part of the Record, all the beams at once with a numpy structured dtype
 		if self.EMModel < 700 :
-			rec_fmt = '=H3h2H2BbB'
+			beamDtype = D_BEAM_DTYPE_EM300
 		else:
-			rec_fmt = '=4h2H2BbB'
-		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
-
-		i = 0
-		while i < self.NBeams:
-			data = self.fileptr.read(rec_len)
-			s = rec_unpack(data)
-			self.Depth[i]					= float (s[0] / float (100))
-			self.AcrossTrackDistance[i]		= float (s[1] / float (100))
-			self.AlongTrackDistance[i]		= float (s[2] / float (100))
-			self.BeamDepressionAngle[i]		= float (s[3] / float (100))
-			self.BeamAzimuthAngle[i]		= float (s[4] / float (100))
-			self.Range[i]					= float (s[5] / float (100))
-			self.QualityFactor[i]			= s[6]
-			self.LengthOfDetectionWindow[i]	= s[7]
-			self.Reflectivity[i]			= float (s[8] / float (100))
-			self.BeamNumber[i]				= s[9]
-
-			# now do some sanity checks.  We have examples where the Depth and Across track values are NaN
-			if (math.isnan(self.Depth[i])):
-				self.Depth[i] = 0
-			if (math.isnan(self.AcrossTrackDistance[i])):
-				self.AcrossTrackDistance[i] = 0
-			if (math.isnan(self.AlongTrackDistance[i])):
-				self.AlongTrackDistance[i] = 0
-			i = i + 1
+			beamDtype = D_BEAM_DTYPE
+		data = self.fileptr.read(beamDtype.itemsize * self.NBeams)
+		beams = np.frombuffer(data, dtype=beamDtype, count=self.NBeams)
+
+		# numpy arrays of the beams, the lists are kept for the existing code
+		self.DepthArray					= beams['Depth'] / 100.0
+		self.AcrossTrackDistanceArray	= beams['AcrossTrackDistance'] / 100.0
+		self.AlongTrackDistanceArray	= beams['AlongTrackDistance'] / 100.0
+		self.BeamDepressionAngleArray	= beams['BeamDepressionAngle'] / 100.0
+		self.BeamAzimuthAngleArray		= beams['BeamAzimuthAngle'] / 100.0
+		self.RangeArray					= beams['Range'] / 100.0
+		self.QualityFactorArray			= beams['QualityFactor']
+		self.LengthOfDetectionWindowArray = beams['LengthOfDetectionWindow']
+		self.ReflectivityArray			= beams['Reflectivity'] / 100.0
+		self.BeamNumberArray			= beams['BeamNumber']
+
+		# the depths are integers in D datagrams, they can not be NaN
+		self.Depth						= self.DepthArray.tolist()
+		self.AcrossTrackDistance		= self.AcrossTrackDistanceArray.tolist()
+		self.AlongTrackDistance			= self.AlongTrackDistanceArray.tolist()
+		self.BeamDepressionAngle		= self.BeamDepressionAngleArray.tolist()
+		self.BeamAzimuthAngle			= self.BeamAzimuthAngleArray.tolist()
+		self.Range						= self.RangeArray.tolist()
+		self.QualityFactor				= self.QualityFactorArray.tolist()
+		self.LengthOfDetectionWindow	= self.LengthOfDetectionWindowArray.tolist()
+		self.Reflectivity				= self.ReflectivityArray.tolist()
+		self.BeamNumber					= self.BeamNumberArray.tolist()
 
 		rec_fmt = '=bBH'
 		rec_len = struct.calcsize(rec_fmt)
@@ -689,23 +993,20 @@ class D_DEPTH:
 		header_fmt = '=LBBHLLHHHHHBBBBH'
 		header_len = struct.calcsize(header_fmt)
 
-		fullDatagram = bytearray()
-
-		# now read the variable part of the Record
 		if self.EMModel < 700 :
-			rec_fmt = '=H3h2H2BbB'
+			beamDtype = D_BEAM_DTYPE_EM300
 		else:
-			rec_fmt = '=4h2H2BbB'
-		rec_len = struct.calcsize(rec_fmt)
+			beamDtype = D_BEAM_DTYPE
 
-		footer_fmt = '=BBH'
+		footer_fmt = '=bBH'
 		footer_len = struct.calcsize(footer_fmt)
 
-		fullDatagramByteCount = header_len + (rec_len*self.NBeams) + footer_len
+		fullDatagramByteCount = header_len + (beamDtype.itemsize*self.NBeams) + footer_len
+		fullDatagram = bytearray(fullDatagramByteCount)
 
 		# pack the header
 		recordTime = int(dateToSecondsSinceMidnight(from_timestamp(self.Time))*1000)
-		header = struct.pack(header_fmt,
+		struct.pack_into(header_fmt, fullDatagram, 0,
 			fullDatagramByteCount-4,
 			self.STX,
 			ord(self.typeOfDatagram),
@@ -722,34 +1023,24 @@ class D_DEPTH:
 			int(self.ZResolution * 100),
 			int(self.XYResolution * 100),
 			int(self.SampleFrequency))
-		fullDatagram = fullDatagram + header
-		header_fmt = '=LBBHLLHHHHHBBBBH'
 
-		# pack the beam summary info
-		for i in range (self.NBeams):
-			bodyRecord = struct.pack(rec_fmt,
-				int(self.Depth[i] * 100),
-				int(self.AcrossTrackDistance[i] * 100),
-				int(self.AlongTrackDistance[i] * 100),
-				int(self.BeamDepressionAngle[i] * 100),
-				int(self.BeamAzimuthAngle[i] * 100),
-				int(self.Range[i] * 100),
-				self.QualityFactor[i],
-				self.LengthOfDetectionWindow[i],
-				int(self.Reflectivity[i] * 100),
-				self.BeamNumber[i])
-			fullDatagram = fullDatagram + bodyRecord
-
-		tmp = struct.pack('=b', self.RangeMultiplier)
-		fullDatagram = fullDatagram + tmp
+		# pack the beam summary info, all the beams at once
+		offset = packBeams(fullDatagram, header_len, beamDtype, self.NBeams, {
+			'Depth': np.asarray(self.Depth) * 100,
+			'AcrossTrackDistance': np.asarray(self.AcrossTrackDistance) * 100,
+			'AlongTrackDistance': np.asarray(self.AlongTrackDistance) * 100,
+			'BeamDepressionAngle': np.asarray(self.BeamDepressionAngle) * 100,
+			'BeamAzimuthAngle': np.asarray(self.BeamAzimuthAngle) * 100,
+			'Range': np.asarray(self.Range) * 100,
+			'QualityFactor': self.QualityFactor,
+			'LengthOfDetectionWindow': self.LengthOfDetectionWindow,
+			'Reflectivity': np.asarray(self.Reflectivity) * 100,
+			'BeamNumber': self.BeamNumber})
+
+		struct.pack_into('=b', fullDatagram, offset, self.RangeMultiplier)
 
 		# now pack the footer
-		# systemDescriptor = 1
-		ETX = 3
-		checksum = sum(fullDatagram[5:]) % 65536
-		footer = struct.pack('=BH', ETX, checksum)
-		fullDatagram = fullDatagram + footer
-
+		packFooter(fullDatagram)
 		return fullDatagram
 
 ###############################################################################
@@ -799,6 +1090,12 @@ class E_EXTRA:
 		self.ETX, self.checksum = readFooter(self.numberOfBytes, self.fileptr)
 
 ###############################################################################
+# transmit sector '=hHLLLHBB' and recieve beam '=hHBbBBhH' records of the f datagram
+F_TX_DTYPE = np.dtype([('TiltAngle', '<i2'), ('FocusRange', '<u2'), ('SignalLength', '<u4'), ('SectorTransmitDelay', '<u4'), ('CentreFrequency', '<u4'),
+	('SignalBandwidth', '<u2'), ('SignalWaveformID', 'u1'), ('TransmitSectorNumberTX', 'u1')])
+F_RX_DTYPE = np.dtype([('BeamPointingAngle', '<i2'), ('TwoWayTravelTime', '<u2'), ('TransmitSectorNumber', 'u1'), ('Reflectivity', 'i1'), ('QualityFactor', 'u1'),
+	('DetectionWindow', 'u1'), ('BeamNumber', '<i2'), ('Spare', '<u2')])
+
 class f_RAWRANGE:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'f'
@@ -834,61 +1131,53 @@ class f_RAWRANGE:
 		self.Spare1					= s[14]
 		self.Spare2					= s[15]
 
-		self.TiltAngle						= [0 for i in range(self.NumTransmitSector)]
-		self.FocusRange						= [0 for i in range(self.NumTransmitSector)]
-		self.SignalLength					= [0 for i in range(self.NumTransmitSector)]
-		self.SectorTransmitDelay			= [0 for i in range(self.NumTransmitSector)]
-		self.CentreFrequency				= [0 for i in range(self.NumTransmitSector)]
+		# now read the variable part of the Transmit and recieve Records, all the sectors and beams at once with numpy structured dtypes
+		data = self.fileptr.read(F_TX_DTYPE.itemsize * self.NumTransmitSector)
+		tx = np.frombuffer(data, dtype=F_TX_DTYPE, count=self.NumTransmitSector)
+		bytesRead += F_TX_DTYPE.itemsize * self.NumTransmitSector
+		data = self.fileptr.read(F_RX_DTYPE.itemsize * self.NumReceiveBeams)
+		rx = np.frombuffer(data, dtype=F_RX_DTYPE, count=self.NumReceiveBeams)
+		bytesRead += F_RX_DTYPE.itemsize * self.NumReceiveBeams
+
+		# numpy arrays of the sectors and beams, the lists are kept for the existing code
+		self.TiltAngleArray					= tx['TiltAngle'] / 100.0
+		self.FocusRangeArray				= tx['FocusRange'] / 10.0
+		self.SignalLengthArray				= tx['SignalLength']
+		self.SectorTransmitDelayArray		= tx['SectorTransmitDelay']
+		self.CentreFrequencyArray			= tx['CentreFrequency']
+		self.SignalBandwidthArray			= tx['SignalBandwidth']
+		self.SignalWaveformIDArray			= tx['SignalWaveformID']
+		self.TransmitSectorNumberTXArray	= tx['TransmitSectorNumberTX']
+
+		self.BeamPointingAngleArray			= rx['BeamPointingAngle'] / 100.0
+		self.TwoWayTravelTimeArray			= rx['TwoWayTravelTime'] / (4 * self.SampleFrequency)
+		self.TransmitSectorNumberArray		= rx['TransmitSectorNumber']
+		self.ReflectivityArray				= rx['Reflectivity'] / 2.0
+		self.QualityFactorArray				= rx['QualityFactor']
+		self.DetectionWindowArray			= rx['DetectionWindow']
+		self.BeamNumberArray				= rx['BeamNumber']
+
+		self.TiltAngle						= self.TiltAngleArray.tolist()
+		self.FocusRange						= self.FocusRangeArray.tolist()
+		self.SignalLength					= self.SignalLengthArray.tolist()
+		self.SectorTransmitDelay			= self.SectorTransmitDelayArray.tolist()
+		self.CentreFrequency				= self.CentreFrequencyArray.tolist()
 		self.MeanAbsorption					= [0 for i in range(self.NumTransmitSector)]
-		self.SignalWaveformID				= [0 for i in range(self.NumTransmitSector)]
-		self.TransmitSectorNumberTX			= [0 for i in range(self.NumTransmitSector)]
-		self.SignalBandwidth				= [0 for i in range(self.NumTransmitSector)]
+		self.SignalWaveformID				= self.SignalWaveformIDArray.tolist()
+		self.TransmitSectorNumberTX			= self.TransmitSectorNumberTXArray.tolist()
+		self.SignalBandwidth				= self.SignalBandwidthArray.tolist()
 
-		self.BeamPointingAngle				= [0 for i in range(self.NumReceiveBeams)]
-		self.TransmitSectorNumber			= [0 for i in range(self.NumReceiveBeams)]
+		self.BeamPointingAngle				= self.BeamPointingAngleArray.tolist()
+		self.TransmitSectorNumber			= self.TransmitSectorNumberArray.tolist()
 		self.DetectionInfo					= [0 for i in range(self.NumReceiveBeams)]
-		self.DetectionWindow				= [0 for i in range(self.NumReceiveBeams)]
-		self.QualityFactor					= [0 for i in range(self.NumReceiveBeams)]
+		self.DetectionWindow				= self.DetectionWindowArray.tolist()
+		self.QualityFactor					= self.QualityFactorArray.tolist()
 		self.DCorr							= [0 for i in range(self.NumReceiveBeams)]
-		self.TwoWayTravelTime				= [0 for i in range(self.NumReceiveBeams)]
-		self.Reflectivity					= [0 for i in range(self.NumReceiveBeams)]
+		self.TwoWayTravelTime				= self.TwoWayTravelTimeArray.tolist()
+		self.Reflectivity					= self.ReflectivityArray.tolist()
 		self.RealtimeCleaningInformation	= [0 for i in range(self.NumReceiveBeams)]
 		self.Spare							= [0 for i in range(self.NumReceiveBeams)]
-		self.BeamNumber						= [0 for i in range(self.NumReceiveBeams)]
-
-		# # now read the variable part of the Transmit Record
-		rec_fmt = '=hHLLLHBB'
-		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
-		for i in range(self.NumTransmitSector):
-			data = self.fileptr.read(rec_len)
-			bytesRead += rec_len
-			s = rec_unpack(data)
-			self.TiltAngle[i]				= float (s[0]) / 100.0
-			self.FocusRange[i]				= s[1] / 10
-			self.SignalLength[i]			= s[2]
-			self.SectorTransmitDelay[i]		= s[3]
-			self.CentreFrequency[i]			= s[4]
-			self.SignalBandwidth[i] 		= s[5]
-			self.SignalWaveformID[i]		= s[6]
-			self.TransmitSectorNumberTX[i]	= s[7]
-
-		# now read the variable part of the recieve record
-		rx_rec_fmt = '=hHBbBBhH'
-		rx_rec_len = struct.calcsize(rx_rec_fmt)
-		rx_rec_unpack = struct.Struct(rx_rec_fmt).unpack
-
-		for i in range(self.NumReceiveBeams):
-			data = self.fileptr.read(rx_rec_len)
-			rx_s = rx_rec_unpack(data)
-			bytesRead += rx_rec_len
-			self.BeamPointingAngle[i]			= float (rx_s[0]) / 100.0
-			self.TwoWayTravelTime[i]			= float (rx_s[1]) / (4 * self.SampleFrequency)
-			self.TransmitSectorNumber[i]		= rx_s[2]
-			self.Reflectivity[i]				= rx_s[3] / 2.0
-			self.QualityFactor[i]				= rx_s[4]
-			self.DetectionWindow[i]				= rx_s[5]
-			self.BeamNumber[i]					= rx_s[6]
+		self.BeamNumber						= self.BeamNumberArray.tolist()
 
 		rec_fmt = '=BBH'
 		rec_len = struct.calcsize(rec_fmt)
@@ -907,24 +1196,15 @@ class f_RAWRANGE:
 		header_fmt = '=LBBHLLHH HHLl4H'
 		header_len = struct.calcsize(header_fmt)
 
-		fullDatagram = bytearray()
-
-		# # now read the variable part of the Transmit Record
-		rec_fmt = '=hHLLLHBB'
-		rec_len = struct.calcsize(rec_fmt)
-
-		# now read the variable part of the recieve record
-		rx_rec_fmt = '=hHBbBBhHB'
-		rx_rec_len = struct.calcsize(rx_rec_fmt)
-
-		footer_fmt = '=BH'
+		footer_fmt = '=BBH'
 		footer_len = struct.calcsize(footer_fmt)
 
-		fullDatagramByteCount = header_len + (rec_len*self.NumTransmitSector) + (rx_rec_len*self.NumReceiveBeams) + footer_len
+		fullDatagramByteCount = header_len + (F_TX_DTYPE.itemsize*self.NumTransmitSector) + (F_RX_DTYPE.itemsize*self.NumReceiveBeams) + footer_len
+		fullDatagram = bytearray(fullDatagramByteCount)
 
 		# pack the header
 		recordTime = int(dateToSecondsSinceMidnight(from_timestamp(self.Time))*1000)
-		header = struct.pack(header_fmt,
+		struct.pack_into(header_fmt, fullDatagram, 0,
 			fullDatagramByteCount-4,
 			self.STX,
 			ord(self.typeOfDatagram),
@@ -941,40 +1221,32 @@ class f_RAWRANGE:
 			self.MaxBeams,
 			self.Spare1,
 			self.Spare2)
-		fullDatagram = fullDatagram + header
 
-		for i in range (self.NumTransmitSector):
-			sectorRecord = struct.pack(rec_fmt,
-				int(self.TiltAngle[i] * 100),
-				int(self.FocusRange[i] * 10),
-				self.SignalLength[i],
-				self.SectorTransmitDelay[i],
-				self.CentreFrequency[i],
-				self.SignalBandwidth[i],
-				self.SignalWaveformID[i],
-				self.TransmitSectorNumberTX[i])
-			fullDatagram = fullDatagram + sectorRecord
-
-		# pack the beam summary info
-		for i in range (self.NumReceiveBeams):
-			bodyRecord = struct.pack(rx_rec_fmt,
-				int(self.BeamPointingAngle[i] * 100.0),
-				int(self.TwoWayTravelTime[i] * (4 * self.SampleFrequency)),
-				self.TransmitSectorNumber[i],
-				int(self.Reflectivity[i] * 2.0),
-				self.QualityFactor[i],
-				self.DetectionWindow[i],
-				self.BeamNumber[i],
-				self.Spare1,
-				systemDescriptor)
-			fullDatagram = fullDatagram + bodyRecord
+		# pack the transmit sectors and the recieve beams, all at once
+		offset = packBeams(fullDatagram, header_len, F_TX_DTYPE, self.NumTransmitSector, {
+			'TiltAngle': np.asarray(self.TiltAngle) * 100,
+			'FocusRange': np.asarray(self.FocusRange) * 10,
+			'SignalLength': self.SignalLength,
+			'SectorTransmitDelay': self.SectorTransmitDelay,
+			'CentreFrequency': self.CentreFrequency,
+			'SignalBandwidth': self.SignalBandwidth,
+			'SignalWaveformID': self.SignalWaveformID,
+			'TransmitSectorNumberTX': self.TransmitSectorNumberTX})
+
+		offset = packBeams(fullDatagram, offset, F_RX_DTYPE, self.NumReceiveBeams, {
+			'BeamPointingAngle': np.asarray(self.BeamPointingAngle) * 100.0,
+			'TwoWayTravelTime': np.asarray(self.TwoWayTravelTime) * (4 * self.SampleFrequency),
+			'TransmitSectorNumber': self.TransmitSectorNumber,
+			'Reflectivity': np.asarray(self.Reflectivity) * 2.0,
+			'QualityFactor': self.QualityFactor,
+			'DetectionWindow': self.DetectionWindow,
+			'BeamNumber': self.BeamNumber,
+			'Spare': np.full(self.NumReceiveBeams, self.Spare1)})
+
+		struct.pack_into('=B', fullDatagram, offset, systemDescriptor)
 
 		# now pack the footer
-		ETX = 3
-		checksum = sum(fullDatagram[5:]) % 65536
-		footer = struct.pack('=BH', ETX, checksum)
-		fullDatagram = fullDatagram + footer
-
+		packFooter(fullDatagram)
 		return fullDatagram
 
 ###############################################################################
@@ -1067,7 +1339,7 @@ class I_INSTALLATION:
 		totalAsciiBytes = self.numberOfBytes - rec_len; # we do not need to read the header twice
 		data = self.fileptr.read(totalAsciiBytes)# read the record from disc
 		bytesRead = bytesRead + totalAsciiBytes
-		parameters = data.decode('utf-8', errors="ignore").split(",")
+		parameters = bytes(data).decode('utf-8', errors="ignore").split(",")
 		self.installationParameters = {}
 		for p in parameters:
 			parts = p.split("=")
@@ -1080,6 +1352,12 @@ class I_INSTALLATION:
 			self.fileptr.read(int(self.numberOfBytes - bytesRead))
 
 ###############################################################################
+# header '=LBBHLLHHHbB' of the n datagram, the entries '=HhhhHB' are followed by the input telegram so they have a variable size
+n_HEADER_LEN = struct.calcsize('=LBBHLLHHHbB')
+n_HEADER_unpack = struct.Struct('=LBBHLLHHHbB').unpack_from
+n_ENTRY_LEN = struct.calcsize('=HhhhHB')
+n_ENTRY_unpack = struct.Struct('=HhhhHB').unpack_from
+
 class n_ATTITUDE:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'n'
@@ -1121,7 +1399,8 @@ class n_ATTITUDE:
 
 			inputTelegramSize = s[5]
 			data = self.fileptr.read(inputTelegramSize)
-			self.Attitude[i] = [self.RecordDate, self.Time + s[0]/1000, s[1], s[2]/100.0, s[3]/100.0, s[4]/100.0, s[5]/100.0, data]
+			# time, roll, pitch, heave, heading, input telegram size, input telegram
+			self.Attitude[i] = [self.RecordDate, self.Time + s[0]/1000, s[1]/100.0, s[2]/100.0, s[3]/100.0, s[4]/100.0, s[5], data]
 			i = i + 1
 
 		# # now spare byte only if necessary
@@ -1134,7 +1413,23 @@ class n_ATTITUDE:
 		# now read the footer
 		self.ETX, self.checksum = readFooter(self.numberOfBytes, self.fileptr)
 
+	@staticmethod
+	def readEntries(data, offset, numberEntries):
+		'''return the (time, 0, roll, pitch, heave, heading) raw values of the entries in data from offset, in the A_ENTRY_DTYPE order (n has no status). The input telegrams are skipped'''
+		entries = []
+		for i in range(numberEntries):
+			s = n_ENTRY_unpack(data, offset)
+			entries.append((s[0], 0, s[1], s[2], s[3], s[4]))
+			offset += n_ENTRY_LEN + s[5]
+		return entries
+
 ###############################################################################
+# transmit sector '=hHfffHBBf' and recieve beam '=hBBHBbfhbB' records of the N datagram
+N_TX_DTYPE = np.dtype([('TiltAngle', '<i2'), ('FocusRange', '<u2'), ('SignalLength', '<f4'), ('SectorTransmitDelay', '<f4'), ('CentreFrequency', '<f4'),
+	('MeanAbsorption', '<u2'), ('SignalWaveformID', 'u1'), ('TransmitSectorNumberTX', 'u1'), ('SignalBandwidth', '<f4')])
+N_RX_DTYPE = np.dtype([('BeamPointingAngle', '<i2'), ('TransmitSectorNumber', 'u1'), ('DetectionInfo', 'u1'), ('DetectionWindow', '<u2'), ('QualityFactor', 'u1'),
+	('DCorr', 'i1'), ('TwoWayTravelTime', '<f4'), ('Reflectivity', '<i2'), ('RealtimeCleaningInformation', 'i1'), ('Spare', 'u1')])
+
 class N_TRAVELTIME:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'N'
@@ -1167,64 +1462,56 @@ class N_TRAVELTIME:
 		self.SampleFrequency = float (s[12])
 		self.DScale		  = s[13]
 
-		self.TiltAngle					= [0 for i in range(self.NumTransmitSector)]
-		self.FocusRange				= [0 for i in range(self.NumTransmitSector)]
-		self.SignalLength				 = [0 for i in range(self.NumTransmitSector)]
-		self.SectorTransmitDelay		  = [0 for i in range(self.NumTransmitSector)]
-		self.CentreFrequency			  = [0 for i in range(self.NumTransmitSector)]
-		self.MeanAbsorption			= [0 for i in range(self.NumTransmitSector)]
-		self.SignalWaveformID			 = [0 for i in range(self.NumTransmitSector)]
-		self.TransmitSectorNumberTX	= [0 for i in range(self.NumTransmitSector)]
-		self.SignalBandwidth			  = [0 for i in range(self.NumTransmitSector)]
-
-		self.BeamPointingAngle			= [0 for i in range(self.NumReceiveBeams)]
-		self.TransmitSectorNumber		 = [0 for i in range(self.NumReceiveBeams)]
-		self.DetectionInfo				= [0 for i in range(self.NumReceiveBeams)]
-		self.DetectionWindow			  = [0 for i in range(self.NumReceiveBeams)]
-		self.QualityFactor				= [0 for i in range(self.NumReceiveBeams)]
-		self.DCorr						= [0 for i in range(self.NumReceiveBeams)]
-		self.TwoWayTravelTime			 = [0 for i in range(self.NumReceiveBeams)]
-		self.Reflectivity				 = [0 for i in range(self.NumReceiveBeams)]
-		self.RealtimeCleaningInformation  = [0 for i in range(self.NumReceiveBeams)]
-		self.Spare						= [0 for i in range(self.NumReceiveBeams)]
-
-		# # now read the variable part of the Transmit Record
-		rec_fmt = '=hHfffHBBf'
-		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
-		for i in range(self.NumTransmitSector):
-			data = self.fileptr.read(rec_len)
-			bytesRead += rec_len
-			s = rec_unpack(data)
-			self.TiltAngle[i] = float (s[0]) / float (100)
-			self.FocusRange[i] =  s[1]
-			self.SignalLength[i] = float (s[2])
-			self.SectorTransmitDelay[i] = float(s[3])
-			self.CentreFrequency[i] =  float (s[4])
-			self.MeanAbsorption[i] =  s[5]
-			self.SignalWaveformID[i] = s[6]
-			self.TransmitSectorNumberTX[i] =  s[7]
-			self.SignalBandwidth[i] = float (s[8])
-
-		# now read the variable part of the recieve record
-		rx_rec_fmt = '=hBBHBbfhbB'
-		rx_rec_len = struct.calcsize(rx_rec_fmt)
-		rx_rec_unpack = struct.Struct(rx_rec_fmt).unpack
-
-		for i in range(self.NumReceiveBeams):
-			data = self.fileptr.read(rx_rec_len)
-			rx_s = rx_rec_unpack(data)
-			bytesRead += rx_rec_len
-			self.BeamPointingAngle[i] = float (rx_s[0]) / float (100)
-			self.TransmitSectorNumber[i] = rx_s[1]
-			self.DetectionInfo[i] = rx_s[2]
-			self.DetectionWindow[i] = rx_s[3]
-			self.QualityFactor[i] = rx_s[4]
-			self.DCorr[i] = rx_s[5]
-			self.TwoWayTravelTime[i] = float (rx_s[6])
-			self.Reflectivity[i] = rx_s[7]
-			self.RealtimeCleaningInformation[i] = rx_s[8]
-			self.Spare[i]					= rx_s[9]
+		# now read the variable part of the Transmit and recieve Records, all the sectors and beams at once with numpy structured dtypes
+		data = self.fileptr.read(N_TX_DTYPE.itemsize * self.NumTransmitSector)
+		tx = np.frombuffer(data, dtype=N_TX_DTYPE, count=self.NumTransmitSector)
+		bytesRead += N_TX_DTYPE.itemsize * self.NumTransmitSector
+		data = self.fileptr.read(N_RX_DTYPE.itemsize * self.NumReceiveBeams)
+		rx = np.frombuffer(data, dtype=N_RX_DTYPE, count=self.NumReceiveBeams)
+		bytesRead += N_RX_DTYPE.itemsize * self.NumReceiveBeams
+
+		# numpy arrays of the sectors and beams, the lists are kept for the existing code
+		self.TiltAngleArray				= tx['TiltAngle'] / 100.0
+		self.FocusRangeArray			= tx['FocusRange']
+		self.SignalLengthArray			= tx['SignalLength'].astype(np.float64)
+		self.SectorTransmitDelayArray	= tx['SectorTransmitDelay'].astype(np.float64)
+		self.CentreFrequencyArray		= tx['CentreFrequency'].astype(np.float64)
+		self.MeanAbsorptionArray		= tx['MeanAbsorption']
+		self.SignalWaveformIDArray		= tx['SignalWaveformID']
+		self.TransmitSectorNumberTXArray = tx['TransmitSectorNumberTX']
+		self.SignalBandwidthArray		= tx['SignalBandwidth'].astype(np.float64)
+
+		self.BeamPointingAngleArray		= rx['BeamPointingAngle'] / 100.0
+		self.TransmitSectorNumberArray	= rx['TransmitSectorNumber']
+		self.DetectionInfoArray			= rx['DetectionInfo']
+		self.DetectionWindowArray		= rx['DetectionWindow']
+		self.QualityFactorArray			= rx['QualityFactor']
+		self.DCorrArray					= rx['DCorr']
+		self.TwoWayTravelTimeArray		= rx['TwoWayTravelTime'].astype(np.float64)
+		self.ReflectivityArray			= rx['Reflectivity']
+		self.RealtimeCleaningInformationArray = rx['RealtimeCleaningInformation']
+		self.SpareArray					= rx['Spare']
+
+		self.TiltAngle					= self.TiltAngleArray.tolist()
+		self.FocusRange					= self.FocusRangeArray.tolist()
+		self.SignalLength				= self.SignalLengthArray.tolist()
+		self.SectorTransmitDelay		= self.SectorTransmitDelayArray.tolist()
+		self.CentreFrequency			= self.CentreFrequencyArray.tolist()
+		self.MeanAbsorption				= self.MeanAbsorptionArray.tolist()
+		self.SignalWaveformID			= self.SignalWaveformIDArray.tolist()
+		self.TransmitSectorNumberTX		= self.TransmitSectorNumberTXArray.tolist()
+		self.SignalBandwidth			= self.SignalBandwidthArray.tolist()
+
+		self.BeamPointingAngle			= self.BeamPointingAngleArray.tolist()
+		self.TransmitSectorNumber		= self.TransmitSectorNumberArray.tolist()
+		self.DetectionInfo				= self.DetectionInfoArray.tolist()
+		self.DetectionWindow			= self.DetectionWindowArray.tolist()
+		self.QualityFactor				= self.QualityFactorArray.tolist()
+		self.DCorr						= self.DCorrArray.tolist()
+		self.TwoWayTravelTime			= self.TwoWayTravelTimeArray.tolist()
+		self.Reflectivity				= self.ReflectivityArray.tolist()
+		self.RealtimeCleaningInformation = self.RealtimeCleaningInformationArray.tolist()
+		self.Spare						= self.SpareArray.tolist()
 
 		rec_fmt = '=BBH'
 		rec_len = struct.calcsize(rec_fmt)
@@ -1338,6 +1625,11 @@ class O_QUALITYFACTOR:
 
 
 ###############################################################################
+# fixed part '=LBBHLLHHll4HBB' of the P datagram
+P_RECORD_DTYPE = np.dtype([('numberOfBytes', '<u4'), ('STX', 'u1'), ('typeOfDatagram', 'u1'), ('EMModel', '<u2'), ('RecordDate', '<u4'), ('Time', '<u4'),
+	('Counter', '<u2'), ('SerialNumber', '<u2'), ('Latitude', '<i4'), ('Longitude', '<i4'), ('Quality', '<u2'), ('SpeedOverGround', '<u2'),
+	('CourseOverGround', '<u2'), ('Heading', '<u2'), ('Descriptor', 'u1'), ('NBytesDatagram', 'u1')])
+
 class P_POSITION:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'P'	# assign the KM code for this datagram type
@@ -1408,6 +1700,31 @@ def readFooter(numberOfBytes, fileptr):
 
 		return ETX, checksum
 
+def packBeams(fullDatagram, offset, dtype, count, fields):
+	'''write count records of the numpy structured dtype at offset of the preallocated datagram buffer, return the offset after them.
+	fields is {field name: values}. The values of the integer fields are truncated as int() does, a value out of the field range raises struct.error as struct.pack does'''
+	if count == 0:
+		return offset
+	records = np.frombuffer(fullDatagram, dtype=dtype, count=count, offset=offset)
+	for name, values in fields.items():
+		fieldType = dtype.fields[name][0]
+		values = np.asarray(values)
+		if fieldType.kind in 'iu':
+			if values.dtype.kind == 'f':
+				values = np.trunc(values)
+			info = np.iinfo(fieldType)
+			if not (info.min <= values.min() and values.max() <= info.max): # NaN fails too
+				raise struct.error('%s out of the %s range' % (name, fieldType))
+		records[name] = values
+	return offset + dtype.itemsize * count
+
+def packFooter(fullDatagram):
+	'''write ETX and the checksum (sum of the bytes between STX and ETX) in the last 3 bytes of the datagram buffer'''
+	ETX = 3
+	body = np.frombuffer(fullDatagram, dtype=np.uint8, count=len(fullDatagram) - 8, offset=5)
+	checksum = int(body.sum()) % 65536
+	struct.pack_into('=BH', fullDatagram, len(fullDatagram) - 3, ETX, checksum)
+
 ##############################################################################
 class P_POSITION_ENCODER:
 	def __init__(self):
@@ -1725,6 +2042,10 @@ class U_SVP:
 
 
 ###############################################################################
+# beam records of the X datagram, '=fffHBBBbh'
+X_BEAM_DTYPE = np.dtype([('Depth', '<f4'), ('AcrossTrackDistance', '<f4'), ('AlongTrackDistance', '<f4'), ('DetectionWindowsLength', '<u2'), ('QualityFactor', 'u1'),
+	('BeamIncidenceAngleAdjustment', 'i1'), ('DetectionInformation', 'u1'), ('RealtimeCleaningInformation', 'i1'), ('Reflectivity', '<i2')])
+
 class X_DEPTH:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'X'
@@ -1761,40 +2082,31 @@ class X_DEPTH:
 		self.spare2				 = s[16]
 		self.spare3				 = s[17]
 
-		self.Depth						= [0 for i in range(self.NBeams)]
-		self.AcrossTrackDistance		  = [0 for i in range(self.NBeams)]
-		self.AlongTrackDistance		= [0 for i in range(self.NBeams)]
-		self.DetectionWindowsLength	= [0 for i in range(self.NBeams)]
-		self.QualityFactor				= [0 for i in range(self.NBeams)]
-		self.BeamIncidenceAngleAdjustment = [0 for i in range(self.NBeams)]
-		self.DetectionInformation		 = [0 for i in range(self.NBeams)]
-		self.RealtimeCleaningInformation= [0 for i in range(self.NBeams)]
-		self.Reflectivity				 = [0 for i in range(self.NBeams)]
-
-		# # now read the variable part of the Record
-		rec_fmt = '=fffHBBBbh'
-		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
-		for i in range(self.NBeams):
-			data = self.fileptr.read(rec_len)
-			s = rec_unpack(data)
-			self.Depth[i] = s[0]
-			self.AcrossTrackDistance[i] =  s[1]
-			self.AlongTrackDistance[i] = s[2]
-			self.DetectionWindowsLength[i] = s[3]
-			self.QualityFactor[i] =  s[4]
-			self.BeamIncidenceAngleAdjustment[i] =  float (s[5] / 10)
-			self.DetectionInformation[i] = s[6]
-			self.RealtimeCleaningInformation[i] =  s[7]
-			self.Reflectivity[i] = float (s[8] / 10)
-
-			# now do some sanity checks.  We have examples where the Depth and Across track values are NaN
-			if (math.isnan(self.Depth[i])):
-				self.Depth[i] = 0
-			if (math.isnan(self.AcrossTrackDistance[i])):
-				self.AcrossTrackDistance[i] = 0
-			if (math.isnan(self.AlongTrackDistance[i])):
-				self.AlongTrackDistance[i] = 0
+		# now read the variable part of the Record, all the beams at once with a numpy structured dtype
+		data = self.fileptr.read(X_BEAM_DTYPE.itemsize * self.NBeams)
+		beams = np.frombuffer(data, dtype=X_BEAM_DTYPE, count=self.NBeams)
+
+		# numpy arrays of the beams, the lists are kept for the existing code
+		# now do some sanity checks.  We have examples where the Depth and Across track values are NaN
+		self.DepthArray					= np.where(np.isnan(beams['Depth']), 0, beams['Depth'])
+		self.AcrossTrackDistanceArray	= np.where(np.isnan(beams['AcrossTrackDistance']), 0, beams['AcrossTrackDistance'])
+		self.AlongTrackDistanceArray	= np.where(np.isnan(beams['AlongTrackDistance']), 0, beams['AlongTrackDistance'])
+		self.DetectionWindowsLengthArray = beams['DetectionWindowsLength']
+		self.QualityFactorArray			= beams['QualityFactor']
+		self.BeamIncidenceAngleAdjustmentArray = beams['BeamIncidenceAngleAdjustment'] / 10.0
+		self.DetectionInformationArray	= beams['DetectionInformation']
+		self.RealtimeCleaningInformationArray = beams['RealtimeCleaningInformation']
+		self.ReflectivityArray			= beams['Reflectivity'] / 10.0
+
+		self.Depth						= self.DepthArray.tolist()
+		self.AcrossTrackDistance		= self.AcrossTrackDistanceArray.tolist()
+		self.AlongTrackDistance			= self.AlongTrackDistanceArray.tolist()
+		self.DetectionWindowsLength		= self.DetectionWindowsLengthArray.tolist()
+		self.QualityFactor				= self.QualityFactorArray.tolist()
+		self.BeamIncidenceAngleAdjustment = self.BeamIncidenceAngleAdjustmentArray.tolist()
+		self.DetectionInformation		= self.DetectionInformationArray.tolist()
+		self.RealtimeCleaningInformation = self.RealtimeCleaningInformationArray.tolist()
+		self.Reflectivity				= self.ReflectivityArray.tolist()
 
 		rec_fmt = '=BBH'
 		rec_len = struct.calcsize(rec_fmt)
@@ -1812,40 +2124,39 @@ class X_DEPTH:
 		header_fmt = '=LBBHLL4Hf2Hf4B'
 		header_len = struct.calcsize(header_fmt)
 
-		fullDatagram = bytearray()
-
-		rec_fmt = '=fffHBBBbh'
-		rec_len = struct.calcsize(rec_fmt)
-
 		footer_fmt = '=BBH'
 		footer_len = struct.calcsize(footer_fmt)
 
-		fullDatagramByteCount = header_len + (rec_len*self.NBeams) + footer_len
+		fullDatagramByteCount = header_len + (X_BEAM_DTYPE.itemsize*self.NBeams) + footer_len
+		fullDatagram = bytearray(fullDatagramByteCount)
 
 		# pack the header
 		recordTime = int(dateToSecondsSinceMidnight(from_timestamp(self.Time))*1000)
-		header = struct.pack(header_fmt, fullDatagramByteCount-4, self.STX, ord(self.typeOfDatagram), self.EMModel, self.RecordDate, recordTime, self.Counter, self.SerialNumber, int(self.Heading * 100), int(self.SoundSpeedAtTransducer * 10), self.TransducerDepth, self.NBeams, self.NValidDetections, self.SampleFrequency, self.ScanningInfo, self.spare1, self.spare2, self.spare3)
-		fullDatagram = fullDatagram + header
-
-		# pack the beam summary info
-		for i in range (self.NBeams):
-			bodyRecord = struct.pack(rec_fmt, self.Depth[i], self.AcrossTrackDistance[i], self.AlongTrackDistance[i], self.DetectionWindowsLength[i], self.QualityFactor[i], int(self.BeamIncidenceAngleAdjustment[i]*10), self.DetectionInformation[i], self.RealtimeCleaningInformation[i], int(self.Reflectivity[i]*10), )
-			fullDatagram = fullDatagram + bodyRecord
+		struct.pack_into(header_fmt, fullDatagram, 0, fullDatagramByteCount-4, self.STX, ord(self.typeOfDatagram), self.EMModel, self.RecordDate, recordTime, self.Counter, self.SerialNumber, int(self.Heading * 100), int(self.SoundSpeedAtTransducer * 10), self.TransducerDepth, self.NBeams, self.NValidDetections, self.SampleFrequency, self.ScanningInfo, self.spare1, self.spare2, self.spare3)
+
+		# pack the beam summary info, all the beams at once
+		offset = packBeams(fullDatagram, header_len, X_BEAM_DTYPE, self.NBeams, {
+			'Depth': self.Depth,
+			'AcrossTrackDistance': self.AcrossTrackDistance,
+			'AlongTrackDistance': self.AlongTrackDistance,
+			'DetectionWindowsLength': self.DetectionWindowsLength,
+			'QualityFactor': self.QualityFactor,
+			'BeamIncidenceAngleAdjustment': np.asarray(self.BeamIncidenceAngleAdjustment) * 10,
+			'DetectionInformation': self.DetectionInformation,
+			'RealtimeCleaningInformation': self.RealtimeCleaningInformation,
+			'Reflectivity': np.asarray(self.Reflectivity) * 10})
 
 		systemDescriptor = 1
-		tmp = struct.pack('=B', systemDescriptor)
-		fullDatagram = fullDatagram + tmp
+		struct.pack_into('=B', fullDatagram, offset, systemDescriptor)
 
 		# now pack the footer
-		ETX = 3
-		checksum = 0
-
-		footer = struct.pack('=BH', ETX, checksum)
-		fullDatagram = fullDatagram + footer
-
+		packFooter(fullDatagram)
 		return fullDatagram
 
 ###############################################################################
+# beam records of the Y datagram '=bBHH', followed by the samples of all the beams ('h')
+Y_BEAM_DTYPE = np.dtype([('sortingDirection', 'i1'), ('detectionInfo', 'u1'), ('numberOfSamplesPerBeam', '<u2'), ('centreSampleNumber', '<u2')])
+
 class Y_SEABEDIMAGE:
 	def __init__(self, fileptr, numberOfBytes):
 		self.typeOfDatagram = 'Y'
@@ -1856,6 +2167,7 @@ class Y_SEABEDIMAGE:
 		self.data = ""
 		self.ARC = {}
 		self.BeamPointingAngle=[]
+		self._beams = None
 
 	def read(self):
 		self.fileptr.seek(self.offset, 0)
@@ -1879,31 +2191,20 @@ class Y_SEABEDIMAGE:
 		self.TxBeamWidth= s[12]
 		self.TVGCrossOver= s[13]
 		self.NumBeams= s[14]
-		self.beams = []
-		self.numSamples = 0
-		self.samples =[]
-
-		rec_fmt = '=bBHH'
-		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
+		self._beams = None
 
-		self.numSamples = 0
-		for i in range(self.NumBeams):
-			s = rec_unpack(self.fileptr.read(rec_len))
-			b = cBeam(s, 0)
-			self.numSamples = self.numSamples + b.numberOfSamplesPerBeam
-			self.beams.append(b)
+		# the beam records, then all the samples of all the beams in one int16 array.
+		# the samples of beam i are samples[sampleOffset[i]:sampleOffset[i] + sampleCount[i]] (compressed sparse row)
+		data = self.fileptr.read(Y_BEAM_DTYPE.itemsize * self.NumBeams)
+		self.beamInfo = np.frombuffer(data, dtype=Y_BEAM_DTYPE, count=self.NumBeams)
+		self.sampleCount = self.beamInfo['numberOfSamplesPerBeam'].astype(np.int64)
+		self.sampleOffset = np.zeros(self.NumBeams, dtype=np.int64)
+		np.cumsum(self.sampleCount[:-1], out=self.sampleOffset[1:])
+		self.numSamples = int(self.sampleCount.sum())
 
-		rec_fmt = '=' + str(self.numSamples) + 'h'
-		rec_len = struct.calcsize(rec_fmt)
-		rec_unpack = struct.Struct(rec_fmt).unpack
-		self.samples = rec_unpack(self.fileptr.read(rec_len))
-
-		# allocate the samples to the correct beams so it is easier to use
-		sampleIDX = 0
-		for b in self.beams:
-			b.samples = self.samples[sampleIDX: sampleIDX + b.numberOfSamplesPerBeam]
-			sampleIDX = sampleIDX + b.numberOfSamplesPerBeam
+		# a copy, so the samples can be corrected in place (ARC, conditioning) and do not hold the file map
+		data = self.fileptr.read(2 * self.numSamples)
+		self.samples = np.frombuffer(data, dtype='<i2', count=self.numSamples).copy()
 
 		# read an empty byte
 		self.fileptr.read(1)
@@ -1911,78 +2212,100 @@ class Y_SEABEDIMAGE:
 		# now read the footer
 		self.ETX, self.checksum = readFooter(self.numberOfBytes, self.fileptr)
 
+	@property
+	def beams(self):
+		'''the beams as a list of cBeam with the samples allocated to the correct beams, built on first use from the sample array.
+		once used (or set), encode writes the beams: the changes to the list, the beam fields and b.samples are kept'''
+		if self._beams is None:
+			self._beams = []
+			for i, info in enumerate(self.beamInfo.tolist()):
+				b = cBeam(info, 0)
+				b.samples = self.samples[self.sampleOffset[i]: self.sampleOffset[i] + self.sampleCount[i]]
+				self._beams.append(b)
+		return self._beams
+
+	@beams.setter
+	def beams(self, beams):
+		self._beams = beams
+
+	def beamsToArrays(self):
+		'''rebuild beamInfo, the samples array and the beam offsets/counts from the beams list, the beam fields and samples are checked as struct.pack did'''
+		self.NumBeams = len(self._beams)
+		data = bytearray(Y_BEAM_DTYPE.itemsize * self.NumBeams)
+		packBeams(data, 0, Y_BEAM_DTYPE, self.NumBeams, {name: [getattr(b, name) for b in self._beams] for name in Y_BEAM_DTYPE.names})
+		self.beamInfo = np.frombuffer(data, dtype=Y_BEAM_DTYPE, count=self.NumBeams)
+		self.sampleCount = np.array([len(b.samples) for b in self._beams], dtype=np.int64)
+		self.sampleOffset = np.zeros(self.NumBeams, dtype=np.int64)
+		np.cumsum(self.sampleCount[:-1], out=self.sampleOffset[1:])
+		self.numSamples = int(self.sampleCount.sum())
+		data = bytearray(2 * self.numSamples)
+		packBeams(data, 0, np.dtype([('sample', '<i2')]), self.numSamples, {'sample': np.concatenate([np.asarray(b.samples) for b in self._beams] + [np.zeros(0, dtype='<i2')])})
+		self.samples = np.frombuffer(data, dtype='<i2', count=self.numSamples)
+		# the beams now share the new sample array, as after read
+		for i, b in enumerate(self._beams):
+			b.samples = self.samples[self.sampleOffset[i]: self.sampleOffset[i] + self.sampleCount[i]]
+
 ###############################################################################
 	def encode(self):
 		'''Encode a seabed image datagram record'''
+		if self._beams is not None:
+			self.beamsToArrays()
 
 		header_fmt = '=LBBHLLHHfHhhHHH'
 		header_len = struct.calcsize(header_fmt)
 
-		fullDatagram = bytearray()
-
-		rec_fmt = '=bBHH'
-		rec_len = struct.calcsize(rec_fmt)
-
-		sample_fmt = '=' + str(self.numSamples) + 'h'
-		sample_len = struct.calcsize(sample_fmt)
-
 		footer_fmt = '=BBH'
 		footer_len = struct.calcsize(footer_fmt)
 
-		fullDatagramByteCount = header_len + (rec_len*self.NumBeams) + sample_len + footer_len
+		fullDatagramByteCount = header_len + (Y_BEAM_DTYPE.itemsize*self.NumBeams) + 2*self.numSamples + footer_len
+		fullDatagram = bytearray(fullDatagramByteCount)
 
 		# pack the header
 		recordTime = int(dateToSecondsSinceMidnight(from_timestamp(self.Time))*1000)
-		header = struct.pack(header_fmt, fullDatagramByteCount-4, self.STX, ord(self.typeOfDatagram), self.EMModel, self.RecordDate, recordTime, self.Counter, self.SerialNumber, self.SampleFrequency, self.RangeToNormalIncidence, self.NormalIncidence, self.ObliqueBS, self.TxBeamWidth, self.TVGCrossOver, self.NumBeams)
-		fullDatagram = fullDatagram + header
+		struct.pack_into(header_fmt, fullDatagram, 0, fullDatagramByteCount-4, self.STX, ord(self.typeOfDatagram), self.EMModel, self.RecordDate, recordTime, self.Counter, self.SerialNumber, self.SampleFrequency, self.RangeToNormalIncidence, self.NormalIncidence, self.ObliqueBS, self.TxBeamWidth, self.TVGCrossOver, self.NumBeams)
 
 		# pack the beam summary info
-		s = []
-		for i,b in enumerate (self.beams):
-			bodyRecord = struct.pack(rec_fmt, b.sortingDirection, b.detectionInfo, b.numberOfSamplesPerBeam, b.centreSampleNumber)
-			fullDatagram = fullDatagram + bodyRecord
-			# using the takeoffangle, we need to look up the correction from the ARC and apply it to the samples.
-			a = round(self.BeamPointingAngle[i],0)
-			correction = self.ARC[a]
-			for sample in b.samples:
-				s.append(int(sample + correction))
-		sampleRecord = struct.pack(sample_fmt, *s)
-		fullDatagram = fullDatagram + sampleRecord
+		offset = packBeams(fullDatagram, header_len, Y_BEAM_DTYPE, self.NumBeams, {name: self.beamInfo[name] for name in Y_BEAM_DTYPE.names})
+
+		# using the takeoffangle, we need to look up the correction from the ARC and apply it to the samples of each beam.
+		# np.round rounds half to even as round() does, the angles are rounded in one call and only the dictionary lookup is done per beam
+		angles = np.round(np.asarray(self.BeamPointingAngle[:self.NumBeams], dtype=np.float64)).tolist()
+		corrections = np.array([self.ARC[angle] for angle in angles], dtype=np.float64)
+		offset = packBeams(fullDatagram, offset, np.dtype([('sample', '<i2')]), self.numSamples, {'sample': self.samples + np.repeat(corrections, self.sampleCount)})
 
 		systemDescriptor = 1
-		tmp = struct.pack('=B', systemDescriptor)
-		fullDatagram = fullDatagram + tmp
+		struct.pack_into('=B', fullDatagram, offset, systemDescriptor)
 
 		# now pack the footer
-		ETX = 3
-		checksum = 0
-		footer = struct.pack('=BH', ETX, checksum)
-		fullDatagram = fullDatagram + footer
-
+		packFooter(fullDatagram)
 		return fullDatagram
 
 ###############################################################################
-# TIME HELPER FUNCTIONS
-###############################################################################
-def to_timestamp(dateObject):
-	return (dateObject - datetime(1970, 1, 1)).total_seconds()
+# the datagrams supported by ALLReader.readDatagram
+DATAGRAM_CLASSES = {
+	'3': E_EXTRA,			# 3_EXTRA PARAMETERS DECIMAL 51
+	'A': A_ATTITUDE,		# A ATTITUDE
+	'C': C_CLOCK,			# C Clock
+	'D': D_DEPTH,			# D DEPTH
+	'f': f_RAWRANGE,		# f Raw Range
+	'h': h_HEIGHT,			# h Height, not to be confused with H_Heading!
+	'I': I_INSTALLATION,	# I Installation (Start)
+	'i': I_INSTALLATION,	# i Installation (Stop)
+	'n': n_ATTITUDE,		# n ATTITUDE
+	'N': N_TRAVELTIME,		# N Angle and Travel Time
+	'O': O_QUALITYFACTOR,	# O_QUALITYFACTOR
+	'R': R_RUNTIME,			# R_RUNTIME
+	'P': P_POSITION,		# P Position
+	'U': U_SVP,				# U Sound Velocity
+	'X': X_DEPTH,			# X Depth
+	'Y': Y_SEABEDIMAGE,		# Y_SeabedImage
+}
 
-def to_DateTime(recordDate, recordTime):
-	'''return a python date object from a split date and time record. works with kongsberg date and time structures'''
-	date_object = datetime.strptime(str(recordDate), '%Y%m%d') + timedelta(0,recordTime)
-	return date_object
-
-def from_timestamp(unixtime):
-	return datetime.utcfromtimestamp(unixtime)
-
-def dateToKongsbergDate(dateObject):
-	return dateObject.strftime('%Y%m%d')
-
-def dateToKongsbergTime(dateObject):
-	return dateObject.strftime('%H%M%S')
-
-def dateToSecondsSinceMidnight(dateObject):
-	return (dateObject - dateObject.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+###############################################################################
+def arraysToDataFrame(arrays):
+	'''pandas DataFrame of the arrays indexed by the time array. pandas is only needed for this'''
+	import pandas as pd
+	return pd.DataFrame(arrays).set_index('time')
 
 ###############################################################################
 # bitwise helper functions
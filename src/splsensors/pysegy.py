@@ -0,0 +1,234 @@
+#name:		  pysegy
+#created:	   December 2020
+#description:   python module to read the headers of a SEG-Y file without reading the traces
+#notes:		 See main at end of script for example how to use this
+#based on SEG-Y rev 1 (May 2002)
+
+# Only the 3200 bytes textual header, the 400 bytes binary header and the first 240 bytes trace header are read.
+# This is all we need to get the start time of a SBP/SUHRS file, reading the whole file with obspy is very slow.
+
+import pprint
+import struct
+import os.path
+import sys
+import time
+from datetime import datetime
+from datetime import timedelta
+
+def main():
+	if len(sys.argv) == 1:
+		print("Usage: python pysegy.py file.sgy [file2.sgy ...]")
+		sys.exit(1)
+
+	start_time = time.time() # time the process
+	for filename in sys.argv[1:]:
+		r = SEGYReader(filename)
+		print(filename, r.startTime(), r.TraceHdr.TimeBasis)
+		r.close()
+	print("Read Duration: %.3f seconds" % (time.time() - start_time)) # print the processing time.
+
+###############################################################################
+# data sample format code accepted by obspy, used to detect the byte order of the file
+SEGY_DATA_SAMPLE_FORMAT = [1, 2, 3, 4, 5, 8]
+
+SEGY_TIME_BASIS = {1: 'Local', 2: 'GMT', 3: 'Other', 4: 'UTC'}
+
+###############################################################################
+class SEGYTEXTUALHDR:
+	def __init__(self, fileptr):
+		data = fileptr.read(3200)
+		# The first character is mostly a 'C', if not the header is EBCDIC (same test as obspy)
+		if b'C' in (data[0:1], data[3040:3041]):
+			self.Encoding = 'ASCII'
+			self.Text = data.decode('ascii', errors='ignore')
+		else:
+			self.Encoding = 'EBCDIC'
+			self.Text = data.decode('cp500', errors='ignore')
+
+	def __str__(self):
+		return (pprint.pformat(vars(self)))
+
+class SEGYBINARYHDR:
+	def __init__(self, fileptr, endian):
+		SEGYBinaryHdr_fmt = endian + '3i24h240xHhh94x'
+		SEGYBinaryHdr_unpack = struct.Struct(SEGYBinaryHdr_fmt).unpack_from
+
+		data = fileptr.read(400)
+		s = SEGYBinaryHdr_unpack(data)
+		self.JobID								= s[0]
+		self.LineNumber							= s[1]
+		self.ReelNumber							= s[2]
+		self.DataTracesPerEnsemble				= s[3]
+		self.AuxiliaryTracesPerEnsemble			= s[4]
+		self.SampleInterval						= s[5]
+		self.SampleIntervalOriginal				= s[6]
+		self.SamplesPerTrace					= s[7]
+		self.SamplesPerTraceOriginal			= s[8]
+		self.DataSampleFormat					= s[9]
+		self.EnsembleFold						= s[10]
+		self.TraceSorting						= s[11]
+		self.VerticalSumCode					= s[12]
+		self.SweepFrequencyStart				= s[13]
+		self.SweepFrequencyEnd					= s[14]
+		self.SweepLength						= s[15]
+		self.SweepType							= s[16]
+		self.SweepChannelTraceNumber			= s[17]
+		self.SweepTraceTaperLengthStart			= s[18]
+		self.SweepTraceTaperLengthEnd			= s[19]
+		self.TaperType							= s[20]
+		self.CorrelatedDataTraces				= s[21]
+		self.BinaryGainRecovered				= s[22]
+		self.AmplitudeRecoveryMethod			= s[23]
+		self.MeasurementSystem					= s[24]
+		self.ImpulseSignalPolarity				= s[25]
+		self.VibratoryPolarityCode				= s[26]
+		self.SEGYRevision						= s[27]
+		self.FixedLengthTraceFlag				= s[28]
+		self.NumberOfExtendedTextualHeaders		= s[29]
+
+	def __str__(self):
+		return (pprint.pformat(vars(self)))
+
+class SEGYTRACEHDR:
+	def __init__(self, fileptr, endian):
+		SEGYTraceHdr_fmt = endian + '7i4h8i2h4i15h38x6h72x'
+		SEGYTraceHdr_unpack = struct.Struct(SEGYTraceHdr_fmt).unpack_from
+
+		data = fileptr.read(240)
+		s = SEGYTraceHdr_unpack(data)
+		self.TraceSequenceLine					= s[0]
+		self.TraceSequenceFile					= s[1]
+		self.FieldRecord						= s[2]
+		self.TraceNumber						= s[3]
+		self.EnergySourcePoint					= s[4]
+		self.Ensemble							= s[5]
+		self.TraceInEnsemble					= s[6]
+		self.TraceIdentificationCode			= s[7]
+		self.VerticallySummedTraces				= s[8]
+		self.HorizontallyStackedTraces			= s[9]
+		self.DataUse							= s[10]
+		self.Offset								= s[11]
+		self.ReceiverGroupElevation				= s[12]
+		self.SourceSurfaceElevation				= s[13]
+		self.SourceDepth						= s[14]
+		self.ReceiverDatumElevation				= s[15]
+		self.SourceDatumElevation				= s[16]
+		self.SourceWaterDepth					= s[17]
+		self.GroupWaterDepth					= s[18]
+		self.ElevationScalar					= s[19]
+		self.CoordinateScalar					= s[20]
+		self.SourceX							= s[21]
+		self.SourceY							= s[22]
+		self.GroupX								= s[23]
+		self.GroupY								= s[24]
+		self.CoordinateUnits					= s[25]
+		self.WeatheringVelocity					= s[26]
+		self.SubWeatheringVelocity				= s[27]
+		self.UpholeTimeSource					= s[28]
+		self.UpholeTimeGroup					= s[29]
+		self.SourceStaticCorrection				= s[30]
+		self.GroupStaticCorrection				= s[31]
+		self.TotalStaticApplied					= s[32]
+		self.LagTimeA							= s[33]
+		self.LagTimeB							= s[34]
+		self.DelayRecordingTime					= s[35]
+		self.MuteTimeStart						= s[36]
+		self.MuteTimeEnd						= s[37]
+		self.NumSamples							= s[38]
+		self.SampleInterval						= s[39]
+		self.Year								= s[40]
+		self.DayOfYear							= s[41]
+		self.Hour								= s[42]
+		self.Minute								= s[43]
+		self.Second								= s[44]
+		self.TimeBasisCode						= s[45]
+		self.TimeBasis							= SEGY_TIME_BASIS.get(self.TimeBasisCode, 'Unknown')
+
+	def __str__(self):
+		return (pprint.pformat(vars(self)))
+
+class SEGYReader:
+	def __init__(self, SEGYfileName):
+		if not os.path.isfile(SEGYfileName):
+			print ("file not found:", SEGYfileName)
+		self.fileName = SEGYfileName
+		self.fileptr = open(SEGYfileName, 'rb')
+		self.fileSize = self.fileptr.seek(0, 2)
+		# go back to start of file
+		self.fileptr.seek(0, 0)
+		self.endian = None
+		self.SEGYTextualHdr = None
+		self.SEGYBinaryHdr = None
+		self.TraceHdr = None
+		try:
+			self.readHeaders()
+		except Exception:
+			self.fileptr.close() # the caller gets no reader to close
+			raise
+
+	def __str__(self):
+		return pprint.pformat(vars(self))
+
+	def close(self):
+		self.fileptr.close()
+
+	def detectEndian(self):
+		'''the data sample format code is a small number, read it in both byte order to find the one of the file'''
+		self.fileptr.seek(3224, 0)
+		data = self.fileptr.read(2)
+		self.fileptr.seek(0, 0)
+		if len(data) < 2:
+			return None
+		for endian in ('>', '<'):
+			if struct.unpack(endian + 'h', data)[0] in SEGY_DATA_SAMPLE_FORMAT:
+				return endian
+		return None
+
+	def readHeaders(self):
+		'''read the textual, binary and first trace header. Leave the headers to None if the file does not look like a SEG-Y'''
+		if self.fileSize < 3600 + 240:
+			return
+		self.endian = self.detectEndian()
+		if self.endian is None:
+			return
+		self.SEGYTextualHdr = SEGYTEXTUALHDR(self.fileptr)
+		self.SEGYBinaryHdr = SEGYBINARYHDR(self.fileptr, self.endian)
+		# extended textual headers are not supported (obspy does not read them either)
+		if self.SEGYBinaryHdr.NumberOfExtendedTextualHeaders != 0:
+			return
+		self.TraceHdr = SEGYTRACEHDR(self.fileptr, self.endian)
+
+	def startTime(self):
+		'''return the start time of the first trace as a python datetime, as obspy would compute it.
+		Return None if the header is unusual, the caller should then use obspy'''
+		h = self.TraceHdr
+		if h is None:
+			return None
+		# year not set, obspy leave the start time to 1970-01-01
+		if h.Year == 0:
+			return datetime(1970, 1, 1)
+		if h.Year < 0:
+			return None
+		# same mapping of the 2 digits year that obspy
+		year = h.Year
+		if year < 100:
+			year += 2000 if year < 30 else 1900
+		julday = h.DayOfYear
+		if julday == 0 and h.Hour == 0 and h.Minute == 0 and h.Second == 0:
+			julday = 1
+		daysInYear = 366 if (year % 4 == 0 and year % 100 != 0) or year % 400 == 0 else 365
+		if not (1 <= julday <= daysInYear and 0 <= h.Hour < 24 and 0 <= h.Minute < 60 and 0 <= h.Second < 60):
+			return None
+		return datetime(year, 1, 1) + timedelta(days=julday - 1, hours=h.Hour, minutes=h.Minute, seconds=h.Second)
+
+###############################################################################
+def readSEGYStartTime(SEGYfileName):
+	'''return the start time of a SEG-Y file from its headers only, None if the headers are unusual'''
+	r = SEGYReader(SEGYfileName)
+	try:
+		return r.startTime()
+	finally:
+		r.close()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+###############################################################
+# Author:       patrice.ponchant@furgo.com  (Fugro Brasil)    #
+# Created:      10/12/2020                                    #
+# Python :      3.x                                           #
+###############################################################
+
+# Cache of the sensors start time between runs.
+# The output folder is cleaned at every run, so the cache is saved in the user cache folder.
+# A file is read again only if its size or modification time changed.
+
+import os
+import sqlite3
+import pandas as pd
+
+SCHEMA_VERSION = 2 # increase when the table change, the old cache is then dropped
+
+# Default location of the cache (%LOCALAPPDATA%\splsensors on Windows, ~/.cache/splsensors otherwise)
+def cacheFolder():
+    root = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'splsensors')
+
+class SensorCache:
+    """
+    Sensor Start (and Sensor End, Ping Count of the SSS files) per (absolute path, sensor type), valid while the file size and mtime do not change.
+    The SSS files skipped because too small are cached too (Sensor Start None), the files that could not be read are not.
+    """
+    def __init__(self, cacheFile=None, rebuild=False):
+        if cacheFile is None:
+            os.makedirs(cacheFolder(), exist_ok=True)
+            cacheFile = os.path.join(cacheFolder(), 'sensors_cache.sqlite')
+        self.cacheFile = cacheFile
+        self.rebuild = rebuild # ignore the entries already in the cache, they are overwritten
+        self.hits = 0
+        self.misses = 0
+        self.con = sqlite3.connect(cacheFile)
+        if self.con.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self.con.execute('DROP TABLE IF EXISTS sensors')
+            self.con.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        self.con.execute('CREATE TABLE IF NOT EXISTS sensors (path TEXT, type TEXT, size INTEGER, mtime INTEGER, '
+                         'start TEXT, end TEXT, pings INTEGER, filesize REAL, PRIMARY KEY (path, type))')
+        self.con.commit()
+
+    def key(self, f):
+        st = os.stat(f)
+        return os.path.abspath(f), st.st_size, st.st_mtime_ns
+
+    def get(self, f, ssFormat):
+        """
+        Return (Sensor Start, Sensor End, Ping Count, File Size [MB]) if the file did not change since cached, None otherwise.
+        A file that can not be stat (removed, network share) is a miss, the error is then reported by the reading.
+        """
+        try:
+            path, size, mtime = self.key(f)
+        except OSError:
+            self.misses += 1
+            return None
+        row = None
+        if not self.rebuild:
+            row = self.con.execute('SELECT start, end, pings, filesize FROM sensors WHERE path = ? AND type = ? AND size = ? AND mtime = ?',
+                                   (path, ssFormat, size, mtime)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        fStart = pd.Timestamp(row[0]) if row[0] is not None else None
+        fEnd = pd.Timestamp(row[1]) if row[1] is not None else None
+        return fStart, fEnd, row[2], row[3]
+
+    def put(self, f, ssFormat, fStart, fEnd, pingCount, fileSize):
+        try:
+            path, size, mtime = self.key(f)
+        except OSError: # removed since it was read, not cached
+            return
+        start = pd.Timestamp(fStart).isoformat() if fStart is not None else None
+        end = pd.Timestamp(fEnd).isoformat() if fEnd is not None else None
+        self.con.execute('INSERT OR REPLACE INTO sensors VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (path, ssFormat, size, mtime, start, end, pingCount, fileSize))
+
+    def commit(self):
+        self.con.commit()
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
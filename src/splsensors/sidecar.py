@@ -0,0 +1,53 @@
+#name:		  sidecar
+#created:	   December 2020
+#description:   save and load a numpy index next to the file it describes
+#notes:		 the sidecar is only valid while the size and modification time of the file do not change
+
+# The index of a sonar file (.all, .xtf) is a structured numpy array built in one pass over the file.
+# It is saved in a small .npz file next to the sonar file, or in a given folder when the survey folder is read only.
+
+import hashlib
+import os.path
+import numpy as np
+
+SIDECAR_VERSION = 2 # increase when the content of the index change, the old sidecars are then ignored
+
+def sidecarPath(fileName, suffix, folder=None):
+	'''return the sidecar file name: <file><suffix>.npz next to the file, or in folder (name made unique with a hash of the full path)'''
+	if folder is None:
+		return fileName + suffix + '.npz'
+	fullPath = os.path.abspath(fileName)
+	tag = hashlib.md5(fullPath.encode('utf-8')).hexdigest()[:12]
+	return os.path.join(folder, os.path.basename(fileName) + '.' + tag + suffix + '.npz')
+
+def fileStamp(fileName):
+	st = os.stat(fileName)
+	return st.st_size, st.st_mtime_ns
+
+def loadSidecar(fileName, suffix, folder=None):
+	'''return the index saved for fileName, None if there is none or if the file changed since it was saved'''
+	path = sidecarPath(fileName, suffix, folder)
+	if not os.path.isfile(path):
+		return None
+	try:
+		with np.load(path, allow_pickle=False) as z:
+			if int(z['version']) != SIDECAR_VERSION:
+				return None
+			if (int(z['size']), int(z['mtime'])) != fileStamp(fileName):
+				return None
+			return z['index']
+	except (OSError, ValueError, KeyError):
+		return None # corrupt or old sidecar, it is rebuilt
+
+def saveSidecar(fileName, suffix, index, folder=None):
+	'''save the index of fileName, return False if the sidecar could not be written (read only folder...)'''
+	path = sidecarPath(fileName, suffix, folder)
+	size, mtime = fileStamp(fileName)
+	try:
+		if folder is not None:
+			os.makedirs(folder, exist_ok=True)
+		with open(path, 'wb') as f:
+			np.savez(f, index=index, size=size, mtime=mtime, version=SIDECAR_VERSION)
+	except OSError:
+		return False
+	return True
@@ -14,15 +14,22 @@ from builtins import *
 ##### Sensor reader packages #####
 from pyXTF import * # https://github.com/pktrigg/pyxtf
 from pyall import * # https://github.com/pktrigg/pyall
+from pysegy import * # SEG-Y headers only
+from sensorcache import SensorCache
 from obspy import read
 
 ##### Basic packages #####
 import datetime
 import sys, os, glob, shutil
 import subprocess
+import threading
+import concurrent.futures
+import multiprocessing
 import pandas as pd
 import numpy as np
 import math
+import itertools
+import time
 from xlsxwriter.utility import xl_rowcol_to_cell
 
 ##### CMD packages #####
@@ -125,6 +132,31 @@ def main():
         widget='TextField',
         #default='FugroBrasilis-CRP-Position',
         help='Start buffer [in second] to be used to included sensors that have start before the session start.')
+    
+    splopt.add_argument(
+        '--splWorkers',
+        dest='splWorkers',
+        metavar='Number of SPL conversions in parallel',
+        widget='IntegerField',
+        type=int,
+        default=4,
+        help='Number of Starfix converters running at the same time.')
+    
+    splopt.add_argument(
+        '--splTimeout',
+        dest='splTimeout',
+        metavar='SPL conversion timeout [s]',
+        widget='IntegerField',
+        type=int,
+        default=300,
+        help='A SPL file still converting after this time is stopped and log as SPLTimeout in the SPL_Problem sheet.')
+    
+    splopt.add_argument(
+        '--starfixConverter',
+        dest='starfixConverter',
+        metavar='Starfix Converter',
+        help='Fugro.DescribedData2Ascii.exe to use. If blank it is search in the Starfix2018/Starfix2020 folders and in the starfixRC folder.',
+        widget='FileChooser')
         
     # Sensors Arguments
     sensorsopt.add_argument(
@@ -235,6 +267,54 @@ def main():
         type=str,
         #default='DNP, DoNotProcess',
         help='List all folder that need to be excluded from the recurcive search.\n(eg.: DNP,DoNotProcess) Comma separated and NO WHITESPACE!\nNote: This just apply to the sensors folders')       
+    additionalopt.add_argument(
+        '-w', '--workers',
+        dest='workers',
+        metavar='Number of workers',
+        widget='IntegerField',
+        type=int,
+        default=1,
+        help='Number of processes used to read the sensors files (Folder option only).\nThe network drives are faster with more workers (eg.: 8). 1 = no parallel reading.')
+    additionalopt.add_argument(
+        '--scanThreads',
+        dest='scanThreads',
+        metavar='Number of threads to list the folders',
+        widget='IntegerField',
+        type=int,
+        default=1,
+        help='Number of threads used to walk the subfolders of the SPL and sensors folders.\nUseful for the network drives (eg.: 8). 1 = no parallel listing.')
+    additionalopt.add_argument(
+        '--watch',
+        dest='watch',
+        widget='CheckBox',
+        action='store_true',
+        help='Keep running and update the logs when new or modified SPL and sensors files are found.')
+    additionalopt.add_argument(
+        '--watchInterval',
+        dest='watchInterval',
+        metavar='Watch interval [s]',
+        widget='IntegerField',
+        type=int,
+        default=60,
+        help='Time between two checks of the folders in watch mode.')
+    additionalopt.add_argument(
+        '--no-cache',
+        dest='noCache',
+        widget='CheckBox',
+        action='store_true',
+        help='The start time of the sensors files is saved in a cache (user cache folder) and the files are only read again if they changed.\nCheck this to read all the files and not use the cache.')
+    additionalopt.add_argument(
+        '--rebuild-cache',
+        dest='rebuildCache',
+        widget='CheckBox',
+        action='store_true',
+        help='Read all the files again and overwrite the cache with the new values.')
+    additionalopt.add_argument(
+        '--integrity',
+        dest='integrity',
+        widget='CheckBox',
+        action='store_true',
+        help='Check the checksum, STX/ETX and time order of every datagram of the *.all files.\nThe corrupted files are listed in the MBES_Integrity sheet.')
     
     # Use to create help readme.md. TO BE COMMENT WHEN DONE
     # if len(sys.argv)==1:
@@ -242,16 +322,54 @@ def main():
     #    sys.exit(1)   
         
     args = parser.parse_args()
-    process(args, cmd)
+    if args.watch:
+        watch(args, cmd)
+    else:
+        process(args, cmd)
 
-def process(args, cmd):
+def watch(args, cmd):
+    """
+    Run the process every watchInterval seconds. Only the new or modified SPL sessions and sensors files are read
+    (SPL sessions kept in memory, sensors in the cache) and the logs are regenerated if something changed.
+    """
+    state = watchState(args)
+    interval = args.watchInterval if args.watchInterval is not None else 60
+    print(f'Watch mode: the folders are checked every {interval} s. Press Ctrl+C to stop.')
+    try:
+        while True:
+            try:
+                process(args, cmd, state)
+            except SystemExit as e: # a file is lock or not SPL yet, try again at the next check
+                print(e)
+            print(f'Next check at {(datetime.datetime.now() + datetime.timedelta(seconds=interval)).strftime("%H:%M:%S")}')
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print('')
+        print('Watch mode stopped.')
+    finally:
+        if state['cache'] is not None:
+            state['cache'].close()
+
+def watchState(args):
+    """
+    What the watch mode keeps between two runs of process: the SPL sessions and *.all integrity already read,
+    the files snapshot of the last run and the sensors cache (opened once).
+    """
+    return {'splCache': {}, 'integrityCache': {}, 'snapshot': None,
+            'cache': None if args.noCache else SensorCache(rebuild=args.rebuildCache)}
+
+def process(args, cmd, state=None):
     """
     Uses this if called as __main__.
+    state is only used by the watch mode to keep the SPL sessions, the files snapshot and the sensors cache between runs (see watchState).
     """
+    now = datetime.datetime.now() # time the process
     splFolder = args.splFolder
     splPosition = str(args.splPosition)
     vessel = splPosition.split('-')[0]
     buffer = args.buffer if args.buffer is not None else 0
+    splWorkers = args.splWorkers if args.splWorkers is not None else 4
+    splTimeout = args.splTimeout if args.splTimeout is not None else 300
     
     allFolder = args.allFolder
     xtfFolder = args.xtfFolder
@@ -269,6 +387,14 @@ def process(args, cmd):
     
     excludeFolder = args.excludeFolder
     move = args.move
+    workers = args.workers if args.workers is not None else 1
+    splCache = state['splCache'] if state is not None else None
+    scanThreads = args.scanThreads if args.scanThreads is not None else 1
+    if state is not None:
+        cache = state['cache'] # opened by watch
+    else:
+        cache = None if args.noCache else SensorCache(rebuild=args.rebuildCache)
+    integrityCache = state['integrityCache'] if state is not None else None
     
     # Defined Global Dataframe
     col = ["Session Start", "Difference Start [s]", "Session End", "Session Name", "Session MaxGap", "Vessel Name", "Sensor Start",
@@ -278,11 +404,14 @@ def process(args, cmd):
     dfSPL = pd.DataFrame(columns = ["Session Start", "Session End", "SPL LineName", "Session MaxGap", "Session Name"])       
     dfer = pd.DataFrame(columns = ["SPLPath"])
     dfSummary = pd.DataFrame(columns = ["Sensor", "Processed Files", "Duplicated Files", "Wrong Timestamp (SBP)",
-                                        "Moved Files", "Processing Time"])
+                                        "Moved Files", "Processing Time", "Cache Hits", "Cache Misses"])
     dfMissingSPL = pd.DataFrame(columns = col)
     dfDuplSensor = pd.DataFrame(columns = col)
     dfsgy = pd.DataFrame(columns = col)
     dfSkip = pd.DataFrame(columns = ["FilePath", "File Size [MB]"])
+    dfReadErr = pd.DataFrame(columns = ["FilePath", "Sensor Type", "Error"])
+    dfIntegrity = pd.DataFrame(columns = ["FilePath", "Datagrams", "Checksum Errors", "Bad STX/ETX", "Truncated", "Time Backwards",
+                                          "First Error Offset", "Error"])
     
     ##########################################################
     #              Checking before continuing                #
@@ -302,14 +431,9 @@ def process(args, cmd):
         print ('')
         sys.exit(stylize('No Output Folder was defined, quitting', fg('red')))
     
-    # Check if file is open before continue
-    for fi in glob.glob(outputFolder + "\\*"):
-        try:
-            #fp = open(fi, "r+")
-            os.remove(fi)
-        except IOError:
-            print('')
-            sys.exit(stylize(f'The following file is lock ({fi}).\nPlease close the files in the "{outputFolder}" folder', fg('red')))      
+    # Check if file is open before continue (in watch mode only when something changed)
+    if state is None:
+        cleanOutputFolder(outputFolder)
     
     # Check if LOGS files used for listing is not in same folder that LOGS that will be logs 
     tpmList = [allFile, xtfFile, sgySBPFile, csvMAGFile, sgySUHRSFile]
@@ -334,43 +458,47 @@ def process(args, cmd):
     if args.allFile is not None:
         allListFile = pd.read_csv(allFile, usecols=["Sensor Start","FilePath"], parse_dates=['Sensor Start'])
     elif args.allFolder is not None:
-        allListFile = listFile(allFolder, "all", set(exclude))
+        allListFile = listFile(allFolder, "all", set(exclude), scanThreads)
     else:
         allListFile = []
 
     if args.xtfFile is not None:
-        xtfListFile = pd.read_csv(xtfFile, usecols=["Sensor Start","FilePath"], parse_dates=['Sensor Start'])
+        xtfListFile = pd.read_csv(xtfFile, usecols=lambda c: c in ["Sensor Start","Sensor End","Ping Count","FilePath"], parse_dates=['Sensor Start'])
     elif args.xtfFolder is not None:
-        xtfListFile = listFile(xtfFolder, "xtf", set(exclude))
+        xtfListFile = listFile(xtfFolder, "xtf", set(exclude), scanThreads)
     else:
         xtfListFile = []
 
     if args.sgySBPFile is not None:
         sbpListFile = pd.read_csv(sgySBPFile, usecols=["Sensor Start","FilePath"], parse_dates=['Sensor Start'])
     elif args.sgySBPFolder is not None:
-        sbpListFile = listFile(sgySBPFolder, ('seg', 'sgy', 'segy'), set(exclude))
+        sbpListFile = listFile(sgySBPFolder, ('seg', 'sgy', 'segy'), set(exclude), scanThreads)
     else:
         sbpListFile = []
 
     if args.csvMAGFile is not None:
         magListFile = pd.read_csv(csvMAGFile, usecols=["Sensor Start","FilePath"], parse_dates=['Sensor Start'])
     elif args.csvMAGFolder is not None:
-        magListFile = listFile(csvMAGFolder, "csv", set(exclude))
+        magListFile = listFile(csvMAGFolder, "csv", set(exclude), scanThreads)
     else:
         magListFile = []        
 
     if args.sgySUHRSFile is not None:
         suhrsListFile = pd.read_csv(sgySUHRSFile, usecols=["Sensor Start","FilePath"], parse_dates=['Sensor Start'])
     elif args.sgySUHRSFolder is not None:
-        suhrsListFile = listFile(sgySUHRSFolder, ('seg', 'sgy', 'segy'), set(exclude))
+        suhrsListFile = listFile(sgySUHRSFolder, ('seg', 'sgy', 'segy'), set(exclude), scanThreads)
     else:
         suhrsListFile = []
     
-    #### Not very efficient, will need to improve later   
+    # All the SPL formats are listed in the same walk
     print(f'Start Listing for {splFolder}')
-    fbzListFile = glob.glob(splFolder + "\\**\\" + splPosition + ".fbz", recursive=True)
-    fbfListFile = glob.glob(splFolder + "\\**\\" + splPosition + ".fbf", recursive=True)
-    posListFile = glob.glob(splFolder + "\\**\\" + splPosition + ".pos", recursive=True)           
+    splName = splPosition.lower()
+    dictSPL = scanFolder(splFolder, {'fbz': lambda name: name == splName + '.fbz',
+                                     'fbf': lambda name: name == splName + '.fbf',
+                                     'pos': lambda name: name == splName + '.pos'}, threads=scanThreads)
+    fbzListFile = dictSPL['fbz']
+    fbfListFile = dictSPL['fbf']
+    posListFile = dictSPL['pos']
     print("Subprocess Duration: ", (datetime.datetime.now() - nowLS))
     
     # Check if SPL files found
@@ -378,15 +506,36 @@ def process(args, cmd):
         print ('')
         sys.exit(stylize('No SPL files were found, quitting', fg('red')))
     
+    # Check if the Starfix converter is found, if not all the sessions will be EmptySPL
+    converter = args.starfixConverter if args.starfixConverter is not None else findStarfixConverter()
+    if converter is None or not os.path.isfile(converter):
+        print ('')
+        sys.exit(stylize(f'The Starfix converter ({converter}) was not found (Fugro.DescribedData2Ascii.exe in the Starfix2018/Starfix2020 or starfixRC folder), quitting', fg('red')))
+    print(f'SPL files will be converted with {converter}')
+    
+    # Watch mode, nothing to do if no file was added, modified or removed since the last run
+    if state is not None:
+        lsWatch = fbfListFile + fbzListFile + posListFile + [e for e in tpmList if e is not None]
+        for ls in [allListFile, xtfListFile, sbpListFile, magListFile, suhrsListFile]:
+            if isinstance(ls, list):
+                lsWatch += ls
+        snapshot = {f: fileStamp(f) for f in lsWatch}
+        if snapshot == state['snapshot']:
+            print('')
+            print('No new or modified files.')
+            return
+        cleanOutputFolder(outputFolder)
+        state['snapshot'] = None # only kept if the run succeed
+    
     print('')
     print(f'Total of files that will be processed: \n {len(fbfListFile)} *.fbf \n {len(fbzListFile)} *.fbz \n {len(posListFile)} *.pos \n {len(allListFile)} *.all \n {len(xtfListFile)} *.xtf \n {len(sbpListFile)} *.sgy/*.seg/*.segy (SBP) \n {len(magListFile)} *.csv (MAG) \n {len(suhrsListFile)} *.sgy/*.seg/*.segy (SUHRS)') 
     
     ##########################################################
     #                     Reading SPL                        #
     ##########################################################    
-    dfSPL, dfer, dfSummary = splfc(fbfListFile, 'FBF', dfSPL, dfer, dfSummary, outputFolder, cmd)
-    dfSPL, dfer, dfSummary = splfc(fbzListFile, 'FBZ', dfSPL, dfer, dfSummary, outputFolder, cmd)
-    dfSPL, dfer, dfSummary = splfc(posListFile, 'POS', dfSPL, dfer, dfSummary, outputFolder, cmd)
+    dfSPL, dfer, dfSummary = splfc(fbfListFile, 'FBF', dfSPL, dfer, dfSummary, cmd, converter, splWorkers, splTimeout, splCache)
+    dfSPL, dfer, dfSummary = splfc(fbzListFile, 'FBZ', dfSPL, dfer, dfSummary, cmd, converter, splWorkers, splTimeout, splCache)
+    dfSPL, dfer, dfSummary = splfc(posListFile, 'POS', dfSPL, dfer, dfSummary, cmd, converter, splWorkers, splTimeout, splCache)
     
     # Copy the needed info from dfSPl to the dfFINAL
     dfFINAL['Session Start'] = dfSPL['Session Start']
@@ -401,60 +550,68 @@ def process(args, cmd):
     ##########################################################
     # MBES
     if args.allFile is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('File', allListFile, 'MBES', '.all', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('File', allListFile, 'MBES', '.all', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
     elif args.allFolder is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('Folder', allListFile, 'MBES', '.all', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('Folder', allListFile, 'MBES', '.all', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
+    if args.integrity and len(allListFile) > 0:
+        lsFile = list(allListFile['FilePath']) if args.allFile is not None else allListFile
+        dfIntegrity = integrityfc(lsFile, cmd, workers, dfIntegrity, vessel, integrityCache)
     # XTF
     if args.xtfFile is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('File', xtfListFile, 'SSS', '.xtf', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('File', xtfListFile, 'SSS', '.xtf', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
     elif args.xtfFolder is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('Folder', xtfListFile, 'SSS', '.xtf', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('Folder', xtfListFile, 'SSS', '.xtf', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
     # SBP
     if args.sgySBPFile is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('File', sbpListFile, 'SBP', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('File', sbpListFile, 'SBP', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
     elif args.sgySBPFolder is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('Folder', sbpListFile, 'SBP', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('Folder', sbpListFile, 'SBP', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
     # MAG
     if args.csvMAGFile is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('File', magListFile, 'MAG', '.csv', cmd, buffer, outputFolder,
-                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('File', magListFile, 'MAG', '.csv', cmd, buffer, outputFolder,
+                                                                            dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
         if move == 'yes':
-            lsFile = outputFolder + "\\" + vessel + "_MAG_Full_Log.csv"
+            lsFile = os.path.join(outputFolder, vessel + "_MAG_Full_Log.csv")
             VesselFolder = os.path.join(csvMAGFolder, vessel)
             WrongFolder = os.path.join(csvMAGFolder, 'WRONG')
             dfSummary = mvSensorFile(lsFile, VesselFolder, WrongFolder, cmd, 'MAG', dfSummary) 
     elif args.csvMAGFolder is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('Folder', magListFile, 'MAG', '.csv', cmd, buffer, outputFolder,
-                                                                   dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('Folder', magListFile, 'MAG', '.csv', cmd, buffer, outputFolder,
+                                                                   dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
         if move == 'yes':
-            lsFile = outputFolder + "\\" + vessel + "_MAG_Full_Log.csv"
+            lsFile = os.path.join(outputFolder, vessel + "_MAG_Full_Log.csv")
             VesselFolder = os.path.join(csvMAGFolder, vessel)
             WrongFolder = os.path.join(csvMAGFolder, 'WRONG')
             dfSummary = mvSensorFile(lsFile, VesselFolder, WrongFolder, cmd, 'MAG', dfSummary) 
     # SUHRS
     if args.sgySUHRSFile is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('File', suhrsListFile, 'SUHRS', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
-                                                                   dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('File', suhrsListFile, 'SUHRS', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
+                                                                   dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
         if move == 'yes':
-            lsFile = outputFolder + "\\" + vessel + "_SUHRS_Full_Log.csv"
+            lsFile = os.path.join(outputFolder, vessel + "_SUHRS_Full_Log.csv")
             VesselFolder = os.path.join(sgySUHRSFolder, vessel)
             WrongFolder = os.path.join(sgySUHRSFolder, 'WRONG')
             dfSummary = mvSensorFile(lsFile, VesselFolder, WrongFolder, cmd, 'SUHRS', dfSummary)         
     elif args.sgySUHRSFolder is not None:
-        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy = sensorsfc('Folder', suhrsListFile, 'SUHRS', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
-                                                                   dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel)
+        dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr = sensorsfc('Folder', suhrsListFile, 'SUHRS', '.sgy/*.seg/*.segy', cmd, buffer, outputFolder,
+                                                                   dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache)
         if move == 'yes':
-            lsFile = outputFolder + "\\" + vessel + "_SUHRS_Full_Log.csv"
+            lsFile = os.path.join(outputFolder, vessel + "_SUHRS_Full_Log.csv")
             VesselFolder = os.path.join(sgySUHRSFolder, vessel)
             WrongFolder = os.path.join(sgySUHRSFolder, 'WRONG')
             dfSummary = mvSensorFile(lsFile, VesselFolder, WrongFolder, cmd, 'SUHRS', dfSummary) 
 
+    if cache is not None:
+        if state is None:
+            cache.close()
+        else:
+            cache.rebuild = False # rebuilt by the first run only
 
     ##########################################################
     #                  Excel Exportation                     #
@@ -471,9 +628,9 @@ def process(args, cmd):
     Tsensors = len(allListFile) + len(xtfListFile) + len(sbpListFile) + len(magListFile) + len(suhrsListFile)
     
     # creating the df for every sheet in excel
-    log_filenames = glob.glob(outputFolder + '\\*_Full_Log.csv')
+    log_filenames = glob.glob(os.path.join(outputFolder, '*_Full_Log.csv'))
     dfALL = pd.concat([pd.read_csv(f) for f in log_filenames])
-    dtFormat = ['Sensor Start', 'Session Start', 'Session End']
+    dtFormat = ['Sensor Start', 'Session Start', 'Session End'] + (['Sensor End'] if 'Sensor End' in dfALL.columns else [])
     for dt in dtFormat:
         dfALL[dt] = pd.to_datetime(dfALL[dt])
     
@@ -507,24 +664,24 @@ def process(args, cmd):
     dfsgy = dfsgy.drop(columns=coldrop2)
     dfsgy = dfsgy[["Sensor Start", "Sensor FileName", "Sensor Type", "Vessel Name", "FilePath"]]
     
-    dfSPLProblem = dfFINAL[dfFINAL['SPL'].isin(['NoLineNameFound', 'EmptySPL', 'SPLtoSmall'])]
+    dfSPLProblem = dfFINAL[dfFINAL['SPL'].isin(['NoLineNameFound', 'EmptySPL', 'SPLtoSmall', 'SPLTimeout', 'SPLReadError'])]
     dfSPLProblem = dfSPLProblem.drop_duplicates(subset='Session Start', keep='first')
     
     lsWRONG = ["MBES", "SSS", "SBP", "MAG", "SUHRS"]    
     d = {name: pd.DataFrame() for name in lsWRONG}    
     for name, df in d.items():
         d[name] = dfFINAL[dfFINAL.apply(lambda row: '[WRONG]' in str(row[name]), axis=1)].sort_values('Session Start')
-        d[name] = d[name].append(dfFINAL[dfFINAL[name].isnull()].sort_values('Session Start')) #https://stackoverflow.com/questions/29314033/drop-rows-containing-empty-cells-from-a-pandas-dataframe/56708633#56708633
+        d[name] = pd.concat([d[name], dfFINAL[dfFINAL[name].isnull()].sort_values('Session Start')]) #https://stackoverflow.com/questions/29314033/drop-rows-containing-empty-cells-from-a-pandas-dataframe/56708633#56708633
         d[name] = movecol(d[name], cols_to_move=[name], ref_col='SPL', place='After')
     
     dfDuplSPL = dfFINAL[dfFINAL.duplicated(subset='SPL', keep=False)]
     #print(dfFINAL.apply(lambda row: str(row.MBES) in '[WRONG]', axis=1))
     
-    writer = pd.ExcelWriter(outputFolder + "\\_" + vessel + '_FINAL_Log.xlsx', engine='xlsxwriter', datetime_format='dd mmm yyyy hh:mm:ss.000')
+    writer = pd.ExcelWriter(os.path.join(outputFolder, "_" + vessel + '_FINAL_Log.xlsx'), engine='xlsxwriter', datetime_format='dd mmm yyyy hh:mm:ss.000')
       
     sheet_names = ['Summary_Process_Log', 'Full_List', 'List_Transposed', 'Rename_LN', 'Missing_SPL', 'MBES_NotMatching', 'SSS_NotMatching',
                    'SBP_NotMatching', 'MAG_NotMatching', 'SUHRS_NotMatching', 'Duplicated_SPL_Name', 'Duplicated_Sensor_Data',
-                   'SPL_Problem', 'Skip_SSS_Files', 'Wrong_SBP_Time']
+                   'SPL_Problem', 'Skip_SSS_Files', 'Wrong_SBP_Time', 'Read_Errors', 'MBES_Integrity']
               
     dfSummary.to_excel(writer, sheet_name='Summary_Process_Log', startrow=5)
     
@@ -541,6 +698,8 @@ def process(args, cmd):
     dfSPLProblem.sort_values('Session Start').to_excel(writer, sheet_name='SPL_Problem')
     dfSkip.to_excel(writer, sheet_name='Skip_SSS_Files')
     dfsgy.to_excel(writer, sheet_name='Wrong_SBP_Time')
+    dfReadErr.to_excel(writer, sheet_name='Read_Errors')
+    dfIntegrity.to_excel(writer, sheet_name='MBES_Integrity')
     
     workbook  = writer.book    
 
@@ -620,16 +779,19 @@ def process(args, cmd):
     textSUHRS = [bold, 'SUHRS_NotMatching', normal, ': SUHRS log list of all files that do not match the SPL name; without duplicated and skip files']
     textDuplSPL = [bold, 'Duplicated_SPL_Name', normal, ': List of all duplicated SPL name']
     textDuplSensor = [bold, 'Duplicated_Sensor_Data', normal, ': List of all duplicated sensors files; Based on the start time']
-    textSPLProblem = [bold, 'SPL_Problem', normal, ': List of all SPL session without a line name in the columns LineName, are empty or too small']
+    textSPLProblem = [bold, 'SPL_Problem', normal, ': List of all SPL session without a line name in the columns LineName, are empty, too small, too long to convert or not readable']
     textSkip = [bold, 'Skip_SSS_Files', normal, ': List of all SSS data that have a file size less than 1 MB']
     textsgy = [bold, 'Wrong_SBP_Time', normal, ': List of all SBP data that have a wrong timestamp']
+    textReadErr = [bold, 'Read_Errors', normal, ': List of all sensors files that could not be read (not in the others sheets)']
+    textIntegrity = [bold, 'MBES_Integrity', normal, ': List of all MBES files with corrupted, truncated or out of order datagrams (--integrity option)']
     
     ListT = [textS, textFull, textTrans, textRename, textMissingSPL, textMBES, textSSS, textSBP, textMAG, textSUHRS, textDuplSPL, textDuplSensor, 
-             textSPLProblem, textSkip, textsgy]
+             textSPLProblem, textSkip, textsgy, textReadErr, textIntegrity]
     ListHL = ['internal:Summary_Process_Log!A1', 'internal:Full_List!A1', 'internal:List_Transposed!A1', 'internal:Rename_LN!A1', 
               'internal:Missing_SPL!A1', 'internal:MBES_NotMatching!A1', 'internal:SSS_NotMatching!A1', 'internal:SBP_NotMatching!A1', 
               'internal:MAG_NotMatching!A1', 'internal:SUHRS_NotMatching!A1','internal:Duplicated_SPL_Name!A1', 'internal:Duplicated_Sensor_Data!A1', 
-              'internal:SPL_Problem!A1', 'internal:Skip_SSS_Files!A1', 'internal:Wrong_SBP_Time!A1']
+              'internal:SPL_Problem!A1', 'internal:Skip_SSS_Files!A1', 'internal:Wrong_SBP_Time!A1', 'internal:Read_Errors!A1',
+              'internal:MBES_Integrity!A1']
                 
     w['Summary_Process_Log'].write(0, 0, text1, bold)
     w['Summary_Process_Log'].write(1, 0, text2, bold)
@@ -640,7 +802,7 @@ def process(args, cmd):
         w['Summary_Process_Log'].write_url(dfSummary.shape[0] + 7 + icount, 0, l, hlink, string='Link')
         icount += 1
     
-    range_table = "B7:G{}".format(dfSummary.shape[0]+6)
+    range_table = "B7:I{}".format(dfSummary.shape[0]+6)
     range_time = "G7:G{}".format(dfSummary.shape[0]+6)
     w['Summary_Process_Log'].conditional_format(range_time, {'type': 'no_blanks',
                                                'format': cell_time})
@@ -653,13 +815,13 @@ def process(args, cmd):
             ws.write_url(0, 0, 'internal:Summary_Process_Log!A1', hlink, string='Summary')
     
     ListDF = [dfSummary, dfALL, dfFINAL, dfRenameLN, dfMissingSPL, d['MBES'], d['SSS'], d['SBP'], d['MAG'], d['SUHRS'], 
-              dfDuplSPL, dfDuplSensor, dfSPLProblem, dfSkip, dfsgy]
+              dfDuplSPL, dfDuplSensor, dfSPLProblem, dfSkip, dfsgy, dfReadErr, dfIntegrity]
     
     for df, (namews, ws) in zip(ListDF, w.items()):
         if namews != 'Summary_Process_Log':
             list1 = ['List_Transposed', 'MBES_NotMatching', 'SSS_NotMatching', 'SBP_NotMatching', 'MAG_NotMatching', 
                      'SUHRS_NotMatching', 'Duplicated_SPL_Name']
-            list2 = ['Skip_SSS_Files', 'Duplicated_Sensor_Data', 'Wrong_SBP_Time'] # TODO improve formation
+            list2 = ['Skip_SSS_Files', 'Duplicated_Sensor_Data', 'Wrong_SBP_Time', 'Read_Errors', 'MBES_Integrity'] # TODO improve formation
             for col_num, value in enumerate(df.columns.values):
                 ws.set_row(0, 25)
                 ws.write(0, col_num + 1, value, header_format)                
@@ -775,6 +937,14 @@ def process(args, cmd):
                                                                 'criteria': 'containing',
                                                                 'value':    'EmptySPL',
                                                                 'format': fWSPL})
+        i.conditional_format('%s:%s' % (SPL_start, SPL_end), {'type': 'text',
+                                                                'criteria': 'containing',
+                                                                'value':    'SPLTimeout',
+                                                                'format': fWSPL})
+        i.conditional_format('%s:%s' % (SPL_start, SPL_end), {'type': 'text',
+                                                                'criteria': 'containing',
+                                                                'value':    'SPLReadError',
+                                                                'format': fWSPL})
         i.conditional_format('%s:%s' % (SPL_start, SPL_end), {'type': 'duplicate',
                                                                 'format': fDUPL})
         
@@ -793,8 +963,7 @@ def process(args, cmd):
     text3 = 'Process Duration: ' + str((datetime.datetime.now() - now))
     w['Summary_Process_Log'].write(3, 0, text3, bold)
         
-    #workbook.close()
-    writer.save()
+    writer.close() # save() is deprecated, close() save the file
         
     print('')
     print("Subprocess Duration: ", (datetime.datetime.now() - nowExcel))
@@ -813,30 +982,80 @@ def process(args, cmd):
         #dfer.to_csv(outputFolder + "\\" + vessel + "_SPL_Problem_log.csv", index=True)
     print('')
     print(f'Logs can be found in {outputFolder}.\n')
+    if state is not None:
+        state['snapshot'] = snapshot
           
 ##########################################################
 #                       Functions                        #
 ########################################################## 
 
+##### Starfix converter #####
+# Because of a bug in the Starfix converter the version in starfixRC need to be copied in the Starfix folder (see README)
+# The starfixRC folder next to the script/exe is used if Starfix is not installed
+def findStarfixConverter():
+    exe = 'Fugro.DescribedData2Ascii.exe'
+    lsPath = [os.path.join('C:\\ProgramData\\Fugro\\Starfix2018', exe),
+              os.path.join('C:\\ProgramData\\Fugro\\Starfix2020', exe),
+              os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), 'starfixRC', exe),
+              os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'starfixRC', exe)]
+    for path in lsPath:
+        if os.path.isfile(path):
+            return os.path.normpath(path)
+    return None
+
 ##### Convert FBF/FBZ to CSV #####
-def SPL2CSV(SPLFileName, Path):
-    ##### Convert FBZ to CSV #####
-    FileName = os.path.splitext(os.path.basename(SPLFileName))[0] 
-    #print(SPLFileName)   
-    SPLFilePath = Path + "\\" + FileName + '.txt'
-    cmd = 'for %i in ("' + SPLFileName + '") do C:\ProgramData\Fugro\Starfix2018\Fugro.DescribedData2Ascii.exe -n3 %i Time LineName > "' + SPLFilePath + '"'
-    #cmd = 'for %i in ("' + SPLFileName + '") do fbf2asc -n 3 -i %i Time LineName > "' + SPLFilePath + '"'  ## OLD TOOL   
+def SPL2CSV(SPLFileName, converter, timeout):
+    """
+    Run the converter without shell and parse its output directly from the pipe (no temporary file).
+    The converter is killed after timeout [s], the session is then SPLTimeout. An output that can not be read is SPLReadError.
+    If the converter can not be started the session is ConverterError, splfc stops the run (this runs in a worker thread).
+    """
+    args = [converter, '-n3', SPLFileName, 'Time', 'LineName']
+    creationflags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0 # no console window with the GUI
+    killed = threading.Event()
     
     try:
-        subprocess.call(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, close_fds=True) #https://github.com/pyinstaller/pyinstaller/wiki/Recipe-subprocess
-        #subprocess.call(cmd, shell=True) ### For debugging
-    except subprocess.CalledProcessError:
-        os.remove(SPLFilePath)
-        print('')        
-        sys.exit(stylize(f'The following file is lock ({SPLFileName}).', fg('red')))
+        #https://github.com/pyinstaller/pyinstaller/wiki/Recipe-subprocess
+        proc = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, 
+                                creationflags=creationflags, encoding='utf-8', errors='replace')
+    except OSError as e:
+        er = f'The converter can not be started for the following file ({SPLFileName}): {e}'
+        return np.datetime64('NaT'), np.datetime64('NaT'), "ConverterError", er, np.nan, "ConverterError"
+        
+    timer = threading.Timer(timeout, lambda: (killed.set(), proc.kill()))
+    timer.start()
+    readError = False
+    try:
+        SessionStart, SessionEnd, nRows, maxGap, LineName = summarizeSPL(proc.stdout)
+    except ValueError:
+        # last line can be cut when the converter is killed, otherwise the session is logged and the other ones continue
+        readError = not killed.is_set()
+        proc.kill()
+    finally:
+        proc.stdout.close()
+        proc.wait()
+        timer.cancel()
 
     # created the variables
-    if os.path.getsize(SPLFilePath) == 0:
+    if killed.is_set():
+        er = SPLFileName
+        lnValue = "SPLTimeout"
+        SessionStart = np.datetime64('NaT')
+        SessionEnd = np.datetime64('NaT')
+        maxGap = np.nan
+        SessionName = "SPLTimeout"
+        return SessionStart, SessionEnd, lnValue, er, maxGap, SessionName
+    
+    if readError:
+        er = SPLFileName
+        lnValue = "SPLReadError"
+        SessionStart = np.datetime64('NaT')
+        SessionEnd = np.datetime64('NaT')
+        maxGap = np.nan
+        SessionName = "SPLReadError"
+        return SessionStart, SessionEnd, lnValue, er, maxGap, SessionName
+    
+    if nRows == 0:
         er = SPLFileName
         lnValue = "EmptySPL"
         SessionStart = np.datetime64('NaT')
@@ -845,40 +1064,10 @@ def SPL2CSV(SPLFileName, Path):
         SessionName = "EmptySPL"
         return SessionStart, SessionEnd, lnValue, er, maxGap, SessionName
     
-    dfS = pd.read_csv(SPLFilePath, header=None, skipinitialspace=True, names=["Time", "LineName"], parse_dates=["Time"])
-    LineName = dfS.iloc[0][-1]
-    SessionStart = dfS.iloc[0][0]
-    SessionEnd = dfS.iloc[-1][0]
-    dfS['timedelta'] = (dfS.Time-dfS.Time.shift())
-    dfS.timedelta = dfS.timedelta / np.timedelta64(1, 's')
-    maxGap = dfS.timedelta.max()
     SessionName = SessionStart.strftime('%Y%m%d%H%M')
-    #DeviceDuration = (pd.to_datetime(DeviceTime[1])-pd.to_datetime(DeviceTime[0]))
-    
-    # from https://stackoverflow.com/questions/3346430/what-is-the-most-efficient-way-to-get-first-and-last-line-of-a-text-file/3346788  
-    # Fast to read first and last row but now use anymore. Leave for future use
-    # else:
-    #     with open(SPLFilePath, 'rb') as fh:
-    #         # 2020/10/17 03:15:24.420, "M1308"
-    #         first = next(fh).decode()
-    #         try:
-    #             fh.seek(-200, os.SEEK_END) # 2 times size of the line
-    #             last = fh.readlines()[-1].decode()
-    #         except: # file less than 3 lines not working
-    #             er = SPLFileName
-    #             lnValue = "SPLtoSmall"
-    #             SessionStart = first.split(',')[0] 
-    #             SessionEnd = np.datetime64('NaT')
-    #             return SessionStart, SessionEnd, lnValue, er
-    #LineName = first.split(',')[1].replace(' ', '', 1).replace('"', '').replace('\n', '').replace('\r', '')
-    #SessionStart = first.split(',')[0]    
-    #SessionEnd = last.split(',')[0]    
 
-    #cleaning  
-    os.remove(SPLFilePath)
-    
     #checking if linename is empty as is use in all other process
-    if len(dfS) < 5:
+    if nRows < 5:
         er = SPLFileName
         lnValue = "SPLtoSmall"
         return SessionStart, SessionEnd, lnValue, er, maxGap, str(SessionName)
@@ -891,8 +1080,88 @@ def SPL2CSV(SPLFileName, Path):
         lnValue = LineName
         return SessionStart, SessionEnd, lnValue, er, maxGap, str(SessionName)
 
+# Summary of the converted SPL in one pass
+def summarizeSPL(lines, chunkSize=16384):
+    """
+    Read the "Time, LineName" lines by chunks (memory limited to one chunk) and return
+    Session Start, Session End, number of rows, max gap [s] (NaN if less than 2 rows) and the first non empty LineName.
+    """
+    nRows = 0
+    first = last = None
+    prevUs = None
+    maxGapUs = None
+    LineName = ""
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, chunkSize))
+        if not chunk:
+            break
+        times = []
+        for line in chunk:
+            # 2020/10/17 03:15:24.420, "M1308"
+            t, sep, ln = line.partition(',')
+            t = t.strip()
+            if not t:
+                continue
+            times.append(t)
+            if not LineName:
+                ln = ln.strip()
+                if len(ln) >= 2 and ln[0] == '"' and ln[-1] == '"':
+                    ln = ln[1:-1].replace('""', '"')
+                LineName = ln
+        if not times:
+            continue
+        us = splTimeMicroseconds(times)
+        gaps = np.diff(us) if prevUs is None else np.diff(us, prepend=prevUs)
+        if len(gaps) and (maxGapUs is None or gaps.max() > maxGapUs):
+            maxGapUs = int(gaps.max())
+        if first is None:
+            first = times[0]
+        last = times[-1]
+        prevUs = us[-1]
+        nRows += len(times)
+    if nRows == 0:
+        return None, None, 0, np.nan, LineName
+    maxGap = maxGapUs / 1000000 if maxGapUs is not None else np.nan
+    return parseSPLTime(first), parseSPLTime(last), nRows, maxGap, LineName
+
+# Times in integer microseconds (from 0001/01/01), the Starfix format 2020/10/17 03:15:24.420 is decoded with numpy in one go
+def splTimeMicroseconds(times):
+    text = ''.join(times)
+    if len(text) == 23 * len(times) and text.isascii():
+        d = np.frombuffer(text.encode('ascii'), dtype=np.uint8).reshape(-1, 23)
+        sep = {4: '/', 7: '/', 10: ' ', 13: ':', 16: ':', 19: '.'}
+        digits = [i for i in range(23) if i not in sep]
+        if all((d[:, i] == ord(c)).all() for i, c in sep.items()) and ((d[:, digits] >= ord('0')) & (d[:, digits] <= ord('9'))).all():
+            def num(first, n):
+                v = d[:, first].astype(np.int64) - ord('0')
+                for i in range(first + 1, first + n):
+                    v = v * 10 + (d[:, i].astype(np.int64) - ord('0'))
+                return v
+            # the date is converted only once per day
+            dayKey, inverse = np.unique(num(0, 4) * 10000 + num(5, 2) * 100 + num(8, 2), return_inverse=True)
+            dayUs = np.array([datetime.date(k // 10000, k // 100 % 100, k % 100).toordinal() for k in dayKey.tolist()], dtype=np.int64) * 86400000000
+            return (dayUs[inverse.ravel()] + (num(11, 2) * 3600 + num(14, 2) * 60 + num(17, 2)) * 1000000 + num(20, 3) * 1000)
+    # other format, one by one
+    lsUs = []
+    for t in times:
+        dt = parseSPLTime(t)
+        lsUs.append((dt.toordinal() * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second) * 1000000 + dt.microsecond)
+    return np.array(lsUs, dtype=np.int64)
+
+# Starfix time 2020/10/17 03:15:24.420, sliced directly, pandas is only used for an other format
+def parseSPLTime(t):
+    if len(t) >= 19 and t[4] == '/' and t[7] == '/' and t[10] == ' ' and t[13] == ':' and t[16] == ':':
+        fraction = t[20:26] if len(t) > 20 and t[19] == '.' else ''
+        try:
+            return datetime.datetime(int(t[0:4]), int(t[5:7]), int(t[8:10]), int(t[11:13]), int(t[14:16]), int(t[17:19]),
+                                     int(fraction.ljust(6, '0')) if fraction else 0)
+        except ValueError:
+            pass
+    return pd.Timestamp(t).to_pydatetime()
+
 # SPL convertion
-def splfc(splList, SPLFormat, dfSPL, dfer, dfSummary, outputFolder, cmd):
+def splfc(splList, SPLFormat, dfSPL, dfer, dfSummary, cmd, converter, splWorkers, splTimeout, splCache=None):
     """
     Reading SPL Files (FBF and FBZ)
     """
@@ -902,13 +1171,49 @@ def splfc(splList, SPLFormat, dfSPL, dfer, dfSummary, outputFolder, cmd):
     print('##################################################')
     nowSPL = datetime.datetime.now() # record time of the subprocess
     pbar = tqdm(total=len(splList)) if cmd else print(f"Note: Output show file counting every {math.ceil(len(splList)/10)}") #cmd vs GUI 
-            
-    for index, n in enumerate(splList): 
-        SessionStart, SessionEnd, LineName, er, maxGap, SessionName = SPL2CSV(n, outputFolder)        
-        dfSPL = dfSPL.append(pd.Series([SessionStart, SessionEnd, LineName, maxGap, SessionName], 
-                                index=dfSPL.columns ), ignore_index=True)        
-        if er: dfer = dfer.append(pd.Series([er], index=dfer.columns ), ignore_index=True)        
-        progressBar(cmd, pbar, index, splList)                   
+    
+    # The converter processes are running in parallel (splWorkers at the same time), the threads are just waiting for them
+    # the results are put back in the listing order
+    # In watch mode the sessions already converted and not modified are not converted again
+    results = [None] * len(splList)
+    index = 0
+    toConvert = []
+    for i, n in enumerate(splList):
+        key = (n, fileStamp(n))
+        if splCache is not None and key in splCache:
+            results[i] = splCache[key]
+            progressBar(cmd, pbar, index, splList)
+            index += 1
+        else:
+            toConvert.append((i, key))
+    converterError = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(splWorkers, 1)) as executor:
+        futures = {executor.submit(SPL2CSV, key[0], converter, splTimeout): (i, key) for i, key in toConvert}
+        for future in concurrent.futures.as_completed(futures):
+            i, key = futures[future]
+            results[i] = future.result()
+            if results[i][2] == 'ConverterError':
+                # the other sessions will fail the same way, the waiting ones are not started
+                converterError = results[i][3]
+                for f in futures:
+                    f.cancel()
+                break
+            if splCache is not None and results[i][2] != 'SPLTimeout':
+                splCache[key] = results[i]
+            progressBar(cmd, pbar, index, splList)
+            index += 1
+    if converterError is not None:
+        pbar.close() if cmd else None
+        print('')
+        sys.exit(stylize(converterError, fg('red')))
+    
+    rowsSPL = []
+    rowsER = []
+    for SessionStart, SessionEnd, LineName, er, maxGap, SessionName in results:
+        rowsSPL.append((SessionStart, SessionEnd, LineName, maxGap, SessionName))
+        if er: rowsER.append((er,))
+    dfSPL = appendRows(dfSPL, rowsSPL)
+    dfer = appendRows(dfer, rowsER)
 
     # Format datetime
     dfSPL['Session Start'] = pd.to_datetime(dfSPL['Session Start'], format='%Y/%m/%d %H:%M:%S.%f') # format='%d/%m/%Y %H:%M:%S.%f' format='%Y/%m/%d %H:%M:%S.%f' 
@@ -921,15 +1226,14 @@ def splfc(splList, SPLFormat, dfSPL, dfer, dfSummary, outputFolder, cmd):
     #dfSPL['Session End'] = pd.to_datetime(dfSPL['Session End'], format='%d/%m/%Y %H:%M:%S.%f')
     
     # Add the Sumary Info in a df
-    dfSummary = dfSummary.append(pd.Series([SPLFormat, len(splList), int(len(dfCount.index)/2), 'nan', 'nan', datetime.datetime.now() - nowSPL], 
-                index=dfSummary.columns ), ignore_index=True) 
+    dfSummary = appendRows(dfSummary, [(SPLFormat, len(splList), int(len(dfCount.index)/2), 'nan', 'nan', datetime.datetime.now() - nowSPL, 'nan', 'nan')])
 
     pbar.close() if cmd else print("Subprocess Duration: ", (datetime.datetime.now() - nowSPL)) # cmd vs GUI
     
     return dfSPL, dfer, dfSummary
   
 # Sensors convertion and logs creation
-def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, vessel):
+def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL, dfSummary, dfFINAL, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr, vessel, workers, cache):
     """
     Main function to create the sensors files.    
     """
@@ -942,8 +1246,9 @@ def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL,
     # Need to be declare fully in case of manipulated df (DO NOT CHANGE)
     col = ["Session Start", "Session End", "Session Name", "Session MaxGap", "Vessel Name", "Sensor Start", "Difference Start [s]",
            "Sensor Type", "Sensor FileName", "SPL LineName", "FilePath"]
-    dfSensors = pd.DataFrame(columns = col)
-    dftmp = pd.DataFrame(columns = col)
+    # The end and ping count of the SSS files are only in the Full log, not used for the matching
+    colEnd = ["Sensor End", "Ping Count"] if ssFormat == 'SSS' else []
+    dfSensors = pd.DataFrame(columns = col + colEnd)
 
     nowSensor = datetime.datetime.now()  # record time of the subprocess
     nowMain = datetime.datetime.now()  # record time of the main process       
@@ -951,91 +1256,85 @@ def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL,
           
     # Reading the sensors files 
     SType =  ssFormat
-    if firstrun == 'Folder':    
-        for index, f in enumerate(lsFile):
-            fName = os.path.splitext(os.path.basename(f))[0]        
-            # MBES *.all Format https://github.com/pktrigg/pyall
-            if ssFormat == 'MBES':
-                r = ALLReader(f)          
-                numberOfBytes, STX, typeOfDatagram, EMModel, RecordDate, RecordTime = r.readDatagramHeader() # read the common header for any datagram.
-                fStart = to_DateTime(RecordDate, RecordTime)
-                r.rewind()
-                r.close() 
-                
-            # SSS *.xtf Files https://github.com/pktrigg/pyxtf
-            if ssFormat == 'SSS':
-                file_size = os.path.getsize(f)/(1024*1024)
-                if file_size > 1: # skip file smaller than 1 MB
-                    r = XTFReader(f)            
-                    pingHdr = r.readPacket()
-                    if pingHdr != None:
-                        fStart = datetime.datetime(pingHdr.Year, pingHdr.Month, pingHdr.Day, pingHdr.Hour, pingHdr.Minute, pingHdr.Second, pingHdr.HSeconds * 10000)
-                        #FileNameinXTF = r.XTFFileHdr.ThisFileName                     
-                    r.rewind()
-                    r.close()
-                else:
-                    dfSkip = dfSkip.append(pd.Series([f, file_size], index=dfSkip.columns ), ignore_index=True)
-                
-            # SBP/SUHRS *.sgy Files https://docs.obspy.org/master/packages/obspy.io.segy.html
-            # TODO not very fast. See if other package can be faster to just read first trace starttime
-            if ssFormat in ['SBP', 'SUHRS']:
-                r = read(f, headonly=False)
-                rStart = str(r[0].stats.starttime) # 2020-05-22T17:26:47.000000Z
-                #print(f'START: {rStart}  END: {rEnd}')
-                fStart = datetime.datetime.strptime(rStart, '%Y-%m-%dT%H:%M:%S.%fZ') # .split(' | ')[1].split(' - ')[0]
-                
-            # MAG *.csv
-            if ssFormat == 'MAG':
-                r = pd.read_csv(f, usecols=[0,1,2], nrows=1, parse_dates=[['Date', 'Time']])
-                #print(r)
-                fStart = r['Date_Time'].iloc[0]
-            
-            progressBar(cmd, pbar, index, lsFile)
-            # Add the Sensor Info in a df
-            dfSensors = dfSensors.append(pd.Series(["", "", "", "", vessel, fStart, "", SType, fName, "", f], index=dfSensors.columns), 
-                                         ignore_index=True) 
+    rows = []
+    rowsSkip = []
+    rowsErr = []
+    hits0, misses0 = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    if firstrun == 'Folder':
+        results = [None] * len(lsFile)
+        # Only the new or changed files are read, the others come from the cache
+        index = 0
+        toRead = []
+        for i, f in enumerate(lsFile):
+            cached = cache.get(f, ssFormat) if cache is not None else None
+            if cached is not None:
+                results[i] = cached + (None,)
+                progressBar(cmd, pbar, index, lsFile)
+                index += 1
+            else:
+                toRead.append(i)
+        
+        if workers > 1 and len(toRead) > 1:
+            # Reading the files is mostly waiting for the disk/network, read them in parallel
+            # the results are put back in the listing order to keep the logs deterministic
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(readSensorFile, lsFile[i], ssFormat): i for i in toRead}
+                for future in concurrent.futures.as_completed(futures):
+                    results[futures[future]] = future.result()
+                    progressBar(cmd, pbar, index, lsFile)
+                    index += 1
+        else:
+            for i in toRead:
+                results[i] = readSensorFile(lsFile[i], ssFormat)
+                progressBar(cmd, pbar, index, lsFile)
+                index += 1
+        
+        if cache is not None:
+            for i in toRead:
+                fStart, fEnd, pingCount, fileSize, error = results[i]
+                if error is None:
+                    cache.put(lsFile[i], ssFormat, fStart, fEnd, pingCount, fileSize)
+            cache.commit()
+
+        for f, (fStart, fEnd, pingCount, fileSize, error) in zip(lsFile, results):
+            if error is not None:
+                rowsErr.append((f, SType, error))
+            elif fStart is None:
+                rowsSkip.append((f, fileSize))
+            else:
+                # Add the Sensor Info in a df
+                rows.append(("", "", "", "", vessel, fStart, "", SType, os.path.splitext(os.path.basename(f))[0], "", f) + ((fEnd, pingCount) if colEnd else ()))
         
     if firstrun == 'File':
-        for index, row in lsFile.iterrows():
-            f = row['FilePath']
-            fName = os.path.splitext(os.path.basename(f))[0]
-            fStart = row['Sensor Start']             
-            progressBar(cmd, pbar, index, lsFile)                   
-            # Add the Sensor Info in a df
-            dfSensors = dfSensors.append(pd.Series(["", "", "", "", vessel, fStart, "", SType, fName, "", f], index=dfSensors.columns), 
-                                         ignore_index=True)        
+        # Add the Sensor Info in a df, the Full log of an older version has no Sensor End and Ping Count
+        ends = lsFile.reindex(columns=colEnd).itertuples(index=False, name=None)
+        rows = [("", "", "", "", vessel, fStart, "", SType, os.path.splitext(os.path.basename(f))[0], "", f) + end
+                for fStart, f, end in zip(lsFile['Sensor Start'], lsFile['FilePath'], ends)]
+        if len(lsFile) > 0:
+            pbar.update(len(lsFile)) if cmd else print_progress(len(lsFile)-1, len(lsFile)) # cmd vs GUI
+    
+    dfSensors = appendRows(dfSensors, rows)
+    dfSkip = appendRows(dfSkip, rowsSkip)
+    dfReadErr = appendRows(dfReadErr, rowsErr)
                           
     pbar.close() if cmd else print("Subprocess Duration: ", (datetime.datetime.now() - nowSensor)) # cmd vs GUI
+    if rowsErr:
+        print("")
+        print(f"A total of {len(rowsErr)} *{ext} ({ssFormat}) file(s) could not be read.")
+        print(f"Please check the Read_Errors sheet in the _{vessel}_FINAL_Log.xlsx for more information.")
 
     # Format datetime
     dfSensors['Sensor Start'] = pd.to_datetime(dfSensors['Sensor Start'])  # format='%d/%m/%Y %H:%M:%S.%f' format='%Y/%m/%d %H:%M:%S.%f'
+    if colEnd:
+        dfSensors['Sensor End'] = pd.to_datetime(dfSensors['Sensor End'])
      
     print('')
     print(f'Listing the *{ext} ({ssFormat}) files.\nPlease wait......')
     nowListing = datetime.datetime.now()  # record time of the subprocess
     
     # Logs and renaming the Sensors files
-    for index, row in dfSPL.iterrows():                          
-        splStart = row['Session Start']
-        splEnd = row['Session End']
-        splName = row['SPL LineName']
-        SessionGap = row['Session MaxGap']
-        SessionName = row['Session Name']
-        #SensorType =  row['Sensor Type']
-        dffilter = dfSensors[dfSensors['Sensor Start'].between(splStart-datetime.timedelta(seconds=int(buffer)), splEnd)]   
-        for index, el in dffilter.iterrows():
-            #print(el)
-            SensorFile =  el['FilePath']
-            SensorStart = el['Sensor Start']           
-            SensorDiff = (splStart - SensorStart) / np.timedelta64(1, 's')  
-            SensorName = os.path.splitext(os.path.basename(SensorFile))[0]
-            if str(splName) in SensorName: # use for conditional formating and because I group linename under the same Session some sensor can contain or not the SPL linename
-                SNameCond = SensorName + ' [OK]'
-            else:
-                SNameCond = SensorName + ' [WRONG]'                      
-            dftmp = dftmp.append(pd.Series([splStart, splEnd, SessionName, SessionGap, vessel, SensorStart, SensorDiff, SType, 
-                                            SNameCond, splName, SensorFile], index=dftmp.columns), ignore_index=True)
- 
+    dftmp = matchSessions(dfSPL, dfSensors, buffer, vessel, SType, col)
+
     print("Subprocess Duration: ", (datetime.datetime.now() - nowListing)) # cmd vs GUI
     
            
@@ -1059,7 +1358,7 @@ def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL,
     # Droping duplicated and creating a log.
     # TODO remove duplicated created by buffer
     dfCountDupl = dftmp[dftmp.duplicated(subset='Sensor Start', keep=False)].sort_values('Sensor Start')
-    dfDuplSensor = dfDuplSensor.append(dftmp[dftmp.duplicated(subset='Sensor Start', keep=False)].sort_values('Sensor Start'))
+    dfDuplSensor = pd.concat([dfDuplSensor, dftmp[dftmp.duplicated(subset='Sensor Start', keep=False)].sort_values('Sensor Start')])
     if not dfCountDupl.empty:
         print("")
         print(f"A total of {int(len(dfCountDupl.index)/2)} *{ext} file(s) was/were duplicated.")
@@ -1087,10 +1386,10 @@ def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL,
     dfSensors['Session End'] = pd.to_datetime(dfSensors['Session End'], unit='s')
 
     # Saving the Full log
-    dfSensors.to_csv(outputFolder + "\\" + vessel + "_" + ssFormat + "_Full_Log.csv", index=False)
+    dfSensors.to_csv(os.path.join(outputFolder, vessel + "_" + ssFormat + "_Full_Log.csv"), index=False)
     
     # Creating the FINAL df
-    dfMissingSPL = dfMissingSPL.append(dfSensors)
+    dfMissingSPL = pd.concat([dfMissingSPL, dfSensors])
     #dfMissingSPL['Sensor Type'] = ssFormat
 
     dfFINAL.set_index('Session Start', inplace=True)
@@ -1104,10 +1403,189 @@ def sensorsfc(firstrun, lsFile, ssFormat, ext, cmd, buffer, outputFolder, dfSPL,
     #print(dfFINAL.to_markdown(tablefmt="github", index=False))
     
     # Add the Sumary Info in a df
-    dfSummary = dfSummary.append(pd.Series([ssFormat, len(lsFile), int(len(dfCountDupl.index)/2), len(dfsgy) if ssFormat == 'SBP' else 'nan', 'nan', datetime.datetime.now() - nowMain], 
-                index=dfSummary.columns), ignore_index=True) 
+    cacheHits = cache.hits - hits0 if cache is not None and firstrun == 'Folder' else 'nan'
+    cacheMisses = cache.misses - misses0 if cache is not None and firstrun == 'Folder' else 'nan'
+    dfSummary = appendRows(dfSummary, [(ssFormat, len(lsFile), int(len(dfCountDupl.index)/2), len(dfsgy) if ssFormat == 'SBP' else 'nan', 'nan', 
+                                        datetime.datetime.now() - nowMain, cacheHits, cacheMisses)])
+    
+    return dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy, dfReadErr
+
+# Check all the datagrams of the *.all files
+def integrityfc(lsFile, cmd, workers, dfIntegrity, vessel, integrityCache=None):
+    """
+    Scan the *.all files for corrupted (checksum, STX/ETX), truncated and out of order datagrams.
+    Only the files with a problem are added to dfIntegrity. integrityCache (watch mode) keeps the result of the files that did not change.
+    """
+    print('')
+    print('##################################################')
+    print('CHECKING THE INTEGRITY OF THE *.all (MBES) FILES')
+    print('##################################################')
+    nowIntegrity = datetime.datetime.now()  # record time of the subprocess
+    pbar = tqdm(total=len(lsFile)) if cmd else print(f"Note: Output show file counting every {math.ceil(len(lsFile)/10)}") # cmd vs GUI
+    
+    results = [None] * len(lsFile)
+    stamps = [fileStamp(f) for f in lsFile]
+    index = 0
+    toRead = []
+    for i, f in enumerate(lsFile):
+        if integrityCache is not None and f in integrityCache and integrityCache[f][0] == stamps[i]:
+            results[i] = integrityCache[f][1]
+            progressBar(cmd, pbar, index, lsFile)
+            index += 1
+        else:
+            toRead.append(i)
+    
+    if workers > 1 and len(toRead) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(checkALLIntegrity, lsFile[i]): i for i in toRead}
+            for future in concurrent.futures.as_completed(futures):
+                results[futures[future]] = future.result()
+                progressBar(cmd, pbar, index, lsFile)
+                index += 1
+    else:
+        for i in toRead:
+            results[i] = checkALLIntegrity(lsFile[i])
+            progressBar(cmd, pbar, index, lsFile)
+            index += 1
     
-    return dfFINAL, dfSummary, dfMissingSPL, dfDuplSensor, dfSkip, dfsgy
+    if integrityCache is not None:
+        for i in toRead:
+            integrityCache[lsFile[i]] = (stamps[i], results[i])
+    
+    rows = [(f,) + r for f, r in zip(lsFile, results) if r[-1] is not None or r[-2] != -1]
+    dfIntegrity = appendRows(dfIntegrity, rows)
+    
+    pbar.close() if cmd else print("Subprocess Duration: ", (datetime.datetime.now() - nowIntegrity)) # cmd vs GUI
+    if rows:
+        print("")
+        print(f"A total of {len(rows)} *.all (MBES) file(s) have corrupted datagrams.")
+        print(f"Please check the MBES_Integrity sheet in the _{vessel}_FINAL_Log.xlsx for more information.")
+    return dfIntegrity
+
+# Check one *.all file, top level function to be pickled by the process pool
+def checkALLIntegrity(f):
+    """
+    Return (Datagrams, Checksum Errors, Bad STX/ETX, Truncated, Time Backwards, First Error Offset, Error).
+    First Error Offset is -1 and Error None for a good file.
+    """
+    try:
+        r = ALLReader(f, useMMAP=True)
+        try:
+            res = r.checkIntegrity()
+        finally:
+            r.close()
+        return (res['Datagrams'], res['Checksum Errors'], res['Bad STX/ETX'], res['Truncated'], res['Time Backwards'],
+                res['First Error Offset'], None)
+    except Exception as e:
+        return (0, 0, 0, 0, 0, -1, f'{type(e).__name__}: {e}')
+
+# Read the start time of one sensor file, top level function to be pickled by the process pool
+def readSensorFile(f, ssFormat):
+    """
+    Return (Sensor Start, Sensor End, Ping Count, File Size [MB], Error).
+    Sensor Start is None for the SSS files skipped (smaller than 1 MB), Error is None if the file was read.
+    Sensor End and Ping Count are only read for the SSS files (last ping found from the end of the file), None for the others.
+    """
+    try:
+        # MBES *.all Format https://github.com/pktrigg/pyall
+        if ssFormat == 'MBES':
+            r = ALLReader(f)
+            try:
+                numberOfBytes, STX, typeOfDatagram, EMModel, RecordDate, RecordTime = r.readDatagramHeader() # read the common header for any datagram.
+            finally:
+                r.close() # always closed, a file left open in the pool can not be moved (--move) on Windows
+            fStart = to_DateTime(RecordDate, RecordTime)
+            return fStart, None, None, None, None
+            
+        # SSS *.xtf Files https://github.com/pktrigg/pyxtf
+        if ssFormat == 'SSS':
+            file_size = os.path.getsize(f)/(1024*1024)
+            if file_size <= 1: # skip file smaller than 1 MB
+                return None, None, None, file_size, None
+            r = XTFReader(f)
+            try:
+                pingHdr = r.readPingHeaderOnly() # the ping time only, the sonar samples are not read
+                if pingHdr == None:
+                    return None, None, None, file_size, 'No ping found in the file'
+                lastHdr = r.readLastPingHeader() or pingHdr # a few KB read backwards from the end of the file
+            finally:
+                r.close()
+            fStart = datetime.datetime(pingHdr.Year, pingHdr.Month, pingHdr.Day, pingHdr.Hour, pingHdr.Minute, pingHdr.Second, pingHdr.HSeconds * 10000)
+            fEnd = datetime.datetime(lastHdr.Year, lastHdr.Month, lastHdr.Day, lastHdr.Hour, lastHdr.Minute, lastHdr.Second, lastHdr.HSeconds * 10000)
+            pingCount = lastHdr.PingNumber - pingHdr.PingNumber + 1 # from the ping numbers, the pings are not counted
+            #FileNameinXTF = r.XTFFileHdr.ThisFileName
+            return fStart, fEnd, pingCount, file_size, None
+            
+        # SBP/SUHRS *.sgy Files, just read the headers of the first trace
+        # obspy is only used when the headers look unusual https://docs.obspy.org/master/packages/obspy.io.segy.html
+        if ssFormat in ['SBP', 'SUHRS']:
+            fStart = readSEGYStartTime(f)
+            if fStart is None:
+                r = read(f, headonly=False)
+                rStart = str(r[0].stats.starttime) # 2020-05-22T17:26:47.000000Z
+                fStart = datetime.datetime.strptime(rStart, '%Y-%m-%dT%H:%M:%S.%fZ') # .split(' | ')[1].split(' - ')[0]
+            return fStart, None, None, None, None
+            
+        # MAG *.csv
+        if ssFormat == 'MAG':
+            r = pd.read_csv(f, usecols=[0,1,2], nrows=1, parse_dates=[['Date', 'Time']])
+            fStart = r['Date_Time'].iloc[0]
+            return fStart, None, None, None, None
+    except Exception as e:
+        return None, None, None, None, f'{type(e).__name__}: {e}'
+    return None, None, None, None, f'Unknown sensor format {ssFormat}'
+
+# Match the sensors files to the SPL sessions
+def matchSessions(dfSPL, dfSensors, buffer, vessel, SType, col):
+    """
+    Assign every sensor file to the session(s) where Session Start - buffer <= Sensor Start <= Session End.
+    The sensors start are sorted once and each session window is found with np.searchsorted,
+    the pairs keep the same order as a scan session by session (session order, then sensor order).
+    """
+    sensorStart = dfSensors['Sensor Start'].to_numpy(dtype='datetime64[ns]')
+    splStart = dfSPL['Session Start'].to_numpy(dtype='datetime64[ns]')
+    splEnd = dfSPL['Session End'].to_numpy(dtype='datetime64[ns]')
+
+    # Sorted sensors start without NaT (never inside a session)
+    valid = np.flatnonzero(~np.isnat(sensorStart))
+    order = valid[np.argsort(sensorStart[valid], kind='stable')]
+    sortedStart = sensorStart[order]
+
+    # Window of each session in the sorted sensors start
+    lo = np.searchsorted(sortedStart, splStart - np.timedelta64(int(buffer), 's'), side='left')
+    hi = np.searchsorted(sortedStart, splEnd, side='right')
+    counts = np.maximum(hi - lo, 0)
+    counts[np.isnat(splStart) | np.isnat(splEnd)] = 0
+
+    # Expand the windows in (session, sensor) pairs
+    session = np.repeat(np.arange(len(dfSPL)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    sensor = order[np.repeat(lo, counts) + within]
+    pairs = np.lexsort((sensor, session))
+    session = session[pairs]
+    sensor = sensor[pairs]
+
+    dfS = dfSPL.iloc[session]
+    SensorFile = dfSensors['FilePath'].to_numpy()
+    SensorName = np.array([os.path.splitext(os.path.basename(f))[0] for f in SensorFile], dtype=object)
+    SensorFile = SensorFile[sensor]
+    SensorName = SensorName[sensor]
+    # use for conditional formating and because I group linename under the same Session some sensor can contain or not the SPL linename
+    SNameCond = [n + ' [OK]' if str(ln) in n else n + ' [WRONG]' for ln, n in zip(dfS['SPL LineName'], SensorName)]
+
+    dftmp = pd.DataFrame({'Session Start': splStart[session],
+                          'Session End': splEnd[session],
+                          'Session Name': dfS['Session Name'].to_numpy(),
+                          'Session MaxGap': dfS['Session MaxGap'].to_numpy(),
+                          'Vessel Name': vessel,
+                          'Sensor Start': sensorStart[sensor],
+                          'Difference Start [s]': (splStart[session] - sensorStart[sensor]) / np.timedelta64(1, 's'),
+                          'Sensor Type': SType,
+                          'Sensor FileName': SNameCond,
+                          'SPL LineName': dfS['SPL LineName'].to_numpy(),
+                          'FilePath': SensorFile}, columns=col)
+
+    return dftmp
 
 # Move MAG and SUHRS function
 def mvSensorFile (lsFile, VesselFolder, WrongFolder, cmd, ssFormat, dfSummary):
@@ -1173,17 +1651,102 @@ def progressBar(cmd, pbar, index, ls):
         if index % math.ceil(len(ls)/10) == 0: # decimate print
             print(f"Files Process: {index+1}/{len(ls)}") 
 
+# Add all the rows (list of tuples) to a df in one go. DataFrame.append copy the full df on every call
+def appendRows(df, rows):
+    return pd.concat([df, pd.DataFrame(rows, columns=df.columns)], ignore_index=True)
+
+# Size and modification time of a file, use to know if a file changed
+def fileStamp(f):
+    try:
+        st = os.stat(f)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+# Remove the old logs, stop if a file is open
+def cleanOutputFolder(outputFolder):
+    for fi in glob.glob(os.path.join(outputFolder, '*')):
+        try:
+            #fp = open(fi, "r+")
+            os.remove(fi)
+        except IOError:
+            print('')
+            sys.exit(stylize(f'The following file is lock ({fi}).\nPlease close the files in the "{outputFolder}" folder', fg('red')))      
+
 # List file in subfolder with exclude
-def listFile(Folder, ext, exclude):
-    ls = []
-    for root, dirs, files in os.walk(Folder, topdown=True):
-        dirs[:] = [d for d in dirs if d not in exclude]
-        for filename in files:                
-            if filename.lower().endswith(ext): #call lower to make the string lowercase before calling endswith
-                filepath = os.path.join(root, filename)
-                ls.append(filepath)
+def listFile(Folder, ext, exclude, threads=1):
     print(f'Start Listing for {Folder}')
-    return ls
+    dictFile = scanFolder(Folder, {'File': lambda name: name.endswith(ext)}, exclude, threads) #call lower to make the string lowercase before calling endswith
+    return dictFile['File']
+
+# Walk a folder once with os.scandir and keep the files wanted, {key: function(filename in lowercase) -> True/False}
+# the excluded folders are not walked, the top level subfolders can be walked in parallel (network drive)
+def scanFolder(Folder, wanted, exclude=set(), threads=1):
+    nowScan = datetime.datetime.now() # record time of the subprocess
+    
+    def walk(top):
+        found = {key: [] for key in wanted}
+        nDirs, nFiles = 0, 0
+        stack = [top]
+        while stack:
+            folder = stack.pop()
+            nDirs += 1
+            try:
+                it = os.scandir(folder)
+            except OSError: # same as os.walk, folder not accessible are ignored
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        isDir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        isDir = False
+                    if isDir:
+                        if entry.name not in exclude:
+                            stack.append(entry.path)
+                    else:
+                        nFiles += 1
+                        name = entry.name.lower()
+                        for key, match in wanted.items():
+                            if match(name):
+                                found[key].append(entry.path)
+        return found, nDirs, nFiles
+    
+    lsTop = []
+    if threads > 1:
+        # the files of the root folder are listed here, each subfolder is walked in a thread
+        found = {key: [] for key in wanted}
+        nDirs, nFiles = 1, 0
+        try:
+            with os.scandir(Folder) as it:
+                for entry in it:
+                    try:
+                        isDir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        isDir = False
+                    if isDir:
+                        if entry.name not in exclude:
+                            lsTop.append(entry.path)
+                    else:
+                        nFiles += 1
+                        for key, match in wanted.items():
+                            if match(entry.name.lower()):
+                                found[key].append(entry.path)
+        except OSError:
+            pass
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            for subFound, subDirs, subFiles in executor.map(walk, lsTop):
+                for key in wanted:
+                    found[key].extend(subFound[key])
+                nDirs += subDirs
+                nFiles += subFiles
+    else:
+        found, nDirs, nFiles = walk(Folder)
+    
+    for key in wanted:
+        found[key].sort()
+    print(f'{nDirs} folders and {nFiles} files scanned in {Folder} ({datetime.datetime.now() - nowScan})')
+    return found
 
 # Simulate autofit column in xslxwriter https://stackoverflow.com/questions/29463274/simulate-autofit-column-in-xslxwriter
 def get_col_widths(dataframe):
@@ -1219,6 +1782,7 @@ if __name__ == "__main__":
     # Prevent stdout buffering     
     #nonbuffered_stdout = os.fdopen(sys.stdout.fileno(), 'w') #https://stackoverflow.com/questions/45263064/how-can-i-fix-this-valueerror-cant-have-unbuffered-text-i-o-in-python-3/45263101
     #sys.stdout = nonbuffered_stdout
+    multiprocessing.freeze_support() # needed by the process pool in the pyinstaller exe
     main()
     print('')
     print("Process Duration: ", (datetime.datetime.now() - now)) # print the processing time. It is handy to keep an eye on processing performance.
\ No newline at end of file
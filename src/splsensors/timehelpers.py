@@ -0,0 +1,78 @@
+#name:		  timehelpers
+#created:	   December 2020
+#description:   time helper functions shared by pyall and pyXTF
+#notes:		 the scalar functions return the same values as the original pyall/pyXTF helpers
+
+# A survey file has only a few different dates, so the date parsing is memoised and the time of the day added to it.
+# The array versions convert whole columns (index, navigation, attitude) with integer arithmetic only, no python datetime.
+
+from datetime import datetime
+from datetime import timedelta
+from functools import lru_cache
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+
+###############################################################################
+# SCALAR FUNCTIONS
+###############################################################################
+@lru_cache(maxsize=1024)
+def kongsbergDate(recordDate):
+	'''return a python date object from a kongsberg date yyyymmdd. memoised'''
+	return datetime.strptime(str(recordDate), '%Y%m%d')
+
+def to_DateTime(recordDate, recordTime):
+	'''return a python date object from a split date and time record. works with kongsberg date and time structures'''
+	return kongsbergDate(recordDate) + timedelta(0, recordTime)
+
+def to_timestamp(dateObject):
+	return (dateObject - EPOCH).total_seconds()
+
+def from_timestamp(unixtime):
+	return datetime.utcfromtimestamp(unixtime)
+
+def dateToKongsbergDate(dateObject):
+	return dateObject.strftime('%Y%m%d')
+
+def dateToKongsbergTime(dateObject):
+	return dateObject.strftime('%H%M%S')
+
+def dateToSecondsSinceMidnight(dateObject):
+	return (dateObject - dateObject.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+
+def kongsbergDateTimeKey(unixtime):
+	'''return (kongsberg date yyyymmdd, seconds since midnight) of a unix timestamp, comparable with the RecordDate, RecordTime of the datagram headers'''
+	dateObject = from_timestamp(unixtime)
+	return int(dateToKongsbergDate(dateObject)), dateToSecondsSinceMidnight(dateObject)
+
+###############################################################################
+# ARRAY FUNCTIONS
+###############################################################################
+def daysFromCivil(year, month, day):
+	'''number of days since 1970-01-01 of a proleptic gregorian date (H. Hinnant algorithm). works on ints and numpy integer arrays'''
+	year = year - (month <= 2)
+	era = year // 400
+	yearOfEra = year - era * 400
+	dayOfYear = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+	dayOfEra = yearOfEra * 365 + yearOfEra // 4 - yearOfEra // 100 + dayOfYear
+	return era * 146097 + dayOfEra - 719468
+
+def recordDatetime64(recordDate, recordTime):
+	'''numpy datetime64[ns] of arrays of kongsberg date (yyyymmdd) and time (ms since midnight, can go past midnight)'''
+	recordDate = np.asarray(recordDate, dtype=np.int64)
+	days = daysFromCivil(recordDate // 10000, recordDate // 100 % 100, recordDate % 100)
+	return (days * 86400000000000 + np.asarray(recordTime, dtype=np.int64) * 1000000).astype('datetime64[ns]')
+
+def recordTimestamps(recordDate, recordTime):
+	'''unix timestamps of arrays of kongsberg date (yyyymmdd) and time (ms since midnight), same as to_timestamp(to_DateTime(date, time/1000)) without the python loop'''
+	return datetime64ToTimestamps(recordDatetime64(recordDate, recordTime))
+
+def datetime64ToTimestamps(times):
+	'''unix timestamps of a datetime64 array, the same floats as to_timestamp: microseconds / 1e6 (nanoseconds / 1e9 can differ by one bit)'''
+	return np.asarray(times).astype('datetime64[us]').astype(np.int64) / 1000000.0
+
+def civilDatetime64(year, month, day, hour, minute, second, microsecond=0):
+	'''numpy datetime64[ns] of arrays of date and time fields, as the XTF ping headers'''
+	days = daysFromCivil(np.asarray(year, dtype=np.int64), np.asarray(month, dtype=np.int64), np.asarray(day, dtype=np.int64))
+	seconds = (np.asarray(hour, dtype=np.int64) * 60 + np.asarray(minute, dtype=np.int64)) * 60 + np.asarray(second, dtype=np.int64)
+	return ((days * 86400 + seconds) * 1000000000 + np.asarray(microsecond, dtype=np.int64) * 1000).astype('datetime64[ns]')
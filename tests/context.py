@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+# The modules of splsensors import each other by name (import geodetic, from pyall import *),
+# the tests and benchmarks put their folder first in the path.
+
+import os
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'splsensors'))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
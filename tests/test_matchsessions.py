@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from . import context
+
+try:
+    import splsensors
+except ImportError as e: # the GUI packages (gooey) are not installed
+    splsensors = None
+    importError = e
+
+COL = ["Session Start", "Session End", "Session Name", "Session MaxGap", "Vessel Name", "Sensor Start", "Difference Start [s]",
+       "Sensor Type", "Sensor FileName", "SPL LineName", "FilePath"]
+
+# The matching of splsensors 0.3.8, one scan of the sensors per session (DataFrame.append replaced by a list)
+def oldMatchSessions(dfSPL, dfSensors, buffer, vessel, SType):
+    rows = []
+    for index, row in dfSPL.iterrows():
+        splStart = row['Session Start']
+        splEnd = row['Session End']
+        splName = row['SPL LineName']
+        SessionGap = row['Session MaxGap']
+        SessionName = row['Session Name']
+        dffilter = dfSensors[dfSensors['Sensor Start'].between(splStart-datetime.timedelta(seconds=int(buffer)), splEnd)]
+        for index, el in dffilter.iterrows():
+            SensorFile = el['FilePath']
+            SensorStart = el['Sensor Start']
+            SensorDiff = (splStart - SensorStart) / np.timedelta64(1, 's')
+            SensorName = os.path.splitext(os.path.basename(SensorFile))[0]
+            if str(splName) in SensorName:
+                SNameCond = SensorName + ' [OK]'
+            else:
+                SNameCond = SensorName + ' [WRONG]'
+            rows.append([splStart, splEnd, SessionName, SessionGap, vessel, SensorStart, SensorDiff, SType, SNameCond, splName, SensorFile])
+    return pd.DataFrame(rows, columns=COL)
+
+def randomSurvey(rng, nSessions, nFiles):
+    '''sessions of 10 to 60 min, some overlapping, and sensors files starting around them; a few NaT on both sides'''
+    t0 = np.datetime64('2020-12-10T00:00:00', 'ns')
+    start = t0 + np.cumsum(rng.integers(5, 3600, nSessions)).astype('timedelta64[s]')
+    end = start + rng.integers(600, 3600, nSessions).astype('timedelta64[s]')
+    start[rng.random(nSessions) < 0.05] = np.datetime64('NaT')
+    names = ['L%03d' % i for i in rng.integers(0, nSessions // 2 + 1, nSessions)]
+    dfSPL = pd.DataFrame({'Session Start': start, 'Session End': end, 'SPL LineName': names,
+                          'Session MaxGap': rng.integers(0, 30, nSessions), 'Session Name': ['S%04d' % i for i in range(nSessions)]})
+    sensorStart = t0 + rng.integers(-3600, int((end[-1] - t0) / np.timedelta64(1, 's')) + 3600, nFiles).astype('timedelta64[s]') \
+        + rng.integers(0, 1000, nFiles).astype('timedelta64[ms]')
+    sensorStart[rng.random(nFiles) < 0.05] = np.datetime64('NaT')
+    files = ['/data/MBES/0%03d_%s_%d.all' % (i, names[rng.integers(0, nSessions)], i) for i in range(nFiles)]
+    dfSensors = pd.DataFrame({'Sensor Start': sensorStart, 'FilePath': files})
+    return dfSPL, dfSensors
+
+class TestMatchSessions(unittest.TestCase):
+    def setUp(self):
+        if splsensors is None:
+            raise unittest.SkipTest(f'splsensors can not be imported: {importError}')
+
+    def check(self, dfSPL, dfSensors, buffer):
+        new = splsensors.matchSessions(dfSPL, dfSensors, buffer, 'V1', 'MBES', COL)
+        old = oldMatchSessions(dfSPL, dfSensors, buffer, 'V1', 'MBES')
+        self.assertEqual(len(new), len(old))
+        for c in ['Session Start', 'Session End', 'Sensor Start']:
+            np.testing.assert_array_equal(new[c].to_numpy(dtype='datetime64[ns]'), old[c].to_numpy(dtype='datetime64[ns]'))
+        np.testing.assert_array_equal(new['Difference Start [s]'].to_numpy(dtype=float), old['Difference Start [s]'].to_numpy(dtype=float))
+        for c in ['Session Name', 'Session MaxGap', 'Vessel Name', 'Sensor Type', 'Sensor FileName', 'SPL LineName', 'FilePath']:
+            self.assertEqual(new[c].tolist(), old[c].tolist(), c)
+
+    def test_random_surveys(self):
+        rng = np.random.default_rng(1)
+        for nSessions, nFiles, buffer in [(1, 5, 0), (20, 300, 60), (50, 400, 3600), (100, 1000, 5)]:
+            self.check(*randomSurvey(rng, nSessions, nFiles), buffer)
+
+    def test_window_limits(self):
+        # sensors exactly on Session Start - buffer and Session End are inside the session
+        t = pd.Timestamp('2020-12-10 01:00:00')
+        dfSPL = pd.DataFrame({'Session Start': [t], 'Session End': [t + pd.Timedelta(minutes=10)], 'SPL LineName': ['L001'],
+                              'Session MaxGap': [0], 'Session Name': ['S0001']})
+        dfSensors = pd.DataFrame({'Sensor Start': [t - pd.Timedelta(seconds=30), t - pd.Timedelta(seconds=31), t + pd.Timedelta(minutes=10),
+                                                   t + pd.Timedelta(minutes=10, milliseconds=1)],
+                                  'FilePath': ['/a/0001_L001.all', '/a/0002_L001.all', '/a/0003_L002.all', '/a/0004_L001.all']})
+        self.check(dfSPL, dfSensors, 30)
+        new = splsensors.matchSessions(dfSPL, dfSensors, 30, 'V1', 'MBES', COL)
+        self.assertEqual(new['Sensor FileName'].tolist(), ['0001_L001 [OK]', '0003_L002 [WRONG]'])
+        self.assertEqual(new['Difference Start [s]'].tolist(), [30.0, -600.0])
+
+    def test_no_match(self):
+        dfSPL, dfSensors = randomSurvey(np.random.default_rng(2), 10, 0)
+        self.assertEqual(len(splsensors.matchSessions(dfSPL, dfSensors, 5, 'V1', 'MBES', COL)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from . import context
+from pyall import ALLReader
+from benchmarks.synthetic_all import writeALL
+
+class ExportedView:
+    '''a view of the map that can not be released, as when something still holds a buffer of it'''
+    def release(self):
+        raise BufferError('memoryview has 1 exported buffer')
+
+class TestMMAPClose(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.fileName = os.path.join(cls.folder, 'synthetic.all')
+        writeALL(cls.fileName, 10, nBeams=50)
+        with open(cls.fileName, 'rb') as f:
+            cls.raw = f.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def test_slices_valid_after_close(self):
+        r = ALLReader(self.fileName, useMMAP=True)
+        r.buildIndex(sidecar=False)
+        offset, length = int(r.index['offset'][3]), int(r.index['length'][3])
+        raw = r.readDatagramBytes(offset, length)
+        samples = np.frombuffer(raw, dtype=np.uint8)
+        r.close()
+        self.assertTrue(r.fileptr.fileptr.closed)
+        self.assertEqual(bytes(raw), self.raw[offset:offset + length])
+        np.testing.assert_array_equal(samples, np.frombuffer(self.raw, dtype=np.uint8, count=length, offset=offset))
+
+    def test_close_view_not_released(self):
+        r = ALLReader(self.fileName, useMMAP=True)
+        view = r.fileptr.view
+        r.fileptr.view = ExportedView()
+        r.close()
+        self.assertTrue(r.fileptr.fileptr.closed)
+        view.release()
+        r.fileptr.mm.close()
+
+    def test_close_empty_file(self):
+        fileName = os.path.join(self.folder, 'empty.all')
+        open(fileName, 'wb').close()
+        r = ALLReader(fileName, useMMAP=True)
+        r.close()
+        self.assertTrue(r.fileptr.fileptr.closed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from . import context
+from pyall import ALLReader, cBeam, dateToSecondsSinceMidnight, from_timestamp
+from benchmarks.synthetic_all import writeALL
+
+# Y_SEABEDIMAGE.encode of pyall 2.x, beam by beam from the beams list (checksum left to 0)
+def oldEncode(y):
+    header_fmt = '=LBBHLLHHfHhhHHH'
+    numSamples = sum(len(b.samples) for b in y.beams)
+    fullDatagramByteCount = struct.calcsize(header_fmt) + 6 * len(y.beams) + 2 * numSamples + 4
+    recordTime = int(dateToSecondsSinceMidnight(from_timestamp(y.Time)) * 1000)
+    fullDatagram = struct.pack(header_fmt, fullDatagramByteCount - 4, y.STX, ord(y.typeOfDatagram), y.EMModel, y.RecordDate, recordTime, y.Counter,
+                               y.SerialNumber, y.SampleFrequency, y.RangeToNormalIncidence, y.NormalIncidence, y.ObliqueBS, y.TxBeamWidth, y.TVGCrossOver,
+                               len(y.beams))
+    s = []
+    for i, b in enumerate(y.beams):
+        fullDatagram += struct.pack('=bBHH', b.sortingDirection, b.detectionInfo, b.numberOfSamplesPerBeam, b.centreSampleNumber)
+        correction = y.ARC[round(y.BeamPointingAngle[i], 0)]
+        for sample in b.samples:
+            s.append(int(sample + correction))
+    fullDatagram += struct.pack('=%dh' % len(s), *s)
+    return fullDatagram + struct.pack('=BBH', 1, 3, 0)
+
+class TestSeabedImage(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.fileName = os.path.join(cls.folder, 'synthetic.all')
+        writeALL(cls.fileName, 10, nBeams=50)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def readY(self, useMMAP=False):
+        r = ALLReader(self.fileName, useMMAP=useMMAP)
+        datagrams = []
+        while r.moreData():
+            typeOfDatagram, datagram = r.readDatagram()
+            if typeOfDatagram == 'Y':
+                datagram.read()
+                datagram.Time += 1607558400.0 # encode expects a unix time
+                datagram.BeamPointingAngle = list(np.linspace(-65, 65, datagram.NumBeams))
+                datagram.ARC = {float(a): a * 0.37 - 3.3 for a in range(-70, 71)}
+                datagrams.append(datagram)
+        self.addCleanup(r.close)
+        return datagrams
+
+    def assertEncoded(self, y):
+        encoded, expected = bytes(y.encode()), oldEncode(y)
+        self.assertEqual(encoded[:-2], expected[:-2])
+        self.assertEqual(struct.unpack('=H', encoded[-2:])[0], sum(encoded[5:-3]) % 65536)
+
+    def test_encode_unchanged(self):
+        for y in self.readY():
+            self.assertEncoded(y)
+
+    def test_encode_beams_edited(self):
+        y = self.readY()[0]
+        y.beams[0].samples = [-300, -310, -320]
+        y.beams[0].numberOfSamplesPerBeam = 3
+        y.beams[1].samples[:] = -100 # in place on the sample array
+        y.beams[2].centreSampleNumber = 7
+        del y.beams[-1]
+        self.assertEncoded(y)
+        self.assertEqual(y.NumBeams, len(y.beams))
+        self.assertEqual(y.samples[:3].tolist(), [-300, -310, -320])
+
+    def test_encode_beams_set(self):
+        y = self.readY()[0]
+        beams = []
+        for i in range(4):
+            b = cBeam((1, 0, i + 1, 0), 0)
+            b.samples = list(range(-200, -200 + i + 1))
+            beams.append(b)
+        y.beams = beams
+        self.assertEncoded(y)
+
+    def test_encode_out_of_range(self):
+        y = self.readY()[0]
+        y.beams[0].samples = [40000]
+        with self.assertRaises(struct.error):
+            y.encode()
+
+    def test_samples_writable(self):
+        for useMMAP in (False, True):
+            y = self.readY(useMMAP)[0]
+            before = y.samples.copy()
+            y.samples += 10 # ARC, conditioning
+            y.ARC = {a: 0.0 for a in y.ARC}
+            offset = struct.calcsize('=LBBHLLHHfHhhHHH') + 6 * y.NumBeams
+            np.testing.assert_array_equal(np.frombuffer(bytes(y.encode()), dtype='<i2', count=y.numSamples, offset=offset), before + 10)
+
+if __name__ == '__main__':
+    unittest.main()
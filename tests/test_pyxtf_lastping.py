@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from . import context
+from pyXTF import XTFReader, pingHeaderOffset
+from benchmarks.synthetic_xtf import writeXTF
+
+class TestLastPingHeader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.fileName = os.path.join(cls.folder, 'synthetic.xtf')
+        writeXTF(cls.fileName, 30, nSamples=500)
+        with open(cls.fileName, 'rb') as f:
+            cls.data = f.read()
+        r = XTFReader(cls.fileName)
+        r.buildIndex(sidecar=False)
+        last = r.index[r.index['type'] == 0][-1]
+        r.close()
+        cls.lastPing = bytearray(cls.data[last['offset']:last['offset'] + last['length']])
+        struct.pack_into('<L', cls.lastPing, pingHeaderOffset('h6bhL'), 99999) # ping number of a copy
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def lastPingNumber(self, data, **kwargs):
+        fileName = os.path.join(self.folder, 'test.xtf')
+        with open(fileName, 'wb') as f:
+            f.write(data)
+        r = XTFReader(fileName)
+        try:
+            ping = r.readLastPingHeader(**kwargs)
+        finally:
+            r.close()
+        return ping.PingNumber if ping is not None else None
+
+    def test_last_ping(self):
+        self.assertEqual(self.lastPingNumber(self.data), 1029)
+        self.assertEqual(self.lastPingNumber(self.data, tailSize=300), 1029)
+        self.assertEqual(self.lastPingNumber(self.data + self.data[1024:1024 + 64]), 1029) # attitude packet after the ping
+        self.assertEqual(self.lastPingNumber(self.data + self.lastPing), 99999)
+
+    def test_packet_past_end_of_file(self):
+        # a complete ping header but the packet is cut: not the last ping
+        self.assertEqual(self.lastPingNumber(self.data + self.lastPing[:400]), 1029)
+        self.assertEqual(self.lastPingNumber(self.data + self.lastPing[:-1]), 1029)
+
+    def test_no_ping_in_tail(self):
+        self.assertIsNone(self.lastPingNumber(self.data[:1024]))
+        # the search stops after maxTailSize bytes
+        self.assertIsNone(self.lastPingNumber(self.data + b'\x00' * 5000, maxTailSize=4096))
+        # the last ping is not followed by a packet, the ping before it is the last one that can be checked
+        self.assertEqual(self.lastPingNumber(self.data + b'\x00' * 5000, maxTailSize=65536), 1028)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from . import context
+from sensorcache import SensorCache
+
+class TestSensorCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = SensorCache(os.path.join(self.folder, 'sensors_cache.sqlite'))
+        self.sensorFile = os.path.join(self.folder, '0001_L001.xtf')
+        with open(self.sensorFile, 'wb') as f:
+            f.write(b'\0' * 100)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.folder)
+
+    def test_put_get(self):
+        start, end = pd.Timestamp('2020-12-10 01:00:00.5'), pd.Timestamp('2020-12-10 01:20:00')
+        self.cache.put(self.sensorFile, 'SSS', start, end, 1200, 1.5)
+        self.assertEqual(self.cache.get(self.sensorFile, 'SSS'), (start, end, 1200, 1.5))
+        self.assertIsNone(self.cache.get(self.sensorFile, 'MBES'))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_modified_file(self):
+        self.cache.put(self.sensorFile, 'SSS', None, None, None, 0.1)
+        with open(self.sensorFile, 'ab') as f:
+            f.write(b'\0')
+        self.assertIsNone(self.cache.get(self.sensorFile, 'SSS'))
+
+    def test_missing_file(self):
+        # removed between the listing and the reading: a miss, the reading reports the error
+        os.remove(self.sensorFile)
+        self.assertIsNone(self.cache.get(self.sensorFile, 'SSS'))
+        self.assertEqual(self.cache.misses, 1)
+        self.cache.put(self.sensorFile, 'SSS', pd.Timestamp('2020-12-10'), None, None, 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from . import context
+
+try:
+    import splsensors
+except ImportError as e: # the GUI packages (gooey) are not installed
+    splsensors = None
+    importError = e
+
+# Stand-in for Fugro.DescribedData2Ascii.exe: "converter -n3 <file> Time LineName" prints the lines of the file,
+# a line "#sleep" makes it hang (timeout)
+STUB = '''#!%s
+import sys, time
+for line in open(sys.argv[2]):
+    if line.startswith('#sleep'):
+        sys.stdout.flush()
+        time.sleep(60)
+    sys.stdout.write(line)
+'''
+
+def splLines(start, n, lineName):
+    return ''.join('%s, "%s"\n' % ((start + datetime.timedelta(seconds=i)).strftime('%Y/%m/%d %H:%M:%S.%f')[:-3], lineName) for i in range(n))
+
+@unittest.skipIf(os.name == 'nt', 'the stub converter is a script run through its shebang')
+class TestSPL2CSV(unittest.TestCase):
+    def setUp(self):
+        if splsensors is None:
+            raise unittest.SkipTest(f'splsensors can not be imported: {importError}')
+        self.folder = tempfile.mkdtemp()
+        self.converter = os.path.join(self.folder, 'converter')
+        with open(self.converter, 'w') as f:
+            f.write(STUB % sys.executable)
+        os.chmod(self.converter, os.stat(self.converter).st_mode | stat.S_IXUSR)
+        self.start = datetime.datetime(2020, 10, 17, 3, 15, 24, 420000)
+        self.good = self.spl('good.fbf', splLines(self.start, 10, 'M1308'))
+        self.bad = self.spl('bad.fbf', splLines(self.start, 3, 'M1309') + 'not a time, "M1309"\n')
+        self.slow = self.spl('slow.fbf', splLines(self.start, 3, 'M1310') + '#sleep\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def spl(self, name, text):
+        fileName = os.path.join(self.folder, name)
+        with open(fileName, 'w') as f:
+            f.write(text)
+        return fileName
+
+    def test_normal(self):
+        SessionStart, SessionEnd, LineName, er, maxGap, SessionName = splsensors.SPL2CSV(self.good, self.converter, 30)
+        self.assertEqual((SessionStart, SessionEnd), (self.start, self.start + datetime.timedelta(seconds=9)))
+        self.assertEqual((LineName, er, maxGap, SessionName), ('M1308', '', 1.0, '202010170315'))
+
+    def test_malformed(self):
+        res = splsensors.SPL2CSV(self.bad, self.converter, 30)
+        self.assertEqual((res[2], res[3], res[5]), ('SPLReadError', self.bad, 'SPLReadError'))
+        self.assertTrue(pd.isna(res[0]))
+
+    def test_timeout(self):
+        t = time.time()
+        res = splsensors.SPL2CSV(self.slow, self.converter, 1)
+        self.assertLess(time.time() - t, 30)
+        self.assertEqual((res[2], res[3], res[5]), ('SPLTimeout', self.slow, 'SPLTimeout'))
+
+    def test_converter_missing(self):
+        res = splsensors.SPL2CSV(self.good, os.path.join(self.folder, 'missing'), 30)
+        self.assertEqual((res[2], res[5]), ('ConverterError', 'ConverterError'))
+
+    def test_splfc(self):
+        # the bad and slow sessions are logged in dfer, the run goes on
+        dfSPL = pd.DataFrame(columns = ["Session Start", "Session End", "SPL LineName", "Session MaxGap", "Session Name"])
+        dfer = pd.DataFrame(columns = ["SPLPath"])
+        dfSummary = pd.DataFrame(columns = ["Sensor", "Processed Files", "Duplicated Files", "Wrong Timestamp (SBP)",
+                                            "Moved Files", "Processing Time", "Cache Hits", "Cache Misses"])
+        splList = [self.good, self.bad, self.slow]
+        dfSPL, dfer, dfSummary = splsensors.splfc(splList, 'FBF', dfSPL, dfer, dfSummary, False, self.converter, 3, 2)
+        self.assertEqual(dfSPL['SPL LineName'].tolist(), ['M1308', 'SPLReadError', 'SPLTimeout'])
+        self.assertEqual(dfSPL['Session Start'].iloc[0], pd.Timestamp(self.start))
+        self.assertEqual(dfer['SPLPath'].tolist(), [self.bad, self.slow])
+        self.assertEqual(dfSummary['Processed Files'].tolist(), [3])
+
+if __name__ == '__main__':
+    unittest.main()
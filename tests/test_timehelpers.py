@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Randomised checks of timehelpers against the functions it replaced in pyall and pyXTF (strptime + timedelta, python datetime)
+
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from . import context
+import timehelpers
+from timehelpers import (civilDatetime64, daysFromCivil, from_timestamp, kongsbergDate, recordDatetime64, recordTimestamps, to_DateTime,
+                         to_timestamp)
+
+# pyall 2.x
+def oldToDateTime(recordDate, recordTime):
+    return datetime.strptime(str(recordDate), '%Y%m%d') + timedelta(0, recordTime)
+
+def oldToTimestamp(dateObject):
+    return (dateObject - datetime(1970, 1, 1)).total_seconds()
+
+def outcome(f, *args):
+    '''the value returned by f or the type of the exception it raised'''
+    try:
+        return f(*args)
+    except Exception as e:
+        return type(e)
+
+def randomDates(rng, n, first=date(1900, 1, 1), last=date(2100, 12, 31)):
+    ordinals = rng.integers(first.toordinal(), last.toordinal() + 1, n)
+    return [date.fromordinal(int(o)) for o in ordinals]
+
+def kongsberg(d):
+    return d.year * 10000 + d.month * 100 + d.day
+
+class TestScalar(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(18)
+
+    def test_to_DateTime(self):
+        dates = [kongsberg(d) for d in randomDates(self.rng, 2000)]
+        times = self.rng.integers(0, 86400000, 2000) / 1000.0
+        times[:100] = self.rng.random(100) * 200000 - 10000 # before and after midnight
+        for recordDate, recordTime in zip(dates, times.tolist()):
+            self.assertEqual(to_DateTime(recordDate, recordTime), oldToDateTime(recordDate, recordTime))
+
+    def test_invalid_dates(self):
+        # same exception as strptime, and not memoised as a valid date
+        invalid = [20201301, 20200230, 20190229, 20201200, 20201232, 0, 19700, 123456789, 'abcdefgh', '2020-12-10', -20201210]
+        invalid += [int(v) for v in self.rng.integers(0, 100000000, 500)]
+        for recordDate in invalid * 2:
+            self.assertEqual(outcome(kongsbergDate, recordDate), outcome(datetime.strptime, str(recordDate), '%Y%m%d'))
+            self.assertEqual(outcome(to_DateTime, recordDate, 3600.5), outcome(oldToDateTime, recordDate, 3600.5))
+
+    def test_kongsbergDate(self):
+        for d in randomDates(self.rng, 1000):
+            self.assertEqual(kongsbergDate(kongsberg(d)), datetime(d.year, d.month, d.day))
+            self.assertEqual(kongsbergDate(str(kongsberg(d))), datetime(d.year, d.month, d.day))
+
+    def test_timestamps(self):
+        for d in randomDates(self.rng, 1000, date(1970, 1, 1)):
+            dateObject = datetime(d.year, d.month, d.day) + timedelta(microseconds=int(self.rng.integers(0, 86400000000)))
+            self.assertEqual(to_timestamp(dateObject), oldToTimestamp(dateObject))
+            self.assertEqual(from_timestamp(to_timestamp(dateObject)), dateObject)
+
+    def test_kongsbergDateTimeKey(self):
+        for d in randomDates(self.rng, 500, date(1970, 1, 1)):
+            dateObject = datetime(d.year, d.month, d.day) + timedelta(milliseconds=int(self.rng.integers(0, 86400000)))
+            recordDate, seconds = timehelpers.kongsbergDateTimeKey(to_timestamp(dateObject))
+            self.assertEqual(oldToDateTime(recordDate, seconds), dateObject)
+
+class TestArrays(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(1818)
+
+    def test_daysFromCivil(self):
+        dates = randomDates(self.rng, 5000, date(1, 3, 1), date(9999, 12, 31))
+        dates += [date(2000, 2, 29), date(1900, 2, 28), date(1900, 3, 1), date(1970, 1, 1), date(1969, 12, 31), date(2020, 12, 31)]
+        expected = np.array([d.toordinal() - date(1970, 1, 1).toordinal() for d in dates])
+        year, month, day = (np.array([getattr(d, f) for d in dates]) for f in ('year', 'month', 'day'))
+        np.testing.assert_array_equal(daysFromCivil(year, month, day), expected)
+        for d, e in zip(dates[:200], expected[:200].tolist()):
+            self.assertEqual(daysFromCivil(d.year, d.month, d.day), e) # python ints
+
+    def test_recordDatetime64(self):
+        n = 5000
+        recordDate = np.array([kongsberg(d) for d in randomDates(self.rng, n, date(1970, 1, 1))])
+        recordTime = self.rng.integers(0, 86400000, n)
+        recordTime[:200] = self.rng.integers(86400000, 90000000, 200) # past midnight
+        expected = [oldToDateTime(d, t / 1000.0) for d, t in zip(recordDate.tolist(), recordTime.tolist())]
+        np.testing.assert_array_equal(recordDatetime64(recordDate, recordTime), np.array(expected, dtype='datetime64[ns]'))
+        np.testing.assert_array_equal(recordTimestamps(recordDate, recordTime), np.array([oldToTimestamp(e) for e in expected]))
+
+    def test_civilDatetime64(self):
+        n = 5000
+        dates = randomDates(self.rng, n, date(1970, 1, 1))
+        hour, minute, second = self.rng.integers(0, 24, n), self.rng.integers(0, 60, n), self.rng.integers(0, 60, n)
+        microsecond = self.rng.integers(0, 100, n) * 10000 # XTF hundredths of second
+        expected = [datetime(d.year, d.month, d.day, h, m, s, us) for d, h, m, s, us in zip(dates, hour.tolist(), minute.tolist(), second.tolist(), microsecond.tolist())]
+        year, month, day = (np.array([getattr(d, f) for d in dates], dtype=np.int16) for f in ('year', 'month', 'day'))
+        np.testing.assert_array_equal(civilDatetime64(year, month, day, hour, minute, second, microsecond), np.array(expected, dtype='datetime64[ns]'))
+        self.assertEqual(civilDatetime64(2020, 12, 10, 1, 2, 3), np.datetime64('2020-12-10T01:02:03', 'ns'))
+
+if __name__ == '__main__':
+    unittest.main()
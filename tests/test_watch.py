@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import datetime
+import os
+import shutil
+import stat
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from . import context
+from .test_spl2csv import STUB, splLines
+
+try:
+    import splsensors
+except ImportError as e: # the GUI packages (gooey) are not installed
+    splsensors = None
+    importError = e
+
+def writeALL(fileName, start):
+    '''a .all file of one installation datagram, all what readSensorFile needs (the start time)'''
+    body = struct.pack('=BBHLL3H', 2, ord('I'), 2040, int(start.strftime('%Y%m%d')),
+                       (start.hour * 3600 + start.minute * 60 + start.second) * 1000 + start.microsecond // 1000, 1, 123, 0) + b'WLZ=0.5,'
+    d = body + struct.pack('=BH', 3, sum(body[1:]) & 0xFFFF)
+    with open(fileName, 'wb') as f:
+        f.write(struct.pack('=L', len(d)) + d)
+
+@unittest.skipIf(os.name == 'nt', 'the stub converter is a script run through its shebang')
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        if splsensors is None:
+            raise unittest.SkipTest(f'splsensors can not be imported: {importError}')
+        self.folder = tempfile.mkdtemp()
+        for sub in ['SPL/20201017', 'MBES', 'out', 'cache']:
+            os.makedirs(os.path.join(self.folder, sub))
+        converter = os.path.join(self.folder, 'converter')
+        with open(converter, 'w') as f:
+            f.write(STUB % sys.executable)
+        os.chmod(converter, os.stat(converter).st_mode | stat.S_IXUSR)
+        self.start = datetime.datetime(2020, 10, 17, 3, 15, 24, 420000)
+        with open(os.path.join(self.folder, 'SPL/20201017/v1-position.fbf'), 'w') as f:
+            f.write(splLines(self.start, 60, 'M1308'))
+        self.args = argparse.Namespace(splFolder=os.path.join(self.folder, 'SPL'), splPosition='V1-Position', buffer=0,
+                                       splWorkers=2, splTimeout=30, starfixConverter=converter,
+                                       allFolder=os.path.join(self.folder, 'MBES'), xtfFolder=None, sgySBPFolder=None, csvMAGFolder=None, sgySUHRSFolder=None,
+                                       allFile=None, xtfFile=None, sgySBPFile=None, csvMAGFile=None, sgySUHRSFile=None,
+                                       outputFolder=os.path.join(self.folder, 'out'), excludeFolder=None, move='no', workers=1, scanThreads=1,
+                                       noCache=False, rebuildCache=False, integrity=False, watch=True, watchInterval=1)
+        env = {'XDG_CACHE_HOME': os.path.join(self.folder, 'cache')}
+        self.env = mock.patch.dict(os.environ, env)
+        self.env.start()
+        os.environ.pop('LOCALAPPDATA', None)
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.folder)
+
+    def tick(self, state):
+        '''one run of the watch mode, return the sensors files and the SPL files read'''
+        with mock.patch.object(splsensors, 'readSensorFile', wraps=splsensors.readSensorFile) as readSensor, \
+             mock.patch.object(splsensors, 'SPL2CSV', wraps=splsensors.SPL2CSV) as readSPL:
+            splsensors.process(self.args, False, state)
+        return [c.args[0] for c in readSensor.call_args_list], [c.args[0] for c in readSPL.call_args_list]
+
+    def test_only_new_files_read(self):
+        first = os.path.join(self.folder, 'MBES', '0001_M1308.all')
+        second = os.path.join(self.folder, 'MBES', '0002_M1308.all')
+        writeALL(first, self.start + datetime.timedelta(seconds=1))
+        # a file out of the sessions, the logs always have a Missing_SPL sheet
+        orphan = os.path.join(self.folder, 'MBES', '0000_M1307.all')
+        writeALL(orphan, self.start - datetime.timedelta(hours=1))
+        state = splsensors.watchState(self.args)
+        cache = state['cache']
+        try:
+            sensors, spl = self.tick(state)
+            self.assertEqual(sorted(sensors), [orphan, first])
+            self.assertEqual(len(spl), 1)
+
+            writeALL(second, self.start + datetime.timedelta(seconds=30))
+            sensors, spl = self.tick(state)
+            self.assertEqual(sensors, [second])
+            self.assertEqual(spl, [])
+            self.assertIs(state['cache'], cache)
+            log = pd.read_csv(os.path.join(self.folder, 'out', 'V1_MBES_Full_Log.csv'))
+            self.assertEqual(sorted(log['FilePath']), [orphan, first, second])
+            self.assertEqual(log.set_index('FilePath')['SPL LineName'].reindex([first, second]).tolist(), ['M1308', 'M1308'])
+
+            # nothing changed, nothing read
+            self.assertEqual(self.tick(state), ([], []))
+        finally:
+            cache.close()
+
+if __name__ == '__main__':
+    unittest.main()